@@ -12,6 +12,7 @@ from src.ai_analyzer import AIAnalyzer
 from src.config import get_config
 from src.file_organizer import FileOrganizer, OrganizationStrategy
 from src.pdf_processor import PDFProcessor
+from src.pipeline import DocumentPipeline
 
 # Set up logging
 logging.basicConfig(
@@ -47,6 +48,7 @@ file_organizer = FileOrganizer(
     org_strategy,
     enable_company_normalization=config.organization.enable_company_normalization,
     similarity_threshold=config.organization.company_similarity_threshold,
+    max_history=config.organization.max_history,
 )
 
 # Initialize AI analyzer
@@ -120,28 +122,25 @@ def process_pdfs():
         if not pdf_files:
             return jsonify({"error": "No PDF files found to process"}), 400
 
+        # Extraction, AI analysis and filing of consecutive PDFs overlap
+        pipeline = DocumentPipeline(
+            pdf_processor,
+            ai_analyzer,
+            file_organizer,
+            analyze_batch_size=config.ai.batch_size,
+        )
         results = []
-        total_files = len(pdf_files)
-
-        # Process each PDF
-        for i, pdf_path in enumerate(pdf_files, 1):
-            try:
-                logger.info(f"Processing {i}/{total_files}: {pdf_path.name}")
-
-                # Extract text and metadata
-                pdf_doc = pdf_processor.process_pdf(pdf_path)
-
-                # Analyze with AI
-                doc_info = ai_analyzer.analyze_document(pdf_doc)
-
-                # Organize the file
-                new_path = file_organizer.organize_file(pdf_doc, doc_info)
 
+        for outcome in pipeline.run(pdf_files):
+            if outcome.succeeded:
+                doc_info = outcome.doc_info
                 results.append(
                     {
-                        "original_filename": pdf_path.name,
+                        "original_filename": outcome.pdf_path.name,
                         "new_path": str(
-                            new_path.relative_to(Path(app.config["OUTPUT_FOLDER"]))
+                            outcome.new_path.relative_to(
+                                Path(app.config["OUTPUT_FOLDER"])
+                            )
                         ),
                         "company": doc_info.company_name,
                         "document_type": doc_info.document_type,
@@ -151,15 +150,12 @@ def process_pdfs():
                         "status": "success",
                     }
                 )
-
-            except Exception as e:
-                logger.error(f"Error processing {pdf_path.name}: {e}")
-                logger.error(traceback.format_exc())
+            else:
                 results.append(
                     {
-                        "original_filename": pdf_path.name,
+                        "original_filename": outcome.pdf_path.name,
                         "status": "error",
-                        "error": str(e),
+                        "error": outcome.error,
                     }
                 )
 
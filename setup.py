@@ -60,6 +60,11 @@ setup(
             "torch>=2.0.0",
             "transformers>=4.30.0",
         ],
+        "speedups": [
+            "polyleven>=0.8",
+            "tesserocr>=2.6.0",
+            "orjson>=3.9.0",
+        ],
     },
     entry_points={
         "console_scripts": [
@@ -5,30 +5,97 @@ using various AI providers (OpenAI, Anthropic, local models) to extract
 categorization information such as company names, document types, and dates.
 """
 
+import copy
 import json
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from datetime import date, datetime
+from datetime import date
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Protocol, Tuple
 
 from dateutil import parser as date_parser
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None  # type: ignore[assignment]
+
+from .compat import DATACLASS_SLOTS
 from .config import AIConfig, get_config
 from .pdf_processor import PDFDocument
+from .response_cache import ResponseCache
 
 logger = logging.getLogger(__name__)
 
+# Date formats found in document text, tried in order
+_TEXT_DATE_PATTERNS = (
+    re.compile(r"\b(\d{1,2})[/-](\d{1,2})[/-](\d{4})\b"),  # MM/DD/YYYY
+    re.compile(r"\b(\d{4})[/-](\d{1,2})[/-](\d{1,2})\b"),  # YYYY-MM-DD
+    re.compile(r"\b(\w+)\s+(\d{1,2}),?\s+(\d{4})\b"),  # Month DD, YYYY
+    re.compile(r"\b(\d{1,2})\s+(\w+)\s+(\d{4})\b"),  # DD Month YYYY
+)
+_MONTH_YEAR_RE = re.compile(
+    r"\b(January|February|March|April|May|June|July|August|September|October|November|December)\s+(\d{4})\b",
+    re.IGNORECASE,
+)
+
+# Date formats found in file names, tried in order
+_FILENAME_DATE_PATTERNS = (
+    re.compile(r"(\d{4})_(\d{2})_(\d{2})"),  # YYYY_MM_DD
+    re.compile(r"(\d{4})(\d{2})(\d{2})"),  # YYYYMMDD
+    re.compile(r"(\d{4})-(\d{2})-(\d{2})"),  # YYYY-MM-DD
+)
+
+# Every date pattern above includes a four-digit year
+_YEAR_RE = re.compile(r"\d{4}")
+
+_ISO_DATE_RE = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
+_JSON_OBJECT_RE = re.compile(r"\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}", re.DOTALL)
+_JSON_ARRAY_RE = re.compile(r"\[.*\]", re.DOTALL)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _load_json(json_str: str) -> Any:
+    """Decode JSON, using orjson when installed.
+
+    orjson is stricter than the json module (no NaN/Infinity, 64-bit
+    integers only), so anything it rejects is retried with json to keep
+    the same leniency.
+
+    Args:
+        json_str: JSON document
+
+    Returns:
+        Decoded value
+
+    Raises:
+        ValueError: If the string is not valid JSON
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(json_str)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(json_str)
+
 
 class AIProvider(Protocol):
     """Protocol defining the interface for AI providers."""
 
-    def analyze_document_text(self, text: str, max_tokens: int = 800) -> str:
-        """Analyze document text and return JSON response."""
+    def analyze_document_text(
+        self, text: str, max_tokens: int = 800, token_limit: Optional[int] = None
+    ) -> str:
+        """Analyze document text and return JSON response.
+
+        max_tokens is capped at token_limit, or at the provider's configured
+        max_tokens when token_limit is None.
+        """
         ...
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class DocumentInfo:
     """Data class for document analysis results.
 
@@ -84,11 +151,15 @@ class OpenAIProvider:
         self.credentials = credentials
         self.is_local = is_local
 
-    def analyze_document_text(self, text: str, max_tokens: int = 800) -> str:
+    def analyze_document_text(
+        self, text: str, max_tokens: int = 800, token_limit: Optional[int] = None
+    ) -> str:
         """Analyze document text using OpenAI API."""
         try:
             model = self._get_model()
-            max_tokens = min(max_tokens, self.ai_config.openai_max_tokens)
+            if token_limit is None:
+                token_limit = self.ai_config.openai_max_tokens
+            max_tokens = min(max_tokens, token_limit)
 
             logger.debug(f"Using OpenAI model: {model} (local: {self.is_local})")
 
@@ -176,12 +247,16 @@ class AnthropicProvider:
         self.client = client
         self.ai_config = ai_config
 
-    def analyze_document_text(self, text: str, max_tokens: int = 800) -> str:
+    def analyze_document_text(
+        self, text: str, max_tokens: int = 800, token_limit: Optional[int] = None
+    ) -> str:
         """Analyze document text using Anthropic API."""
+        if token_limit is None:
+            token_limit = self.ai_config.anthropic_max_tokens
         try:
             response = self.client.messages.create(
                 model=self.ai_config.anthropic_model,
-                max_tokens=min(max_tokens, self.ai_config.anthropic_max_tokens),
+                max_tokens=min(max_tokens, token_limit),
                 temperature=self.ai_config.anthropic_temperature,
                 system="You are a document analysis expert. Analyze documents and provide structured information for categorization.",
                 messages=[{"role": "user", "content": text}],
@@ -192,6 +267,33 @@ class AnthropicProvider:
             return "{}"
 
 
+@lru_cache(maxsize=8)
+def _get_openai_client(api_key: str, base_url: str) -> Any:
+    """Return a shared OpenAI client for this key and server.
+
+    Clients are thread-safe and each holds its own HTTP connection pool, so
+    analyzers sharing one reuse keep-alive connections instead of paying a
+    fresh TCP/TLS handshake.
+    """
+    try:
+        import openai
+    except ImportError:
+        raise ImportError("OpenAI package not installed. Run: pip install openai")
+
+    return openai.OpenAI(api_key=api_key, base_url=base_url)
+
+
+@lru_cache(maxsize=8)
+def _get_anthropic_client(api_key: str) -> Any:
+    """Return a shared Anthropic client for this key."""
+    try:
+        import anthropic
+    except ImportError:
+        raise ImportError("Anthropic package not installed. Run: pip install anthropic")
+
+    return anthropic.Anthropic(api_key=api_key)
+
+
 class AIAnalyzer:
     """Main AI analyzer class for document categorization.
 
@@ -199,14 +301,22 @@ class AIAnalyzer:
     initialization, text processing, and result parsing.
     """
 
-    def __init__(self, provider: Optional[str] = None):
+    def __init__(
+        self, provider: Optional[str] = None, cache: Optional[ResponseCache] = None
+    ):
         """Initialize the AI analyzer.
 
         Args:
             provider: AI provider to use ('openai' or 'anthropic').
                      If None, uses config default.
+            cache: Optional persistent cache of AI responses, so re-scanned
+                documents with identical text skip the AI request. Defaults
+                to one at the configured ai.response_cache_path, if set.
         """
         self.config = get_config()
+        if cache is None and self.config.ai.response_cache_path:
+            cache = ResponseCache(self.config.ai.response_cache_path)
+        self.cache = cache
         self.credentials = self.config.get_ai_credentials()
 
         # Determine provider
@@ -230,11 +340,6 @@ class AIAnalyzer:
 
     def _init_openai_client(self) -> OpenAIProvider:
         """Initialize OpenAI client."""
-        try:
-            import openai
-        except ImportError:
-            raise ImportError("OpenAI package not installed. Run: pip install openai")
-
         api_key = self.credentials["openai_api_key"]
         base_url = self.credentials["openai_base_url"] or "https://api.openai.com/v1"
 
@@ -249,23 +354,16 @@ class AIAnalyzer:
         elif not api_key:
             raise ValueError("OpenAI API key not found in environment variables")
 
-        client = openai.OpenAI(api_key=api_key, base_url=base_url)
+        client = _get_openai_client(api_key, base_url)
         return OpenAIProvider(client, self.config.ai, self.credentials, is_local)
 
     def _init_anthropic_client(self) -> AnthropicProvider:
         """Initialize Anthropic client."""
-        try:
-            import anthropic
-        except ImportError:
-            raise ImportError(
-                "Anthropic package not installed. Run: pip install anthropic"
-            )
-
         api_key = self.credentials["anthropic_api_key"]
         if not api_key:
             raise ValueError("Anthropic API key not found in environment variables")
 
-        client = anthropic.Anthropic(api_key=api_key)
+        client = _get_anthropic_client(api_key)
         return AnthropicProvider(client, self.config.ai)
 
     def analyze_document(self, pdf_document: PDFDocument) -> DocumentInfo:
@@ -291,13 +389,33 @@ class AIAnalyzer:
             # Create analysis prompt
             prompt = self._create_analysis_prompt(text_content)
 
-            # Get AI response
-            response = self.client.analyze_document_text(
-                prompt, self.config.ai.openai_max_tokens
-            )
+            # Get AI response, reusing the answer to an identical request
+            max_tokens = self.config.ai.openai_max_tokens
+            cache = self.cache
+            cache_key = None
+            response = None
+            if cache is not None:
+                cache_key = self._cache_key(prompt, max_tokens)
+                response = cache.get(cache_key)
+                if response is not None:
+                    logger.info("Using cached AI response")
+                    cache_key = None
+
+            if response is None:
+                response = self.client.analyze_document_text(prompt, max_tokens)
 
             # Parse and enhance the response
             doc_info = self._parse_ai_response(response)
+
+            # Providers answer "{}" on API errors; only keep real analyses
+            if (
+                cache is not None
+                and cache_key is not None
+                and response.strip() not in ("", "{}")
+                and "parsing_error" not in doc_info.additional_metadata
+            ):
+                cache.set(cache_key, response)
+
             doc_info = self._enhance_document_info(doc_info, pdf_document)
 
             logger.info(
@@ -309,6 +427,98 @@ class AIAnalyzer:
             logger.error(f"Error analyzing document {pdf_document.file_path}: {e}")
             return self._create_fallback_document_info(pdf_document)
 
+    def _cache_key(self, prompt: str, max_tokens: int) -> str:
+        """Build the response cache key for a request to the current model."""
+        if isinstance(self.client, OpenAIProvider):
+            model = self.client._get_model()
+        else:
+            model = self.config.ai.anthropic_model
+        return ResponseCache.make_key(self.provider, model, prompt, max_tokens)
+
+    def analyze_documents_batch(
+        self, documents: List[PDFDocument], batch_size: int = 4
+    ) -> List[DocumentInfo]:
+        """Analyze documents several at a time, one AI request per group.
+
+        Each request asks for a JSON array with one result per document, so the
+        per-request overhead (round trip, and prompt evaluation on local
+        models) is paid once per group. A group's reply may use the provider's
+        max_tokens for each document, up to ai.batch_max_tokens in total; a
+        group whose reply can't be matched up with its documents is analyzed
+        again one document at a time.
+
+        Args:
+            documents: List of PDFDocument objects to analyze
+            batch_size: Maximum number of documents sent in one request
+
+        Returns:
+            One DocumentInfo per document, in input order, holding the fallback
+            results for documents whose analysis failed
+        """
+        results: Dict[int, DocumentInfo] = {}
+        text_limit = self._get_text_limit()
+
+        # (position, document, text to send) for documents worth sending
+        pending = []
+        for i, document in enumerate(documents):
+            text_content = document.text_content[:text_limit]
+            if text_content.strip():
+                pending.append((i, document, text_content))
+            else:
+                logger.warning(f"No text content found in {document.file_path}")
+                results[i] = self._create_fallback_document_info(document)
+
+        for start in range(0, len(pending), batch_size):
+            group = pending[start : start + batch_size]
+            for (i, _, _), doc_info in zip(group, self._analyze_group(group)):
+                results[i] = doc_info
+
+        return [results[i] for i in range(len(documents))]
+
+    def _analyze_group(
+        self, group: List[Tuple[int, PDFDocument, str]]
+    ) -> List[DocumentInfo]:
+        """Analyze a group of documents with a single AI request."""
+        if len(group) == 1:
+            return [self.analyze_document(group[0][1])]
+
+        try:
+            prompt = self._create_batch_prompt([text for _, _, text in group])
+            # Budget a full reply per document, capped by the batch limit
+            # rather than the provider's per-document one
+            batch_limit = self.config.ai.batch_max_tokens
+            max_tokens = min(self._max_output_tokens() * len(group), batch_limit)
+            response = self.client.analyze_document_text(
+                prompt, max_tokens, token_limit=batch_limit
+            )
+            items = self._decode_batch_response(response, len(group))
+            doc_infos = [
+                self._enhance_document_info(
+                    DocumentInfo(*self._fields_from_data(item)), document
+                )
+                for item, (_, document, _) in zip(items, group)
+            ]
+        except Exception as e:
+            logger.warning(
+                f"Batch analysis failed, analyzing {len(group)} documents "
+                f"individually: {e}"
+            )
+            return [self.analyze_document(document) for _, document, _ in group]
+
+        for doc_info, (_, document, _) in zip(doc_infos, group):
+            logger.info(
+                f"Analysis complete for {document.file_path.name}: "
+                f"{doc_info.company_name} - {doc_info.document_type} "
+                f"(confidence: {doc_info.confidence_score:.2f})"
+            )
+        return doc_infos
+
+    def _max_output_tokens(self) -> int:
+        """Reply budget, in tokens, for one document from the configured provider."""
+        if self.provider == "anthropic":
+            return self.config.ai.anthropic_max_tokens
+        return self.config.ai.openai_max_tokens
+
     def _get_text_limit(self) -> int:
         """Determine appropriate text limit based on provider and configuration."""
         base_limit = self.config.processing.max_text_for_ai
@@ -382,28 +592,51 @@ Respond ONLY with valid JSON. Example:
     }}
 }}"""
 
+    def _create_batch_prompt(self, texts: List[str]) -> str:
+        """Create a prompt asking for one analysis per document, as a JSON array."""
+        documents = "\n\n".join(
+            f"--- DOCUMENT {i} ---\n{text}" for i, text in enumerate(texts, 1)
+        )
+        return f"""Analyze each of the following {len(texts)} documents and extract key information for categorization.
+
+{documents}
+
+For each document, in the order given, provide a JSON object with:
+1. company_name: The company or organization that issued the document
+2. document_type: Type of document (e.g., "bank statement", "invoice", "bill", "receipt", "tax document", "insurance", "contract", "letter", etc.)
+3. date: The primary date of the document in YYYY-MM-DD format
+4. confidence_score: Your confidence in this categorization (0.0 to 1.0)
+5. suggested_name: A descriptive filename for the document
+
+Respond ONLY with a valid JSON array of exactly {len(texts)} objects, one per document. Example for two documents:
+[
+    {{"company_name": "Chase Bank", "document_type": "bank statement", "date": "2023-03-15", "confidence_score": 0.95, "suggested_name": "Chase Bank Statement March 2023"}},
+    {{"company_name": "PG&E", "document_type": "utility bill", "date": "2023-04-02", "confidence_score": 0.9, "suggested_name": "PG&E Utility Bill April 2023"}}
+]"""
+
     def _parse_ai_response(self, response: str) -> DocumentInfo:
         """Parse AI response into DocumentInfo object."""
         try:
             if not response or response.strip() == "":
                 raise ValueError("Empty response")
 
-            # Extract JSON from response
-            json_str = self._extract_json_from_response(response)
-            json_str = self._clean_json_string(json_str)
-
-            data = json.loads(json_str)
-
-            # Parse date
-            doc_date = self._parse_date_from_data(data.get("date"))
+            (
+                company_name,
+                document_type,
+                doc_date,
+                confidence_score,
+                suggested_name,
+                additional_metadata,
+            ) = self._decode_response(response)
 
+            # Callers mutate the result, so build a fresh one from the cached fields
             return DocumentInfo(
-                company_name=data.get("company_name", "Unknown") or "Unknown",
-                document_type=data.get("document_type", "document") or "document",
+                company_name=company_name,
+                document_type=document_type,
                 date=doc_date,
-                confidence_score=float(data.get("confidence_score", 0.0)),
-                suggested_name=data.get("suggested_name", "") or "",
-                additional_metadata=data.get("additional_metadata", {}),
+                confidence_score=confidence_score,
+                suggested_name=suggested_name,
+                additional_metadata=copy.deepcopy(additional_metadata),
             )
 
         except Exception as e:
@@ -418,17 +651,81 @@ Respond ONLY with valid JSON. Example:
                 additional_metadata={"parsing_error": str(e)},
             )
 
-    def _extract_json_from_response(self, response: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _decode_response(
+        response: str,
+    ) -> Tuple[str, str, Optional[date], float, str, Any]:
+        """Decode the fields of an AI response.
+
+        Cached, as retried and duplicate documents often get the exact same
+        response back. Responses that fail to decode raise and are not cached.
+
+        Args:
+            response: Raw AI response text
+
+        Returns:
+            Tuple of (company name, document type, date, confidence score,
+            suggested name, additional metadata)
+        """
+        # Extract JSON from response
+        json_str = AIAnalyzer._extract_json_from_response(response)
+        json_str = AIAnalyzer._clean_json_string(json_str)
+
+        return AIAnalyzer._fields_from_data(_load_json(json_str))
+
+    @staticmethod
+    def _fields_from_data(
+        data: Dict[str, Any]
+    ) -> Tuple[str, str, Optional[date], float, str, Any]:
+        """Read the DocumentInfo fields from one decoded analysis object."""
+        return (
+            data.get("company_name", "Unknown") or "Unknown",
+            data.get("document_type", "document") or "document",
+            AIAnalyzer._parse_date_from_data(data.get("date")),
+            float(data.get("confidence_score", 0.0)),
+            data.get("suggested_name", "") or "",
+            data.get("additional_metadata", {}),
+        )
+
+    @staticmethod
+    def _decode_batch_response(response: str, count: int) -> List[Dict[str, Any]]:
+        """Decode a JSON array holding one analysis object per document.
+
+        Args:
+            response: Raw AI response text
+            count: Number of documents the response should cover
+
+        Returns:
+            The analysis objects, in document order
+
+        Raises:
+            ValueError: If the response isn't an array of ``count`` objects
+        """
+        array_match = _JSON_ARRAY_RE.search(response or "")
+        if not array_match:
+            raise ValueError("No JSON array in response")
+
+        items = _load_json(array_match.group())
+        if not isinstance(items, list) or len(items) != count:
+            raise ValueError(f"Expected a JSON array of {count} results")
+        if not all(isinstance(item, dict) for item in items):
+            raise ValueError("Expected a JSON object per document")
+        return items
+
+    @staticmethod
+    def _extract_json_from_response(response: str) -> str:
         """Extract JSON from AI response text."""
         # Look for JSON object in the response
-        json_match = re.search(r"\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}", response, re.DOTALL)
+        json_match = _JSON_OBJECT_RE.search(response)
         if json_match:
             return json_match.group()
 
         # If no JSON found, return the response as-is and let JSON parsing handle it
         return response.strip()
 
-    def _clean_json_string(self, json_str: str) -> str:
+    @staticmethod
+    def _clean_json_string(json_str: str) -> str:
         """Clean and fix common JSON formatting issues."""
         # Remove any text before first { and after last }
         start_idx = json_str.find("{")
@@ -438,7 +735,7 @@ Respond ONLY with valid JSON. Example:
             json_str = json_str[start_idx : end_idx + 1]
 
         # Clean up whitespace
-        json_str = re.sub(r"\s+", " ", json_str)
+        json_str = _WHITESPACE_RE.sub(" ", json_str)
 
         # Try to fix unmatched braces
         open_braces = json_str.count("{")
@@ -448,16 +745,18 @@ Respond ONLY with valid JSON. Example:
 
         return json_str
 
-    def _parse_date_from_data(self, date_str: Any) -> Optional[date]:
+    @staticmethod
+    def _parse_date_from_data(date_str: Any) -> Optional[date]:
         """Parse date from AI response data."""
         if not date_str:
             return None
 
         try:
             if isinstance(date_str, str):
-                # Try ISO format first
-                if re.match(r"\d{4}-\d{2}-\d{2}", date_str):
-                    return datetime.strptime(date_str, "%Y-%m-%d").date()
+                # Try ISO format first, without strptime's format parsing
+                iso_match = _ISO_DATE_RE.fullmatch(date_str)
+                if iso_match:
+                    return date(*map(int, iso_match.groups()))
                 # Try general parsing
                 return date_parser.parse(date_str).date()
             return None
@@ -482,15 +781,13 @@ Respond ONLY with valid JSON. Example:
 
     def _extract_date_from_text(self, text: str) -> Optional[date]:
         """Extract date from document text using regex patterns."""
-        patterns = [
-            r"\b(\d{1,2})[/-](\d{1,2})[/-](\d{4})\b",  # MM/DD/YYYY
-            r"\b(\d{4})[/-](\d{1,2})[/-](\d{1,2})\b",  # YYYY-MM-DD
-            r"\b(\w+)\s+(\d{1,2}),?\s+(\d{4})\b",  # Month DD, YYYY
-            r"\b(\d{1,2})\s+(\w+)\s+(\d{4})\b",  # DD Month YYYY
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, text)
+        # One cheap scan rules out text no date pattern can match, instead of
+        # running every pattern over the whole text
+        if not _YEAR_RE.search(text):
+            return None
+
+        for pattern in _TEXT_DATE_PATTERNS:
+            match = pattern.search(text)
             if match:
                 try:
                     return date_parser.parse(match.group()).date()
@@ -498,8 +795,7 @@ Respond ONLY with valid JSON. Example:
                     continue
 
         # Look for month-year patterns (e.g., "January 2023")
-        month_year_pattern = r"\b(January|February|March|April|May|June|July|August|September|October|November|December)\s+(\d{4})\b"
-        match = re.search(month_year_pattern, text, re.IGNORECASE)
+        match = _MONTH_YEAR_RE.search(text)
         if match:
             try:
                 # Use the first day of the month as default
@@ -511,14 +807,8 @@ Respond ONLY with valid JSON. Example:
 
     def _extract_date_from_filename(self, filename: str) -> Optional[date]:
         """Extract date from filename patterns."""
-        patterns = [
-            r"(\d{4})_(\d{2})_(\d{2})",  # YYYY_MM_DD
-            r"(\d{4})(\d{2})(\d{2})",  # YYYYMMDD
-            r"(\d{4})-(\d{2})-(\d{2})",  # YYYY-MM-DD
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, filename)
+        for pattern in _FILENAME_DATE_PATTERNS:
+            match = pattern.search(filename)
             if match:
                 try:
                     year, month, day = map(int, match.groups())
@@ -562,25 +852,32 @@ Respond ONLY with valid JSON. Example:
             additional_metadata={"fallback": True},
         )
 
-    def batch_analyze(self, documents: List[PDFDocument]) -> List[DocumentInfo]:
-        """Analyze multiple documents in batch.
+    def batch_analyze(
+        self, documents: List[PDFDocument], max_workers: int = 4
+    ) -> List[DocumentInfo]:
+        """Analyze multiple documents concurrently.
 
         Args:
             documents: List of PDFDocument objects to analyze
+            max_workers: Maximum number of requests in flight at once
 
         Returns:
-            List of DocumentInfo objects with analysis results
+            List of DocumentInfo objects with analysis results, in input order
         """
-        results = []
+        if not documents:
+            return []
+
         total = len(documents)
 
-        for i, document in enumerate(documents, 1):
+        def analyze(indexed_document: Tuple[int, PDFDocument]) -> DocumentInfo:
+            i, document = indexed_document
             logger.info(f"Analyzing document {i}/{total}: {document.file_path.name}")
             try:
-                doc_info = self.analyze_document(document)
-                results.append(doc_info)
+                return self.analyze_document(document)
             except Exception as e:
                 logger.error(f"Failed to analyze {document.file_path}: {e}")
-                results.append(self._create_fallback_document_info(document))
+                return self._create_fallback_document_info(document)
 
-        return results
+        # Each analysis is dominated by waiting on the AI provider's response
+        with ThreadPoolExecutor(max_workers=min(max_workers, total)) as executor:
+            return list(executor.map(analyze, enumerate(documents, 1)))
@@ -5,15 +5,106 @@ organizations to prevent duplicate folder creation.
 """
 
 import logging
+import os
 import re
 import shutil
+import sys
 from dataclasses import dataclass, field
-from difflib import SequenceMatcher
 from pathlib import Path
 from typing import Dict, List, Optional, Set
 
+try:
+    import polyleven
+except ImportError:  # pragma: no cover - optional speedup
+    polyleven = None
+
 logger = logging.getLogger(__name__)
 
+# Word tokens for proper casing: anything between whitespace or - _ & /
+_WORD_RE = re.compile(r"[^\s\-_&/]+")
+_LOWER_WORDS = frozenset({"of", "and", "the", "for", "in", "on", "at", "by"})
+_UPPER_WORDS = frozenset({"LLC", "INC", "CORP", "LTD", "USA", "US", "UK"})
+
+# Folder-name sanitizing and comparison normalization
+_INVALID_CHARS_RE = re.compile(r'[<>:"/\\|?*]')
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Similarity required before duplicate folders are merged automatically
+_AUTO_MERGE_THRESHOLD = 0.85
+
+
+def _case_word(match: "re.Match[str]") -> str:
+    """Return the proper-cased form of a single word."""
+    word = match.group()
+    lower = word.lower()
+    if lower in _LOWER_WORDS:
+        return lower
+    upper = word.upper()
+    if upper in _UPPER_WORDS:
+        return upper
+    return word.capitalize()
+
+
+def _levenshtein(a: str, b: str, max_distance: Optional[int] = None) -> int:
+    """Compute the edit distance between two strings.
+
+    Uses polyleven when installed, otherwise a bit-parallel (Myers/Hyyro)
+    implementation on Python ints.
+
+    Args:
+        a: First string
+        b: Second string
+        max_distance: Stop early once the distance is known to exceed this
+
+    Returns:
+        Edit distance, or max_distance + 1 if it exceeds max_distance
+    """
+    if polyleven is not None:
+        distance: int = polyleven.levenshtein(
+            a, b, -1 if max_distance is None else max_distance
+        )
+        return distance
+
+    if len(a) < len(b):
+        a, b = b, a
+    m = len(b)
+    if not m:
+        distance = len(a)
+    else:
+        # Bitmask of positions in b for each character
+        peq: Dict[str, int] = {}
+        for i, char in enumerate(b):
+            peq[char] = peq.get(char, 0) | (1 << i)
+
+        full = (1 << m) - 1
+        last = 1 << (m - 1)
+        pv, mv, distance = full, 0, m
+        remaining = len(a)
+        for char in a:
+            eq = peq.get(char, 0)
+            xv = eq | mv
+            xh = ((((eq & pv) + pv) & full) ^ pv) | eq
+            ph = (mv | ~(xh | pv)) & full
+            mh = pv & xh
+            if ph & last:
+                distance += 1
+            elif mh & last:
+                distance -= 1
+            ph = ((ph << 1) | 1) & full
+            mh = (mh << 1) & full
+            pv = (mh | ~(xv | ph)) & full
+            mv = ph & xv
+
+            # Each remaining character can lower the distance by at most one
+            remaining -= 1
+            if max_distance is not None and distance - remaining > max_distance:
+                return max_distance + 1
+
+    if max_distance is not None and distance > max_distance:
+        return max_distance + 1
+    return distance
+
 
 @dataclass
 class CompanyMapping:
@@ -34,11 +125,10 @@ class CompanyMapping:
             return "Unknown"
 
         # Replace invalid characters
-        invalid_chars = r'[<>:"/\\|?*]'
-        name = re.sub(invalid_chars, "_", name)
+        name = _INVALID_CHARS_RE.sub("_", name)
 
         # Replace multiple spaces with single underscore
-        name = re.sub(r"\s+", "_", name)
+        name = _WHITESPACE_RE.sub("_", name)
 
         # Remove leading/trailing spaces and underscores
         name = name.strip("_").strip()
@@ -67,6 +157,8 @@ class CompanyNormalizer:
         self.output_dir = output_dir
         self.company_mappings: Dict[str, CompanyMapping] = {}
         self.normalized_to_canonical: Dict[str, str] = {}
+        # Casefolded variation -> mapping, so exact matches are a single dict hit
+        self._variation_index: Dict[str, CompanyMapping] = {}
 
         # Common company suffixes and prefixes to normalize
         self.common_suffixes = {
@@ -120,13 +212,9 @@ class CompanyNormalizer:
                 mapping = CompanyMapping(
                     canonical_name=company_name, folder_name=item.name
                 )
-                mapping.variations.add(company_name)
-                mapping.variations.add(item.name)
-
-                self.company_mappings[company_name.lower()] = mapping
-                self.normalized_to_canonical[
-                    self._normalize_name(company_name)
-                ] = company_name
+                self._add_variation(mapping, company_name)
+                self._add_variation(mapping, item.name)
+                self._register_mapping(mapping)
 
                 logger.debug(f"Found existing company: {company_name} -> {item.name}")
 
@@ -141,23 +229,29 @@ class CompanyNormalizer:
         Returns:
             Normalized canonical company name
         """
-        if not company_name or company_name.lower() in ["unknown", "null", "none"]:
+        if not company_name:
+            return "Unknown"
+
+        # Fold case once; every lookup below works on the folded key
+        key = company_name.casefold()
+        if key in ("unknown", "null", "none"):
             return "Unknown"
 
         # First, try exact match (case insensitive)
-        exact_match = self._find_exact_match(company_name)
+        exact_match = self._find_exact_match(key)
         if exact_match:
             logger.debug(f"Exact match found: {company_name} -> {exact_match}")
             return exact_match
 
         # Try fuzzy matching against existing companies
-        fuzzy_match = self._find_fuzzy_match(company_name)
+        fuzzy_match = self._find_fuzzy_match(key)
         if fuzzy_match:
-            logger.info(f"Fuzzy match found: {company_name} -> {fuzzy_match}")
+            logger.info(
+                f"Fuzzy match found: {company_name} -> {fuzzy_match.canonical_name}"
+            )
             # Add this variation to the existing mapping
-            canonical = fuzzy_match
-            self.company_mappings[canonical.lower()].variations.add(company_name)
-            return canonical
+            self._add_variation(fuzzy_match, company_name)
+            return fuzzy_match.canonical_name
 
         # No match found, create new canonical name
         canonical_name = self._create_canonical_name(company_name)
@@ -175,55 +269,54 @@ class CompanyNormalizer:
         Returns:
             Sanitized folder name
         """
-        mapping = self.company_mappings.get(canonical_name.lower())
+        mapping = self.company_mappings.get(canonical_name.casefold())
         if mapping:
             return mapping.folder_name
 
         # Fallback: create sanitized name
         return self._sanitize_name(canonical_name)
 
-    def _find_exact_match(self, company_name: str) -> Optional[str]:
-        """Find exact match for company name."""
-        # Check direct mapping
-        if company_name.lower() in self.company_mappings:
-            return self.company_mappings[company_name.lower()].canonical_name
-
-        # Check variations
-        for mapping in self.company_mappings.values():
-            if company_name.lower() in [v.lower() for v in mapping.variations]:
-                return mapping.canonical_name
+    def _find_exact_match(self, key: str) -> Optional[str]:
+        """Find exact match for a casefolded company name."""
+        # Check direct mapping, then any known variation
+        mapping = self.company_mappings.get(key) or self._variation_index.get(key)
+        if mapping:
+            return mapping.canonical_name
 
         return None
 
-    def _find_fuzzy_match(self, company_name: str) -> Optional[str]:
-        """Find fuzzy match for company name using similarity scoring."""
-        normalized_input = self._normalize_name(company_name)
+    def _find_fuzzy_match(self, key: str) -> Optional[CompanyMapping]:
+        """Find fuzzy match for a casefolded company name using similarity scoring."""
+        normalized_input = self._normalize_name(key)
         best_match = None
         best_score = 0.0
 
-        for canonical, mapping in self.company_mappings.items():
+        for mapping in self.company_mappings.values():
             # Check against canonical name
             canonical_normalized = self._normalize_name(mapping.canonical_name)
-            score = self._calculate_similarity(normalized_input, canonical_normalized)
+            score = self._calculate_similarity(
+                normalized_input, canonical_normalized, self.similarity_threshold
+            )
 
             if score > best_score and score >= self.similarity_threshold:
                 best_score = score
-                best_match = mapping.canonical_name
+                best_match = mapping
 
             # Check against variations
             for variation in mapping.variations:
                 variation_normalized = self._normalize_name(variation)
                 score = self._calculate_similarity(
-                    normalized_input, variation_normalized
+                    normalized_input, variation_normalized, self.similarity_threshold
                 )
 
                 if score > best_score and score >= self.similarity_threshold:
                     best_score = score
-                    best_match = mapping.canonical_name
+                    best_match = mapping
 
         if best_match:
             logger.debug(
-                f"Fuzzy match: {company_name} -> {best_match} (score: {best_score:.3f})"
+                f"Fuzzy match: {key} -> {best_match.canonical_name} "
+                f"(score: {best_score:.3f})"
             )
 
         return best_match
@@ -233,12 +326,12 @@ class CompanyNormalizer:
         if not name:
             return ""
 
-        # Convert to lowercase
-        normalized = name.lower().strip()
+        # Fold case (handles Unicode such as "ß" -> "ss")
+        normalized = name.casefold().strip()
 
         # Remove punctuation and extra spaces
-        normalized = re.sub(r"[^\w\s]", " ", normalized)
-        normalized = re.sub(r"\s+", " ", normalized).strip()
+        normalized = _PUNCTUATION_RE.sub(" ", normalized)
+        normalized = _WHITESPACE_RE.sub(" ", normalized).strip()
 
         # Split into words
         words = normalized.split()
@@ -254,14 +347,23 @@ class CompanyNormalizer:
         # Join back
         return " ".join(words)
 
-    def _calculate_similarity(self, name1: str, name2: str) -> float:
-        """Calculate similarity between two normalized names."""
+    def _calculate_similarity(
+        self, name1: str, name2: str, min_score: Optional[float] = None
+    ) -> float:
+        """Calculate similarity between two normalized names.
+
+        Args:
+            name1: First normalized name
+            name2: Second normalized name
+            min_score: Score the caller cares about; pairs that cannot reach it
+                stop the edit-distance computation early and score below it
+
+        Returns:
+            Similarity score (0.0-1.0)
+        """
         if not name1 or not name2:
             return 0.0
 
-        # Use SequenceMatcher for basic similarity
-        basic_similarity = SequenceMatcher(None, name1, name2).ratio()
-
         # Boost score for exact word matches
         words1 = set(name1.split())
         words2 = set(name2.split())
@@ -276,9 +378,24 @@ class CompanyNormalizer:
                 subset_bonus = 0.0
 
             # Weighted combination with subset bonus
-            return min(1.0, 0.6 * basic_similarity + 0.3 * word_overlap + subset_bonus)
-
-        return basic_similarity
+            weight = 0.6
+            word_score = 0.3 * word_overlap + subset_bonus
+        else:
+            weight = 1.0
+            word_score = 0.0
+
+        # Edit-distance similarity, bounded by the most edits that could still
+        # reach min_score
+        longest = max(len(name1), len(name2))
+        max_edits = None
+        if min_score is not None and min_score > word_score:
+            bound = (1.0 - (min_score - word_score) / weight) * longest
+            # Small epsilon so float error never rounds the bound down
+            max_edits = max(int(bound + 1e-9), 0)
+        distance = _levenshtein(name1, name2, max_edits)
+        basic_similarity = 1.0 - distance / longest
+
+        return min(1.0, weight * basic_similarity + word_score)
 
     def _create_canonical_name(self, company_name: str) -> str:
         """Create a canonical name from the input company name."""
@@ -295,34 +412,33 @@ class CompanyNormalizer:
         if not name:
             return name
 
-        # Split on common delimiters
-        parts = re.split(r"(\s+|[-_&/])", name)
-
-        result_parts = []
-        for part in parts:
-            if part.strip():
-                # Handle special cases
-                if part.lower() in ["of", "and", "the", "for", "in", "on", "at", "by"]:
-                    result_parts.append(part.lower())
-                elif part.upper() in ["LLC", "INC", "CORP", "LTD", "USA", "US", "UK"]:
-                    result_parts.append(part.upper())
-                else:
-                    result_parts.append(part.capitalize())
-            else:
-                result_parts.append(part)
-
-        return "".join(result_parts)
+        # Re-case each word in one pass, leaving delimiters untouched
+        return _WORD_RE.sub(_case_word, name)
 
     def _add_new_company(self, canonical_name: str, original_name: str) -> None:
         """Add a new company mapping."""
         mapping = CompanyMapping(canonical_name=canonical_name)
-        mapping.variations.add(original_name)
-        mapping.variations.add(canonical_name)
+        self._add_variation(mapping, original_name)
+        self._add_variation(mapping, canonical_name)
+        self._register_mapping(mapping)
 
-        self.company_mappings[canonical_name.lower()] = mapping
+    def _register_mapping(self, mapping: CompanyMapping) -> None:
+        """Index a mapping by its casefolded and normalized canonical name.
+
+        Keys are interned so the repeated dict lookups on the matching path
+        can compare by identity.
+        """
+        canonical = sys.intern(mapping.canonical_name)
+        mapping.canonical_name = canonical
+        self.company_mappings[sys.intern(canonical.casefold())] = mapping
         self.normalized_to_canonical[
-            self._normalize_name(canonical_name)
-        ] = canonical_name
+            sys.intern(self._normalize_name(canonical))
+        ] = canonical
+
+    def _add_variation(self, mapping: CompanyMapping, variation: str) -> None:
+        """Record a name variation on a mapping and in the exact-match index."""
+        mapping.variations.add(variation)
+        self._variation_index.setdefault(sys.intern(variation.casefold()), mapping)
 
     def _folder_name_to_company_name(self, folder_name: str) -> str:
         """Convert a folder name back to a readable company name."""
@@ -340,11 +456,10 @@ class CompanyNormalizer:
             return "Unknown"
 
         # Replace invalid characters
-        invalid_chars = r'[<>:"/\\|?*]'
-        name = re.sub(invalid_chars, "_", name)
+        name = _INVALID_CHARS_RE.sub("_", name)
 
         # Replace multiple spaces with single underscore
-        name = re.sub(r"\s+", "_", name)
+        name = _WHITESPACE_RE.sub("_", name)
 
         # Remove leading/trailing spaces and underscores
         name = name.strip("_").strip()
@@ -360,10 +475,11 @@ class CompanyNormalizer:
         return {
             "total_companies": len(self.company_mappings),
             "total_variations": total_variations,
-            "average_variations_per_company": total_variations
-            / len(self.company_mappings)
-            if self.company_mappings
-            else 0,
+            "average_variations_per_company": (
+                total_variations / len(self.company_mappings)
+                if self.company_mappings
+                else 0
+            ),
             "similarity_threshold": self.similarity_threshold,
         }
 
@@ -390,117 +506,173 @@ class CompanyNormalizer:
 
         # Find potential duplicates
         companies = list(self.company_mappings.values())
-        duplicates = []
+        normalized = [self._normalize_name(c.canonical_name) for c in companies]
 
-        for i, company1 in enumerate(companies):
-            for company2 in companies[i + 1 :]:
-                name1 = self._normalize_name(company1.canonical_name)
-                name2 = self._normalize_name(company2.canonical_name)
-                similarity = self._calculate_similarity(name1, name2)
+        # Union-find over similar pairs so chains like A~B, B~C become a
+        # single group and every folder is merged at most once
+        parent = list(range(len(companies)))
 
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for i in range(len(companies)):
+            for j in range(i + 1, len(companies)):
                 # Use higher threshold for auto-merging (more conservative)
-                if similarity > 0.85:
-                    duplicates.append(
-                        {
-                            "company1": company1,
-                            "company2": company2,
-                            "similarity": similarity,
-                        }
-                    )
-
-        if not duplicates:
+                similarity = self._calculate_similarity(
+                    normalized[i], normalized[j], _AUTO_MERGE_THRESHOLD
+                )
+                if similarity > _AUTO_MERGE_THRESHOLD:
+                    root_i, root_j = find(i), find(j)
+                    if root_i != root_j:
+                        parent[root_j] = root_i
+
+        groups: Dict[int, List[CompanyMapping]] = {}
+        for i, company in enumerate(companies):
+            groups.setdefault(find(i), []).append(company)
+        duplicate_groups = [group for group in groups.values() if len(group) > 1]
+
+        if not duplicate_groups:
             logger.debug("No duplicate company folders found")
             return
 
-        logger.info(f"Found {len(duplicates)} duplicate pairs to merge")
+        logger.info(f"Found {len(duplicate_groups)} groups of duplicates to merge")
 
         # Perform merges
         merged_count = 0
-        for dup in duplicates:
-            if self._merge_company_folders(dup["company1"], dup["company2"]):
-                merged_count += 1
+        for group in duplicate_groups:
+            merged_count += self._merge_company_group(group)
 
         if merged_count > 0:
             logger.info(f"Successfully merged {merged_count} duplicate company folders")
-            # Rescan companies after merging
-            self.company_mappings.clear()
-            self.normalized_to_canonical.clear()
-            self.scan_existing_companies(self.output_dir)
 
-    def _merge_company_folders(
-        self, company1: CompanyMapping, company2: CompanyMapping
-    ) -> bool:
-        """Merge two company folders.
+    def _merge_company_group(self, group: List[CompanyMapping]) -> int:
+        """Merge a group of duplicate company folders into one of them.
 
         Args:
-            company1: First company mapping
-            company2: Second company mapping
+            group: Mappings of companies considered duplicates of each other
 
         Returns:
-            True if merge was successful, False otherwise
+            Number of folders merged into the kept folder
         """
-        folder1 = self.output_dir / company1.folder_name
-        folder2 = self.output_dir / company2.folder_name
-
-        if not folder1.exists() or not folder2.exists():
-            logger.warning(
-                f"Cannot merge {company1.canonical_name} <-> {company2.canonical_name}: folder missing"
+        present = [c for c in group if (self.output_dir / c.folder_name).exists()]
+        if len(present) < 2:
+            names = " <-> ".join(c.canonical_name for c in group)
+            logger.warning(f"Cannot merge {names}: folder missing")
+            return 0
+
+        # Keep the folder with more files, or the one with shorter name as
+        # tiebreaker. Challengers are only counted until they pass the leader.
+        keep = present[0]
+        keep_count = self._count_pdfs(self.output_dir / keep.folder_name)
+        for company in present[1:]:
+            folder = self.output_dir / company.folder_name
+            count = self._count_pdfs(folder, limit=keep_count)
+            if count > keep_count:
+                keep, keep_count = company, self._count_pdfs(folder)
+            elif count == keep_count and len(company.canonical_name) < len(
+                keep.canonical_name
+            ):
+                keep = company
+
+        keep_folder = self.output_dir / keep.folder_name
+        merged = 0
+        for merge in present:
+            if merge is keep:
+                continue
+
+            merge_folder = self.output_dir / merge.folder_name
+            logger.info(
+                f"Merging '{merge.canonical_name}' into '{keep.canonical_name}'"
             )
-            return False
-
-        # Count files to decide which folder to keep
-        count1 = sum(1 for _ in folder1.rglob("*.pdf"))
-        count2 = sum(1 for _ in folder2.rglob("*.pdf"))
-
-        # Keep the folder with more files, or the one with shorter name as tiebreaker
-        if count1 > count2 or (
-            count1 == count2
-            and len(company1.canonical_name) <= len(company2.canonical_name)
-        ):
-            keep_folder, merge_folder = folder1, folder2
-            keep_name, merge_name = company1.canonical_name, company2.canonical_name
-        else:
-            keep_folder, merge_folder = folder2, folder1
-            keep_name, merge_name = company2.canonical_name, company1.canonical_name
 
-        logger.info(
-            f"Merging '{merge_name}' into '{keep_name}' ({count1 + count2} files total)"
-        )
+            try:
+                files_moved = self._move_folder_contents(merge_folder, keep_folder)
+                logger.info(
+                    f"Successfully merged {files_moved} files and removed {merge_folder.name}"
+                )
+            except Exception as e:
+                logger.error(
+                    f"Error merging {merge.canonical_name} into {keep.canonical_name}: {e}"
+                )
+                continue
 
-        try:
-            # Move all files from merge_folder to keep_folder
-            files_moved = 0
-            for item in merge_folder.rglob("*"):
-                if item.is_file():
-                    # Calculate relative path
-                    rel_path = item.relative_to(merge_folder)
-                    target_path = keep_folder / rel_path
-
-                    # Ensure target directory exists
-                    target_path.parent.mkdir(parents=True, exist_ok=True)
-
-                    # Handle filename conflicts
-                    if target_path.exists():
-                        stem = target_path.stem
-                        suffix = target_path.suffix
-                        counter = 1
-                        while target_path.exists():
-                            target_path = (
-                                target_path.parent / f"{stem}_{counter}{suffix}"
-                            )
-                            counter += 1
-
-                    # Move the file
-                    shutil.move(str(item), str(target_path))
-                    files_moved += 1
-
-            # Remove empty merge folder
-            shutil.rmtree(merge_folder)
-            logger.info(
-                f"Successfully merged {files_moved} files and removed {merge_folder.name}"
-            )
-            return True
+            self._absorb_mapping(keep, merge)
+            merged += 1
+
+        return merged
 
-        except Exception as e:
-            logger.error(f"Error merging {merge_name} into {keep_name}: {e}")
-            return False
+    @staticmethod
+    def _move_folder_contents(merge_folder: Path, keep_folder: Path) -> int:
+        """Move every file from one folder into another, then remove it.
+
+        Args:
+            merge_folder: Folder whose files are moved
+            keep_folder: Folder receiving the files
+
+        Returns:
+            Number of files moved
+        """
+        files_moved = 0
+        for item in merge_folder.rglob("*"):
+            if item.is_file():
+                # Calculate relative path
+                rel_path = item.relative_to(merge_folder)
+                target_path = keep_folder / rel_path
+
+                # Ensure target directory exists
+                target_path.parent.mkdir(parents=True, exist_ok=True)
+
+                # Handle filename conflicts
+                if target_path.exists():
+                    stem = target_path.stem
+                    suffix = target_path.suffix
+                    counter = 1
+                    while target_path.exists():
+                        target_path = target_path.parent / f"{stem}_{counter}{suffix}"
+                        counter += 1
+
+                # Move the file
+                shutil.move(str(item), str(target_path))
+                files_moved += 1
+
+        # Remove empty merge folder
+        shutil.rmtree(merge_folder)
+        return files_moved
+
+    def _absorb_mapping(self, keep: CompanyMapping, merge: CompanyMapping) -> None:
+        """Fold a merged company's mapping into the one that was kept."""
+        self.company_mappings.pop(merge.canonical_name.casefold(), None)
+        self.normalized_to_canonical[
+            sys.intern(self._normalize_name(merge.canonical_name))
+        ] = keep.canonical_name
+
+        for variation in merge.variations:
+            keep.variations.add(variation)
+            self._variation_index[sys.intern(variation.casefold())] = keep
+
+    @staticmethod
+    def _count_pdfs(root: Path, limit: Optional[int] = None) -> int:
+        """Count PDF files under a folder.
+
+        Args:
+            root: Folder to walk
+            limit: Stop walking once the count exceeds this value
+
+        Returns:
+            Number of PDFs found (at most limit + 1 when a limit is given)
+        """
+        count = 0
+        pending: List[str] = [os.fspath(root)]
+        while pending:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.name.endswith(".pdf"):
+                        count += 1
+                        if limit is not None and count > limit:
+                            return count
+        return count
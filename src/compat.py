@@ -0,0 +1,6 @@
+"""Shims for behaviour that differs between supported Python versions."""
+import sys
+from typing import Any, Dict
+
+# Slotted dataclasses (Python 3.10+) drop the per-instance __dict__
+DATACLASS_SLOTS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
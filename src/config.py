@@ -1,17 +1,71 @@
 """Configuration management for OCRganizer."""
 
+import copy
 import logging
 import os
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, Optional, Union
+from typing import Any, Callable, Dict, Optional, Tuple, Union
 
-import yaml
 from dotenv import load_dotenv
 
 logger = logging.getLogger(__name__)
 
 
+# Parsed config files keyed by (resolved path, mtime_ns, size)
+_YAML_CACHE: Dict[Tuple[str, int, int], Dict[str, Any]] = {}
+
+
+def _to_bool(value: str) -> bool:
+    """Interpret an environment variable as a boolean flag."""
+    return value.lower() in ("true", "1", "yes", "on")
+
+
+# Environment variable overrides: (variable, section, key, converter)
+_ENV_OVERRIDES: Tuple[Tuple[str, str, str, Callable[[str], Any]], ...] = (
+    # AI settings
+    ("OPENAI_MODEL", "ai", "openai_model", str),
+    ("ANTHROPIC_MODEL", "ai", "anthropic_model", str),
+    ("AI_PROVIDER", "ai", "preferred_provider", str),
+    ("AI_TEMPERATURE", "ai", "openai_temperature", float),
+    ("AI_MAX_TOKENS", "ai", "openai_max_tokens", int),
+    ("AI_RESPONSE_CACHE", "ai", "response_cache_path", str),
+    ("AI_BATCH_SIZE", "ai", "batch_size", int),
+    # File settings
+    ("INPUT_DIR", "files", "input_dir", str),
+    ("OUTPUT_DIR", "files", "output_dir", str),
+    ("MAX_FILE_SIZE_MB", "files", "max_file_size_mb", int),
+    ("COPY_MODE", "files", "copy_mode", _to_bool),
+    # Processing settings
+    ("ENABLE_OCR", "processing", "enable_ocr", _to_bool),
+    ("CONFIDENCE_THRESHOLD", "processing", "confidence_threshold", float),
+    ("MIN_TEXT_LENGTH", "processing", "min_text_length", int),
+    ("MAX_TEXT_FOR_AI", "processing", "max_text_for_ai", int),
+    # Web settings
+    ("PORT", "web", "port", int),
+    ("DEBUG", "web", "debug", _to_bool),
+    ("HOST", "web", "host", str),
+    # Organization settings
+    ("STRUCTURE_PATTERN", "organization", "structure_pattern", str),
+    ("FILENAME_PATTERN", "organization", "filename_pattern", str),
+    ("DATE_FORMAT", "organization", "date_format", str),
+)
+
+# Names used in warnings when a converter rejects a value
+_CONVERTER_NAMES: Dict[Callable[[str], Any], str] = {int: "integer", float: "float"}
+
+# AI credentials read by get_ai_credentials: (credential name, variable)
+_CREDENTIAL_ENV_VARS: Tuple[Tuple[str, str], ...] = (
+    ("openai_api_key", "OPENAI_API_KEY"),
+    ("openai_base_url", "OPENAI_BASE_URL"),
+    ("anthropic_api_key", "ANTHROPIC_API_KEY"),
+    ("local_model_name", "LOCAL_MODEL_NAME"),
+)
+
+# Whether .env has already been loaded into os.environ by this process
+_dotenv_loaded = False
+
+
 @dataclass
 class AIConfig:
     """AI provider configuration."""
@@ -23,6 +77,12 @@ class AIConfig:
     anthropic_model: str = "claude-3-haiku-20240307"
     anthropic_temperature: float = 0.3
     anthropic_max_tokens: int = 800
+    # SQLite file for caching AI responses across runs (disabled when unset)
+    response_cache_path: Optional[str] = None
+    # Documents the pipeline sends in one AI request (1 = one request each)
+    batch_size: int = 1
+    # Largest reply, in tokens, requested for a batch of documents
+    batch_max_tokens: int = 4000
 
 
 @dataclass
@@ -34,6 +94,7 @@ class OrganizationConfig:
     date_format: str = "%Y-%m-%d"
     enable_company_normalization: bool = True
     company_similarity_threshold: float = 0.75
+    max_history: int = 1000
 
 
 @dataclass
@@ -89,8 +150,11 @@ class AppConfig:
         Returns:
             AppConfig instance with loaded configuration
         """
-        # Load environment variables first
-        load_dotenv()
+        # Load environment variables first (once per process until reset)
+        global _dotenv_loaded
+        if not _dotenv_loaded:
+            load_dotenv()
+            _dotenv_loaded = True
 
         # Find config file
         if config_path is None:
@@ -99,8 +163,7 @@ class AppConfig:
         config_data = {}
         if config_path and Path(config_path).exists():
             try:
-                with open(config_path, "r") as f:
-                    config_data = yaml.safe_load(f) or {}
+                config_data = cls._read_config_file(config_path)
                 logger.info(f"Loaded configuration from {config_path}")
             except Exception as e:
                 logger.warning(f"Failed to load config from {config_path}: {e}")
@@ -121,6 +184,53 @@ class AppConfig:
             web=WebConfig(**config_data.get("web", {})),
         )
 
+    @classmethod
+    def reset(cls) -> None:
+        """Drop cached configuration state.
+
+        The next load re-reads .env and the YAML file, and get_config()
+        builds a new global instance.
+        """
+        global _config, _dotenv_loaded
+        _YAML_CACHE.clear()
+        _dotenv_loaded = False
+        _config = None
+
+    @staticmethod
+    def _read_config_file(config_path: Union[str, Path]) -> Dict[str, Any]:
+        """Parse a YAML config file, reusing the last parse if it is unchanged.
+
+        The cache is per process only. Parsed configs are deliberately not
+        persisted (e.g. as pickle sidecar files): the file is a few dozen lines
+        parsed by the C loader, and loading pickles from a writable config
+        directory would be a code execution risk.
+        """
+        try:
+            stat = os.stat(config_path)
+            cache_key: Optional[Tuple[str, int, int]] = (
+                str(Path(config_path).resolve()),
+                stat.st_mtime_ns,
+                stat.st_size,
+            )
+        except OSError:
+            cache_key = None
+
+        # Callers mutate the returned dict, so hand out copies of cached data
+        if cache_key in _YAML_CACHE:
+            return copy.deepcopy(_YAML_CACHE[cache_key])
+
+        # PyYAML is only needed once a config file is found, so import it here
+        import yaml
+
+        # Use libyaml's C loader when PyYAML was built with it
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        with open(config_path, "r") as f:
+            config_data = yaml.load(f, Loader=loader) or {}
+
+        if cache_key is not None:
+            _YAML_CACHE[cache_key] = copy.deepcopy(config_data)
+        return config_data
+
     @staticmethod
     def _create_ai_config(ai_data: Dict[str, Any]) -> AIConfig:
         """Create AIConfig from nested YAML structure."""
@@ -137,6 +247,9 @@ class AppConfig:
                 "temperature", 0.3
             ),
             "anthropic_max_tokens": ai_data.get("anthropic", {}).get("max_tokens", 800),
+            "response_cache_path": ai_data.get("response_cache_path"),
+            "batch_size": ai_data.get("batch_size", 1),
+            "batch_max_tokens": ai_data.get("batch_max_tokens", 4000),
         }
         return AIConfig(**config_dict)
 
@@ -162,83 +275,37 @@ class AppConfig:
     def _apply_env_overrides(config_data: Dict[str, Any]) -> Dict[str, Any]:
         """Apply environment variable overrides to configuration."""
         # Initialize nested dictionaries if they don't exist
-        for section in ["ai", "organization", "processing", "files", "web"]:
-            if section not in config_data:
-                config_data[section] = {}
-
-        # AI configuration overrides
-        env_mappings = {
-            # AI settings
-            "OPENAI_MODEL": ("ai", "openai_model"),
-            "ANTHROPIC_MODEL": ("ai", "anthropic_model"),
-            "AI_PROVIDER": ("ai", "preferred_provider"),
-            "AI_TEMPERATURE": ("ai", "openai_temperature"),
-            "AI_MAX_TOKENS": ("ai", "openai_max_tokens"),
-            # File settings
-            "INPUT_DIR": ("files", "input_dir"),
-            "OUTPUT_DIR": ("files", "output_dir"),
-            "MAX_FILE_SIZE_MB": ("files", "max_file_size_mb"),
-            "COPY_MODE": ("files", "copy_mode"),
-            # Processing settings
-            "ENABLE_OCR": ("processing", "enable_ocr"),
-            "CONFIDENCE_THRESHOLD": ("processing", "confidence_threshold"),
-            "MIN_TEXT_LENGTH": ("processing", "min_text_length"),
-            "MAX_TEXT_FOR_AI": ("processing", "max_text_for_ai"),
-            # Web settings
-            "PORT": ("web", "port"),
-            "DEBUG": ("web", "debug"),
-            "HOST": ("web", "host"),
-            # Organization settings
-            "STRUCTURE_PATTERN": ("organization", "structure_pattern"),
-            "FILENAME_PATTERN": ("organization", "filename_pattern"),
-            "DATE_FORMAT": ("organization", "date_format"),
-        }
+        for section in ("ai", "organization", "processing", "files", "web"):
+            config_data.setdefault(section, {})
 
-        for env_var, (section, key) in env_mappings.items():
-            value = os.getenv(env_var)
-            if value is not None:
-                # Type conversion based on the key
-                if key in [
-                    "port",
-                    "max_file_size_mb",
-                    "min_text_length",
-                    "max_text_for_ai",
-                    "openai_max_tokens",
-                    "anthropic_max_tokens",
-                ]:
-                    try:
-                        value = int(value)
-                    except ValueError:
-                        logger.warning(f"Invalid integer value for {env_var}: {value}")
-                        continue
-                elif key in [
-                    "openai_temperature",
-                    "anthropic_temperature",
-                    "confidence_threshold",
-                ]:
-                    try:
-                        value = float(value)
-                    except ValueError:
-                        logger.warning(f"Invalid float value for {env_var}: {value}")
-                        continue
-                elif key in ["debug", "enable_ocr", "copy_mode"]:
-                    value = value.lower() in ("true", "1", "yes", "on")
-
-                config_data[section][key] = value
-                logger.debug(
-                    f"Applied environment override: {env_var} -> {section}.{key} = {value}"
+        for env_var, section, key, converter in _ENV_OVERRIDES:
+            value = os.environ.get(env_var)
+            if value is None:
+                continue
+
+            try:
+                value = converter(value)
+            except ValueError:
+                logger.warning(
+                    f"Invalid {_CONVERTER_NAMES[converter]} value for {env_var}: {value}"
                 )
+                continue
+
+            config_data[section][key] = value
+            logger.debug(
+                f"Applied environment override: {env_var} -> {section}.{key} = {value}"
+            )
 
         return config_data
 
     def get_ai_credentials(self) -> Dict[str, Optional[str]]:
-        """Get AI provider credentials from environment variables."""
-        return {
-            "openai_api_key": os.getenv("OPENAI_API_KEY"),
-            "openai_base_url": os.getenv("OPENAI_BASE_URL"),
-            "anthropic_api_key": os.getenv("ANTHROPIC_API_KEY"),
-            "local_model_name": os.getenv("LOCAL_MODEL_NAME"),
-        }
+        """Get AI provider credentials from environment variables.
+
+        Not cached: the global config lives for the whole process and callers
+        expect credential changes in the environment to be picked up.
+        """
+        environ = os.environ
+        return {name: environ.get(env_var) for name, env_var in _CREDENTIAL_ENV_VARS}
 
     def validate(self) -> bool:
         """
@@ -261,6 +328,9 @@ class AppConfig:
                 f"Invalid Anthropic temperature: {self.ai.anthropic_temperature}"
             )
 
+        if self.ai.batch_size < 1:
+            errors.append(f"Invalid batch_size: {self.ai.batch_size}")
+
         # Validate processing settings
         if not (0.0 <= self.processing.confidence_threshold <= 1.0):
             errors.append(
@@ -353,6 +423,7 @@ def get_config() -> AppConfig:
 def reload_config(config_path: Optional[Union[str, Path]] = None) -> AppConfig:
     """Reload configuration from file."""
     global _config
+    AppConfig.reset()
     _config = AppConfig.load_from_file(config_path)
     if not _config.validate():
         logger.warning("Configuration validation failed, using defaults where possible")
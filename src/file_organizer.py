@@ -1,20 +1,84 @@
 """File organization module for organizing PDFs into structured directories."""
-import calendar
+import datetime
+import errno
 import logging
+import os
 import re
 import shutil
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Deque, Dict, List, NamedTuple, Optional, Set, Tuple
 
 from src.ai_analyzer import DocumentInfo
 from src.company_normalizer import CompanyNormalizer
 from src.pdf_processor import PDFDocument
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Characters that are not allowed in file or directory names, mapped to "_"
+_INVALID_CHARS_TABLE = str.maketrans(dict.fromkeys('<>:"/\\|?*', "_"))
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# English month names, indexed by month number (independent of locale)
+_MONTH_NAMES = (
+    "",
+    "January",
+    "February",
+    "March",
+    "April",
+    "May",
+    "June",
+    "July",
+    "August",
+    "September",
+    "October",
+    "November",
+    "December",
+)
+
+# Month folder names like "01 - January", indexed by month number
+_MONTH_FOLDERS = ("",) + tuple(
+    f"{month:02d} - {_MONTH_NAMES[month]}" for month in range(1, 13)
+)
+
+# Upper bound on threads used by batch_organize
+_MAX_BATCH_WORKERS = 32
+
+# Placeholders substituted in OrganizationStrategy.filename_pattern
+_FILENAME_PLACEHOLDERS = ("company", "type", "date")
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """Intern a repeated string such as a company name, passing None through."""
+    return sys.intern(value) if value else value
+
+
+@lru_cache(maxsize=1024)
+def _format_date(date_format: str, date: datetime.date) -> str:
+    """Format a date, reusing the result for documents that share a date."""
+    return date.strftime(date_format)
+
+
+class HistoryEntry(NamedTuple):
+    """An organized file, kept for undo and summaries.
+
+    Holds only the fields needed later, so the analyzed DocumentInfo (and its
+    text) can be freed once the file has been organized. Replaces the dicts
+    organization_history used to hold: read fields as attributes
+    (entry.new_path) rather than keys (entry["new_path"]).
+    """
+
+    original_path: Path
+    new_path: Path
+    company_name: Optional[str]
+    document_type: Optional[str]
+    date: Optional[datetime.date]
+
 
 @dataclass
 class OrganizationStrategy:
@@ -34,6 +98,7 @@ class FileOrganizer:
         strategy: Optional[OrganizationStrategy] = None,
         enable_company_normalization: bool = True,
         similarity_threshold: float = 0.8,
+        max_history: Optional[int] = None,
     ):
         """
         Initialize the file organizer.
@@ -43,6 +108,7 @@ class FileOrganizer:
             strategy: Organization strategy to use
             enable_company_normalization: Enable company name normalization
             similarity_threshold: Threshold for fuzzy company name matching (0.0-1.0)
+            max_history: Keep only the most recent history entries (None = all)
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -61,8 +127,56 @@ class FileOrganizer:
             self.company_normalizer = None
             logger.info("Company normalization disabled")
 
-        # Track organized files for potential undo
-        self.organization_history = []
+        # Raw company name -> (canonical name, folder), so repeat vendors in a
+        # batch skip fuzzy matching
+        self._company_cache: Dict[str, Tuple[str, str]] = {}
+
+        # Track organized files for potential undo; a deque so a long-running
+        # server can bound it with max_history
+        self.organization_history: Deque[HistoryEntry] = deque(maxlen=max_history)
+        self._organized_count = 0
+
+        # Directories known to exist, so repeat hits skip the mkdir syscalls
+        self._created_dirs: Set[Path] = {self.output_dir}
+
+        # Guards shared state when batch_organize runs files concurrently
+        self._lock = threading.Lock()
+        self._pending_paths: Set[Path] = set()
+
+    @property
+    def strategy(self) -> OrganizationStrategy:
+        """Organization strategy in use."""
+        return self._strategy
+
+    @strategy.setter
+    def strategy(self, strategy: OrganizationStrategy) -> None:
+        """Set the strategy and parse its structure pattern once."""
+        self._strategy = strategy
+        builders = {
+            "{company}": self._company_part,
+            "{year}": self._year_part,
+            "{month}": self._month_part,
+            "{day}": self._day_part,
+            "{type}": self._type_part,
+        }
+        pattern_parts = strategy.structure_pattern.split("/")
+        unknown_parts = [part for part in pattern_parts if part not in builders]
+        if unknown_parts:
+            logger.warning(
+                f"Ignoring unsupported parts {unknown_parts} in structure pattern "
+                f"'{strategy.structure_pattern}'"
+            )
+        # Parts without a placeholder are never rendered, so drop them here
+        self._structure_builders = tuple(
+            builders[part] for part in pattern_parts if part in builders
+        )
+
+        # Escape every brace, then re-open the supported placeholders, so the
+        # rest of the filename pattern stays literal text for format_map
+        template = strategy.filename_pattern.replace("{", "{{").replace("}", "}}")
+        for placeholder in _FILENAME_PLACEHOLDERS:
+            template = template.replace(f"{{{{{placeholder}}}}}", f"{{{placeholder}}}")
+        self._filename_template = template
 
     def organize_file(
         self, pdf_document: PDFDocument, doc_info: DocumentInfo, copy_file: bool = False
@@ -80,40 +194,89 @@ class FileOrganizer:
         """
         logger.info(f"Organizing file: {pdf_document.file_path}")
 
-        # Create directory structure
-        target_dir = self._create_directory_structure(doc_info)
+        # Pick the target under the lock so concurrent batch workers never
+        # normalize the same company twice or claim the same filename
+        with self._lock:
+            # Create directory structure
+            target_dir = self._create_directory_structure(doc_info)
 
-        # Generate filename
-        filename = self._generate_filename(doc_info)
+            # Generate filename
+            filename = self._generate_filename(doc_info)
 
-        # Ensure unique filename if file already exists
-        target_path = target_dir / filename
-        if target_path.exists():
-            target_path = self._ensure_unique_path(target_path)
+            # Ensure unique filename if file already exists
+            target_path = self._ensure_unique_path(target_dir / filename)
+            self._pending_paths.add(target_path)
 
         # Move or copy the file
         try:
-            if copy_file:
-                shutil.copy2(pdf_document.file_path, target_path)
-                logger.info(f"Copied file to: {target_path}")
-            else:
-                shutil.move(str(pdf_document.file_path), str(target_path))
-                logger.info(f"Moved file to: {target_path}")
+            try:
+                self._transfer_file(pdf_document.file_path, target_path, copy_file)
+            except FileNotFoundError:
+                if target_dir.is_dir():
+                    raise
+                # Removed behind our back since it was cached: recreate it
+                # and try once more
+                logger.warning(f"Target directory vanished, recreating: {target_dir}")
+                with self._lock:
+                    self._forget_directory(target_dir)
+                    self._ensure_directory(target_dir)
+                self._transfer_file(pdf_document.file_path, target_path, copy_file)
 
             # Track the organization
-            self.organization_history.append(
-                {
-                    "original_path": pdf_document.file_path,
-                    "new_path": target_path,
-                    "doc_info": doc_info,
-                }
-            )
+            with self._lock:
+                self.organization_history.append(
+                    HistoryEntry(
+                        original_path=pdf_document.file_path,
+                        new_path=target_path,
+                        company_name=_intern(doc_info.company_name),
+                        document_type=_intern(doc_info.document_type),
+                        date=doc_info.date,
+                    )
+                )
+                self._organized_count += 1
 
             return target_path
 
         except Exception as e:
             logger.error(f"Error organizing file {pdf_document.file_path}: {e}")
             raise
+        finally:
+            with self._lock:
+                self._pending_paths.discard(target_path)
+
+    @classmethod
+    def _transfer_file(cls, source: Path, target: Path, copy_file: bool) -> None:
+        """
+        Copy or move a file to its organized location.
+
+        Args:
+            source: File to organize
+            target: Destination path
+            copy_file: If True, copy file instead of moving
+        """
+        if copy_file:
+            shutil.copy2(source, target)
+            logger.info(f"Copied file to: {target}")
+        else:
+            cls._move_file(source, target)
+            logger.info(f"Moved file to: {target}")
+
+    @staticmethod
+    def _move_file(source: Path, target: Path) -> None:
+        """
+        Move a file, renaming it in place when source and target share a device.
+
+        Args:
+            source: File to move
+            target: Destination path
+        """
+        try:
+            # A single rename syscall, skipping shutil.move's extra checks
+            os.replace(source, target)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            shutil.move(str(source), str(target))
 
     def _format_month_folder(self, month: int) -> str:
         """
@@ -125,8 +288,39 @@ class FileOrganizer:
         Returns:
             Formatted month string
         """
-        month_name = calendar.month_name[month]
-        return f"{month:02d} - {month_name}"
+        return _MONTH_FOLDERS[month]
+
+    def _company_part(self, doc_info: DocumentInfo, company_folder: str) -> str:
+        """Folder name for the {company} placeholder."""
+        return company_folder
+
+    def _year_part(self, doc_info: DocumentInfo, company_folder: str) -> Optional[str]:
+        """Folder name for the {year} placeholder, if the year is known."""
+        if doc_info.date:
+            return str(doc_info.date.year)
+        if doc_info.year_month_only:
+            return str(doc_info.year_month_only[0])
+        if doc_info.year_only:
+            return str(doc_info.year_only)
+        return None
+
+    def _month_part(self, doc_info: DocumentInfo, company_folder: str) -> Optional[str]:
+        """Folder name for the {month} placeholder, if the month is known."""
+        if doc_info.date:
+            return self._format_month_folder(doc_info.date.month)
+        if doc_info.year_month_only:
+            return self._format_month_folder(doc_info.year_month_only[1])
+        return None
+
+    def _day_part(self, doc_info: DocumentInfo, company_folder: str) -> Optional[str]:
+        """Folder name for the {day} placeholder, if the day is known."""
+        if doc_info.date:
+            return f"{doc_info.date.day:02d}"
+        return None
+
+    def _type_part(self, doc_info: DocumentInfo, company_folder: str) -> str:
+        """Folder name for the {type} placeholder."""
+        return self._sanitize_dirname(doc_info.document_type or "document")
 
     def _create_directory_structure(self, doc_info: DocumentInfo) -> Path:
         """
@@ -141,49 +335,59 @@ class FileOrganizer:
         """
         # Normalize company name if normalization is enabled
         if self.enable_company_normalization and self.company_normalizer:
-            canonical_name = self.company_normalizer.normalize_company_name(
-                doc_info.company_name or "Unknown"
-            )
-            company_folder = self.company_normalizer.get_folder_name(canonical_name)
-            logger.debug(
-                f"Normalized '{doc_info.company_name}' -> '{canonical_name}' -> folder '{company_folder}'"
-            )
+            raw_name = doc_info.company_name or "Unknown"
+            cached = self._company_cache.get(raw_name)
+            if cached is None:
+                canonical_name = self.company_normalizer.normalize_company_name(
+                    raw_name
+                )
+                company_folder = self.company_normalizer.get_folder_name(canonical_name)
+                self._company_cache[raw_name] = (canonical_name, company_folder)
+                logger.debug(
+                    f"Normalized '{doc_info.company_name}' -> '{canonical_name}' -> folder '{company_folder}'"
+                )
+            else:
+                canonical_name, company_folder = cached
         else:
             company_folder = self._sanitize_dirname(doc_info.company_name or "Unknown")
 
-        # Build path based on strategy pattern
-        path_parts = []
-        pattern_parts = self.strategy.structure_pattern.split("/")
-        for part in pattern_parts:
-            if part == "{company}":
-                path_parts.append(company_folder)
-            elif part == "{year}" and doc_info.date:
-                path_parts.append(str(doc_info.date.year))
-            elif part == "{year}" and doc_info.year_month_only:
-                year, _ = doc_info.year_month_only
-                path_parts.append(str(year))
-            elif part == "{year}" and doc_info.year_only:
-                path_parts.append(str(doc_info.year_only))
-            elif part == "{month}" and doc_info.date:
-                path_parts.append(self._format_month_folder(doc_info.date.month))
-            elif part == "{month}" and doc_info.year_month_only:
-                _, month = doc_info.year_month_only
-                path_parts.append(self._format_month_folder(month))
-            elif part == "{day}" and doc_info.date:
-                path_parts.append(f"{doc_info.date.day:02d}")
-            elif part == "{type}":
-                path_parts.append(
-                    self._sanitize_dirname(doc_info.document_type or "document")
-                )
-            # Skip parts that don't have data available
-        # Create the full path
-        target_dir = self.output_dir
-        for part in path_parts:
-            target_dir = target_dir / part
-
-        target_dir.mkdir(parents=True, exist_ok=True)
+        # Build the full path from the pre-parsed strategy pattern, skipping
+        # parts that don't have data available
+        parts = [build(doc_info, company_folder) for build in self._structure_builders]
+        target_dir = self.output_dir.joinpath(*filter(None, parts))
+        self._ensure_directory(target_dir)
         return target_dir
 
+    def _ensure_directory(self, directory: Path) -> None:
+        """
+        Create a directory unless it is already known to exist.
+
+        Args:
+            directory: Directory to create
+        """
+        if directory in self._created_dirs:
+            return
+        directory.mkdir(parents=True, exist_ok=True)
+        self._created_dirs.add(directory)
+        # Intermediate folders now exist too, so siblings can skip mkdir
+        for parent in directory.parents:
+            if parent in self._created_dirs:
+                break
+            self._created_dirs.add(parent)
+
+    def _forget_directory(self, directory: Path) -> None:
+        """
+        Drop a directory and its ancestors from the known-to-exist cache.
+
+        Args:
+            directory: Directory that no longer exists
+        """
+        # Any ancestor may have been removed with it
+        for path in (directory, *directory.parents):
+            if path == self.output_dir:
+                break
+            self._created_dirs.discard(path)
+
     def _generate_filename(
         self, doc_info: DocumentInfo, use_suggested: bool = False
     ) -> str:
@@ -200,27 +404,17 @@ class FileOrganizer:
         if use_suggested and doc_info.suggested_name:
             filename = self._sanitize_filename(doc_info.suggested_name)
         else:
-            # Use the filename pattern
-            pattern = self.strategy.filename_pattern
-
-            replacements = {
-                "{company}": self._sanitize_filename(
-                    doc_info.company_name or "Unknown"
+            # Fill the template built from the filename pattern in one pass
+            values = {
+                "company": self._sanitize_filename(doc_info.company_name or "Unknown"),
+                "type": self._sanitize_filename(doc_info.document_type or "document"),
+                "date": (
+                    _format_date(self.strategy.date_format, doc_info.date)
+                    if doc_info.date
+                    else "Unknown_Date"
                 ),
-                "{type}": self._sanitize_filename(doc_info.document_type or "document"),
             }
-
-            if doc_info.date:
-                replacements["{date}"] = doc_info.date.strftime(
-                    self.strategy.date_format
-                )
-            else:
-                replacements["{date}"] = "Unknown_Date"
-
-            filename = pattern
-            for placeholder, value in replacements.items():
-                filename = filename.replace(placeholder, value)
-
+            filename = self._filename_template.format_map(values)
             filename = self._sanitize_filename(filename)
 
         # Ensure .pdf extension
@@ -247,11 +441,10 @@ class FileOrganizer:
             filename = filename[:-4]
 
         # Replace invalid characters with underscores
-        invalid_chars = r'[<>:"/\\|?*]'
-        filename = re.sub(invalid_chars, "_", filename)
+        filename = filename.translate(_INVALID_CHARS_TABLE)
 
         # Replace multiple spaces with single underscore
-        filename = re.sub(r"\s+", "_", filename)
+        filename = _WHITESPACE_RE.sub("_", filename)
 
         # Remove leading/trailing spaces and underscores
         filename = filename.strip("_").strip()
@@ -280,11 +473,10 @@ class FileOrganizer:
             return "Unknown"
 
         # Replace invalid characters
-        invalid_chars = r'[<>:"/\\|?*]'
-        dirname = re.sub(invalid_chars, "_", dirname)
+        dirname = dirname.translate(_INVALID_CHARS_TABLE)
 
         # Replace multiple spaces with single underscore
-        dirname = re.sub(r"\s+", "_", dirname)
+        dirname = _WHITESPACE_RE.sub("_", dirname)
 
         # Remove leading/trailing spaces and underscores
         dirname = dirname.strip("_").strip()
@@ -305,25 +497,34 @@ class FileOrganizer:
         Returns:
             Unique path
         """
-        if not path.exists():
-            return path
-
         base = path.stem
         extension = path.suffix
         parent = path.parent
-        counter = 1
 
-        while True:
-            new_path = parent / f"{base}_{counter}{extension}"
-            if not new_path.exists():
-                return new_path
+        # Names are compared case-folded: on case-insensitive filesystems
+        # (macOS, Windows) Invoice.pdf and invoice.pdf are the same file, and
+        # os.replace would silently overwrite it
+        pending = {p.name.casefold() for p in self._pending_paths if p.parent == parent}
+        if path.name.casefold() not in pending and not path.exists():
+            return path
+
+        # One directory listing instead of an exists() probe per counter,
+        # plus names claimed by moves still in flight
+        with os.scandir(parent) as entries:
+            existing = {entry.name.casefold() for entry in entries}
+        existing.update(pending)
+
+        counter = 1
+        while f"{base}_{counter}{extension}".casefold() in existing:
             counter += 1
+        return parent / f"{base}_{counter}{extension}"
 
     def batch_organize(
         self,
         documents: List[PDFDocument],
         doc_infos: List[DocumentInfo],
         copy_files: bool = False,
+        max_workers: Optional[int] = None,
     ) -> List[Dict[str, Any]]:
         """
         Organize multiple PDF files.
@@ -332,6 +533,8 @@ class FileOrganizer:
             documents: List of PDFDocument objects
             doc_infos: List of corresponding DocumentInfo objects
             copy_files: If True, copy files instead of moving
+            max_workers: Maximum number of files moved at once (defaults to one
+                per document, up to 32)
 
         Returns:
             List of organization results
@@ -339,11 +542,22 @@ class FileOrganizer:
         if len(documents) != len(doc_infos):
             raise ValueError("Documents and doc_infos lists must have the same length")
 
+        if not documents:
+            return []
+
+        # Moves and copies are I/O bound, so run them on a small thread pool
+        workers = min(max_workers or _MAX_BATCH_WORKERS, len(documents))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(self.organize_file, document, doc_info, copy_files)
+                for document, doc_info in zip(documents, doc_infos)
+            ]
+
         results = []
 
-        for document, doc_info in zip(documents, doc_infos):
+        for document, doc_info, future in zip(documents, doc_infos, futures):
             try:
-                new_path = self.organize_file(document, doc_info, copy_files)
+                new_path = future.result()
                 results.append(
                     {
                         "original_path": str(document.file_path),
@@ -393,28 +607,27 @@ class FileOrganizer:
         logger.info(f"Restored file from {organized_path} to {original_path}")
         return original_path
 
-    def _cleanup_empty_directories(self, directory: Path):
+    def _cleanup_empty_directories(self, directory: Path) -> None:
         """
         Remove empty directories up to the output directory.
 
         Args:
             directory: Directory to check and potentially remove
         """
-        try:
-            # Don't remove the output directory itself
-            if directory == self.output_dir:
-                return
-
-            # Check if directory is empty
-            if directory.exists() and not any(directory.iterdir()):
+        # Don't remove the output directory itself
+        while directory != self.output_dir:
+            try:
+                # rmdir fails on non-empty or missing directories, which
+                # replaces a separate exists()/iterdir() probe per level
                 directory.rmdir()
-                logger.info(f"Removed empty directory: {directory}")
+            except OSError as e:
+                if e.errno not in (errno.ENOENT, errno.ENOTEMPTY, errno.EEXIST):
+                    logger.warning(f"Could not remove directory {directory}: {e}")
+                return
 
-                # Recursively check parent
-                if directory.parent != self.output_dir:
-                    self._cleanup_empty_directories(directory.parent)
-        except Exception as e:
-            logger.warning(f"Could not remove directory {directory}: {e}")
+            self._created_dirs.discard(directory)
+            logger.info(f"Removed empty directory: {directory}")
+            directory = directory.parent
 
     def get_organization_summary(self) -> Dict[str, Any]:
         """
@@ -423,15 +636,15 @@ class FileOrganizer:
         Returns:
             Dictionary with organization statistics
         """
-        total = len(self.organization_history)
+        total = self._organized_count
         companies = set()
         doc_types = set()
 
         for entry in self.organization_history:
-            if entry["doc_info"].company_name:
-                companies.add(entry["doc_info"].company_name)
-            if entry["doc_info"].document_type:
-                doc_types.add(entry["doc_info"].document_type)
+            if entry.company_name:
+                companies.add(entry.company_name)
+            if entry.document_type:
+                doc_types.add(entry.document_type)
 
         summary = {
             "total_organized": total,
@@ -1,94 +1,330 @@
 """Direct HTTP client for LM Studio when OpenAI compatibility doesn't work."""
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.response_cache import MemoryResponseCache, ResponseCache
 
 logger = logging.getLogger(__name__)
 
+# Fallback completion endpoints probed when /api/generate doesn't answer
+_ALTERNATIVE_ENDPOINTS = (
+    "/v1/completions",
+    "/completions",
+    "/api/v1/generate",
+    "/generate",
+)
+
+# Most prompts sent in one /v1/completions request by generate_responses
+_MAX_BATCH = 32
+
+# Sent with every request, so answers from any endpoint end at the same place
+# and can share a cache entry. Only role markers: a blank line is valid inside
+# pretty-printed JSON answers and must not cut them short
+_STOP_SEQUENCES = ("Human:", "User:")
+
 
 class LMStudioClient:
     """Direct HTTP client for LM Studio."""
 
-    def __init__(self, base_url: str, model_name: str):
-        """Initialize LM Studio client."""
-        self.base_url = base_url.rstrip("/v1").rstrip("/")
+    def __init__(
+        self,
+        base_url: str,
+        model_name: str,
+        *,
+        connect_timeout: float = 3.0,
+        read_timeout: float = 30.0,
+        max_retries: int = 2,
+        max_tokens: int = 500,
+        temperature: float = 0.3,
+        cache: Optional[Union[ResponseCache, MemoryResponseCache]] = None,
+    ):
+        """
+        Initialize LM Studio client.
+
+        Args:
+            base_url: Server URL, with or without the /v1 suffix
+            model_name: Model to request completions from
+            connect_timeout: Seconds to wait for a connection to the server
+            read_timeout: Seconds to wait for a generated response
+            max_retries: Retries for refused connections and 502/503/504 replies
+            max_tokens: Maximum tokens to generate per response
+            temperature: Sampling temperature
+            cache: Cache for identical requests (defaults to an in-process
+                MemoryResponseCache; pass a ResponseCache to persist answers)
+        """
+        # Drop the OpenAI-style /v1 suffix; the native endpoints live at the root
+        self.base_url = base_url.rstrip("/").removesuffix("/v1").rstrip("/")
         self.model_name = model_name
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.cache = cache if cache is not None else MemoryResponseCache()
+
+        # Request bodies without the prompt, built once and reused per request:
+        # one for /api/generate and batches, and the formats tried on the other
+        # endpoints. All share the same generation settings.
+        settings = {
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "stop": list(_STOP_SEQUENCES),
+        }
+        self._generate_template: Dict[str, Any] = {"model": model_name, **settings}
+        self._probe_templates: Tuple[Dict[str, Any], ...] = (
+            self._generate_template,
+            settings,
+        )
+
+        # (url, payload without prompt) of the endpoint that last answered
+        self._working_endpoint: Optional[Tuple[str, Dict[str, Any]]] = None
+        # Held while looking for a working endpoint, so concurrent requests
+        # probe one at a time and reuse what the first one found
+        self._probe_lock = threading.Lock()
+        # Cleared once the server rejects a prompt array, so later batches
+        # go straight to one request per prompt
+        self._batch_supported = True
+
+        # Reuse keep-alive connections across requests and endpoint probes.
+        # Read timeouts are not retried, as the server may still be generating.
+        retry = Retry(
+            total=max_retries,
+            read=0,
+            backoff_factor=0.2,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"POST"}),
+            raise_on_status=False,
+        )
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
 
     def generate_response(self, prompt: str) -> str:
         """Generate response using LM Studio's direct API."""
-        try:
-            # Try the generate endpoint first
-            url = f"{self.base_url}/api/generate"
+        # Identical requests (same model, prompt and settings) reuse the answer
+        cache_key = self._cache_key(prompt)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            logger.info("Using cached LM Studio response")
+            return cached
 
-            payload = {
-                "model": self.model_name,
-                "prompt": prompt,
-                "max_tokens": 500,
-                "temperature": 0.3,
-                "stop": ["Human:", "User:", "\n\n"],
-            }
+        response = self._request_response(prompt)
+        if response:
+            self.cache.set(cache_key, response)
+        return response
 
-            logger.info(f"Sending request to {url}")
-            response = requests.post(url, json=payload, timeout=30)
+    def generate_responses(
+        self, prompts: List[str], max_workers: int = 4, max_batch: int = _MAX_BATCH
+    ) -> List[str]:
+        """
+        Generate responses for several prompts.
 
-            if response.status_code == 200:
-                data = response.json()
-                if "response" in data:
-                    return data["response"]
-                elif "text" in data:
-                    return data["text"]
-                elif "choices" in data and data["choices"]:
-                    return data["choices"][0].get("text", "")
+        Uncached prompts are sent to /v1/completions as a prompt array, up to
+        max_batch per request, so the server can batch the generation. If the
+        server doesn't accept prompt arrays, each prompt gets its own request
+        with up to max_workers overlapping.
+
+        Args:
+            prompts: Prompts to send
+            max_workers: Maximum number of per-prompt requests in flight at once
+            max_batch: Maximum prompts sent in one batched request
+
+        Returns:
+            One response per prompt, in input order ("" for failed requests)
+        """
+        if not prompts:
+            return []
 
-            # Try alternative endpoints
-            return self._try_alternative_endpoints(prompt)
+        cache_keys = [self._cache_key(prompt) for prompt in prompts]
+        responses: List[Optional[str]] = [self.cache.get(key) for key in cache_keys]
+        pending = [i for i, response in enumerate(responses) if response is None]
+
+        for start in range(0, len(pending), max(1, max_batch)):
+            if not self._batch_supported:
+                break
+            chunk = pending[start : start + max(1, max_batch)]
+            texts = self._request_batch([prompts[i] for i in chunk])
+            if texts is None:
+                self._batch_supported = False
+                break
+            for i, text in zip(chunk, texts):
+                responses[i] = text
+                if text:
+                    self.cache.set(cache_keys[i], text)
+
+        remaining = [i for i, response in enumerate(responses) if response is None]
+        if remaining:
+            # The session's connection pool holds up to 16 keep-alive connections
+            workers = min(max_workers, len(remaining))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                answers = executor.map(
+                    self.generate_response, [prompts[i] for i in remaining]
+                )
+                for i, answer in zip(remaining, answers):
+                    responses[i] = answer
+
+        return [response or "" for response in responses]
+
+    def _cache_key(self, prompt: str) -> str:
+        """Cache key for a prompt under this client's model and settings."""
+        return ResponseCache.make_key(
+            self.model_name, prompt, self.max_tokens, self.temperature, _STOP_SEQUENCES
+        )
+
+    def _request_batch(self, prompts: List[str]) -> Optional[List[str]]:
+        """Send prompts in one /v1/completions request.
+
+        Returns:
+            One text per prompt, in input order, or None if the server didn't
+            answer with a choice for every prompt
+        """
+        url = f"{self.base_url}/v1/completions"
+        payload = {**self._generate_template, "prompt": prompts}
+        try:
+            logger.info(f"Sending {len(prompts)} prompts to {url}")
+            response = self.session.post(url, json=payload, timeout=self.timeout)
+            if response.status_code != 200:
+                return None
+            choices = response.json().get("choices") or []
+            # Choices may arrive in any order; "index" ties each to its prompt
+            texts = {choice.get("index"): choice.get("text") for choice in choices}
+            if set(texts) != set(range(len(prompts))) or None in texts.values():
+                return None
+            return [texts[i] for i in range(len(prompts))]
+        except (requests.RequestException, ValueError, AttributeError) as e:
+            logger.debug(f"Batched request to {url} failed: {e}")
+            return None
+
+    def _request_response(self, prompt: str) -> str:
+        """Request a response from the server, falling back across endpoints."""
+        try:
+            # Go straight to the endpoint that answered last time
+            endpoint = self._working_endpoint
+            if endpoint is not None:
+                text = self._post_endpoint(endpoint, prompt)
+                if text is not None:
+                    return text
+                logger.info("Remembered LM Studio endpoint failed, probing again")
+
+            with self._probe_lock:
+                current = self._working_endpoint
+                if current is not None and current is not endpoint:
+                    # Another request found an endpoint while this one waited
+                    text = self._post_endpoint(current, prompt)
+                    if text is not None:
+                        return text
+                self._working_endpoint = None
+                return self._probe_endpoints(prompt)
 
         except Exception as e:
             logger.error(f"LM Studio direct API error: {e}")
             return ""
 
+    def _probe_endpoints(self, prompt: str) -> str:
+        """Find an endpoint that answers the prompt, remembering it.
+
+        Called with the probe lock held. A server that can't be reached fails
+        the /api/generate request, so the alternatives are only tried on a
+        server that is up.
+        """
+        # Try the generate endpoint first
+        url = f"{self.base_url}/api/generate"
+
+        payload = {**self._generate_template, "prompt": prompt}
+
+        logger.info(f"Sending request to {url}")
+        response = self.session.post(url, json=payload, timeout=self.timeout)
+
+        if response.status_code == 200:
+            text = self._parse_completion(response.json())
+            if text is not None:
+                self._working_endpoint = (url, self._generate_template)
+                return text
+
+        # Try alternative endpoints
+        return self._try_alternative_endpoints(prompt)
+
     def _try_alternative_endpoints(self, prompt: str) -> str:
-        """Try alternative LM Studio endpoints."""
-        endpoints = ["/v1/completions", "/completions", "/api/v1/generate", "/generate"]
-
-        for endpoint in endpoints:
-            try:
-                url = f"{self.base_url}{endpoint}"
-
-                # Try different payload formats
-                payloads = [
-                    {
-                        "model": self.model_name,
-                        "prompt": prompt,
-                        "max_tokens": 500,
-                        "temperature": 0.3,
-                    },
-                    {"prompt": prompt, "max_tokens": 500, "temperature": 0.3},
-                ]
-
-                for payload in payloads:
-                    logger.info(f"Trying endpoint: {url}")
-                    response = requests.post(url, json=payload, timeout=30)
-
-                    if response.status_code == 200:
-                        data = response.json()
-
-                        # Try different response formats
-                        if "choices" in data and data["choices"]:
-                            choice = data["choices"][0]
-                            if "text" in choice:
-                                return choice["text"]
-                            elif "message" in choice and "content" in choice["message"]:
-                                return choice["message"]["content"]
-
-                        if "response" in data:
-                            return data["response"]
-
-                        if "text" in data:
-                            return data["text"]
-
-            except Exception as e:
-                logger.debug(f"Endpoint {endpoint} failed: {e}")
-                continue
+        """Try alternative LM Studio endpoints one at a time.
+
+        Several of them generate on LM Studio, so probing them at once would
+        run the same completion several times over. A server that stops
+        responding ends the search instead of costing a timeout per endpoint.
+        """
+        try:
+            for endpoint in _ALTERNATIVE_ENDPOINTS:
+                text = self._probe_endpoint(endpoint, prompt)
+                if text is not None:
+                    return text
+        except (requests.ConnectionError, requests.Timeout) as e:
+            logger.warning(f"LM Studio stopped responding while probing: {e}")
 
         return ""
+
+    def _probe_endpoint(self, endpoint: str, prompt: str) -> Optional[str]:
+        """Try one endpoint with each payload format, returning text on success.
+
+        Raises:
+            requests.ConnectionError, requests.Timeout: If the server stopped
+                responding
+        """
+        url = f"{self.base_url}{endpoint}"
+
+        try:
+            # Try different payload formats
+            for template in self._probe_templates:
+                logger.info(f"Trying endpoint: {url}")
+                response = self.session.post(
+                    url, json={**template, "prompt": prompt}, timeout=self.timeout
+                )
+
+                if response.status_code == 200:
+                    text = self._parse_completion(response.json())
+                    if text is not None:
+                        self._working_endpoint = (url, template)
+                        return text
+
+        except (requests.ConnectionError, requests.Timeout):
+            raise
+        except Exception as e:
+            logger.debug(f"Endpoint {endpoint} failed: {e}")
+
+        return None
+
+    def _post_endpoint(
+        self, endpoint: Tuple[str, Dict[str, Any]], prompt: str
+    ) -> Optional[str]:
+        """Send the prompt to a known endpoint, returning None on failure."""
+        url, template = endpoint
+        try:
+            response = self.session.post(
+                url, json={**template, "prompt": prompt}, timeout=self.timeout
+            )
+            if response.status_code == 200:
+                return self._parse_completion(response.json())
+        except requests.RequestException as e:
+            logger.debug(f"Endpoint {url} failed: {e}")
+        return None
+
+    @staticmethod
+    def _parse_completion(data: Dict[str, Any]) -> Optional[str]:
+        """Extract the generated text from any of the known response formats."""
+        if "choices" in data and data["choices"]:
+            choice = data["choices"][0]
+            if "text" in choice:
+                return choice["text"]
+            elif "message" in choice and "content" in choice["message"]:
+                return choice["message"]["content"]
+
+        if "response" in data:
+            return data["response"]
+
+        if "text" in data:
+            return data["text"]
+
+        return None
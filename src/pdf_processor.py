@@ -1,19 +1,56 @@
 """PDF processing module for extracting text and metadata from PDF files."""
+import copy
 import datetime
+import importlib
+import io
+import itertools
 import logging
-from dataclasses import asdict, dataclass
+import os
+import queue
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-import pdfplumber
 import pypdf
-import pytesseract
-from pdf2image import convert_from_path
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
+from src.compat import DATACLASS_SLOTS
+
+try:
+    import tesserocr
+except ImportError:  # pragma: no cover - optional speedup
+    tesserocr = None
+
 logger = logging.getLogger(__name__)
 
+# Fallback and OCR dependencies, imported on first use because they are slow
+# to import and most documents never need them. Maps each module attribute to
+# the module it comes from and, for single functions, the function's name.
+_LAZY_IMPORTS = {
+    "pdfplumber": ("pdfplumber", None),
+    "pytesseract": ("pytesseract", None),
+    "convert_from_path": ("pdf2image", "convert_from_path"),
+}
+
+# This module, so lazy dependencies are looked up as module attributes and
+# tests can keep patching e.g. src.pdf_processor.convert_from_path
+_this = sys.modules[__name__]
+
+# Pages with less extracted text than this are treated as scanned images
+_MIN_PAGE_TEXT_LENGTH = 20
+
+# Idle in-process tesseract engines, when tesserocr is installed. Engines are
+# borrowed for a page and handed back, so they outlive the thread pool of any
+# one document and the language model loads once per concurrent OCR call
+_tesseract_engines: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+
+# Error message fragments that identify font/CMap encoding problems
+_ENCODING_ERROR_MARKERS = ("encoding", "90ms-rksj")
+
 # Suppress specific pypdf encoding warnings that we handle gracefully
 pypdf_logger = logging.getLogger("pypdf._cmap")
 pypdf_logger.setLevel(
@@ -21,7 +58,85 @@ pypdf_logger.setLevel(
 )  # Only show critical errors, not encoding warnings
 
 
-@dataclass
+def __getattr__(name: str) -> Any:
+    """Import a lazy dependency on first access and keep it as a module global."""
+    try:
+        module_name, attribute = _LAZY_IMPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = importlib.import_module(module_name)
+    if attribute is not None:
+        value = getattr(value, attribute)
+    globals()[name] = value
+    return value
+
+
+def _page_ranges(pages: List[int]) -> List[Tuple[int, int]]:
+    """Group page numbers into (first, last) runs of consecutive pages."""
+    ranges: List[Tuple[int, int]] = []
+    for page in sorted(pages):
+        if ranges and page == ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], page)
+        else:
+            ranges.append((page, page))
+    return ranges
+
+
+def _is_encoding_error(error: Exception) -> bool:
+    """Whether a text extraction error was caused by an unsupported encoding."""
+    if isinstance(error, UnicodeError):
+        return True
+    error_msg = str(error).lower()
+    return any(marker in error_msg for marker in _ENCODING_ERROR_MARKERS)
+
+
+def _ocr_workers() -> int:
+    """Number of pages to rasterize or OCR at once.
+
+    Defaults to the CPU count. The OCR_CONCURRENCY environment variable
+    overrides it, e.g. to leave cores free on a shared machine.
+    """
+    value = os.environ.get("OCR_CONCURRENCY")
+    if value:
+        try:
+            return max(1, int(value))
+        except ValueError:
+            logger.warning(f"Invalid integer value for OCR_CONCURRENCY: {value}")
+    return os.cpu_count() or 1
+
+
+def _tesserocr_image_to_string(image: Any) -> str:
+    """
+    Run OCR with an idle tesserocr engine, creating one if none is free.
+
+    The engine keeps its language model loaded between pages and documents,
+    unlike pytesseract, which starts a tesseract process for every page.
+
+    Args:
+        image: Page image or path to an image file
+
+    Returns:
+        Recognized text
+    """
+    try:
+        api = _tesseract_engines.get_nowait()
+    except queue.Empty:
+        # Page segmentation mode 6: a single uniform block of text
+        api = tesserocr.PyTessBaseAPI(psm=tesserocr.PSM.SINGLE_BLOCK)
+
+    # An engine is used by one thread at a time, then returned for reuse
+    try:
+        if isinstance(image, (str, os.PathLike)):
+            api.SetImageFile(os.fspath(image))
+        else:
+            api.SetImage(image)
+        text: str = api.GetUTF8Text()
+        return text
+    finally:
+        _tesseract_engines.put(api)
+
+
+@dataclass(**DATACLASS_SLOTS)
 class PDFDocument:
     """Data class representing a processed PDF document."""
 
@@ -35,43 +150,104 @@ class PDFDocument:
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert PDFDocument to dictionary."""
-        data = asdict(self)
-        data["file_path"] = str(self.file_path)
-        if self.extracted_date:
-            data["extracted_date"] = self.extracted_date.isoformat()
-        return data
+        # Built by hand: asdict() recursively deep-copies the metadata dict
+        return {
+            "file_path": str(self.file_path),
+            "text_content": self.text_content,
+            "metadata": dict(self.metadata),
+            "extracted_date": (
+                self.extracted_date.isoformat() if self.extracted_date else None
+            ),
+            "company_name": self.company_name,
+            "document_type": self.document_type,
+            "suggested_name": self.suggested_name,
+        }
+
+
+@contextmanager
+def _pdf_reader(
+    pdf_path: Path, reader: Optional[pypdf.PdfReader] = None
+) -> Iterator[pypdf.PdfReader]:
+    """Yield the given reader, or open the file with pypdf for the block."""
+    if reader is not None:
+        yield reader
+        return
+
+    with open(pdf_path, "rb") as file:
+        yield pypdf.PdfReader(file)
 
 
 class PDFProcessor:
     """Handles PDF file processing, text extraction, and metadata extraction."""
 
-    def __init__(self):
-        """Initialize the PDF processor."""
-        self.supported_extensions = [".pdf"]
+    def __init__(
+        self,
+        ocr_dpi: int = 200,
+        ocr_max_width: int = 2000,
+        ocr_workers: Optional[int] = None,
+    ):
+        """
+        Initialize the PDF processor.
 
-    def extract_text(self, pdf_path: Path) -> str:
+        Args:
+            ocr_dpi: Resolution pages are rendered at for OCR
+            ocr_max_width: Widest page image, in pixels, rendered for OCR;
+                larger pages are rendered below ocr_dpi to fit
+            ocr_workers: Pages of a document to rasterize or OCR at once
+                (defaults to OCR_CONCURRENCY or the CPU count)
         """
-        Extract text from a PDF file using pypdf with robust encoding error handling.
+        self.supported_extensions = [".pdf"]
+        self.ocr_dpi = ocr_dpi
+        self.ocr_max_width = ocr_max_width
+        self.ocr_workers = ocr_workers
+
+    def extract_text(
+        self,
+        pdf_path: Path,
+        reader: Optional[pypdf.PdfReader] = None,
+        page_texts: Optional[List[str]] = None,
+        data: Optional[bytes] = None,
+        page_widths: Optional[List[float]] = None,
+    ) -> str:
+        """
+        Extract text from a PDF file using PyMuPDF, falling back to pypdf and
+        pdfplumber when PyMuPDF is missing or can't read the file.
 
         Args:
             pdf_path: Path to the PDF file
+            reader: Already opened pypdf reader for the file, to avoid
+                re-parsing it if the pypdf fallback is needed
+            page_texts: Optional list that receives each page's text
+                ("" for pages without text)
+            data: The file's contents, if already read, so PyMuPDF parses
+                them from memory instead of reading the file again
+            page_widths: Optional list that receives each page's width in
+                points, when PyMuPDF can read the file
 
         Returns:
             Extracted text content
         """
+        # PyMuPDF's C parser is much faster than the pure Python extractors
+        fitz_page_texts = self._extract_text_with_pymupdf(pdf_path, data, page_widths)
+        text = "\n".join(page_text for page_text in fitz_page_texts if page_text)
+        # If PyMuPDF read the pages but found no text, they are scanned images
+        # that pypdf and pdfplumber can't read either, so leave them to OCR
+        if fitz_page_texts:
+            if page_texts is not None:
+                page_texts.extend(fitz_page_texts)
+            return text.strip()
+
         try:
-            text = ""
-            with open(pdf_path, "rb") as file:
-                pdf_reader = pypdf.PdfReader(file)
+            pypdf_page_texts: List[str] = []
+            with _pdf_reader(pdf_path, reader) as pdf_reader:
+                # Collect each page's text in a single pass over the pages
                 for page_num, page in enumerate(pdf_reader.pages):
+                    page_text = ""
                     try:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text += page_text + "\n"
+                        page_text = page.extract_text() or ""
                     except Exception as e:
                         # Handle specific encoding errors gracefully
-                        error_msg = str(e).lower()
-                        if "encoding" in error_msg or "90ms-rksj" in error_msg:
+                        if _is_encoding_error(e):
                             logger.warning(
                                 f"Encoding error on page {page_num} of {pdf_path.name}: {e}"
                             )
@@ -81,11 +257,10 @@ class PDFProcessor:
                             # Try to extract with error handling
                             try:
                                 # Attempt to get text with encoding fallback
-                                page_text = self._extract_text_with_encoding_fallback(
-                                    page
+                                page_text = (
+                                    self._extract_text_with_encoding_fallback(page)
+                                    or ""
                                 )
-                                if page_text:
-                                    text += page_text + "\n"
                             except Exception as fallback_e:
                                 logger.debug(
                                     f"Fallback extraction also failed for page {page_num}: {fallback_e}"
@@ -94,6 +269,12 @@ class PDFProcessor:
                             logger.warning(
                                 f"Error extracting text from page {page_num}: {e}"
                             )
+                    pypdf_page_texts.append(page_text)
+
+            if page_texts is not None:
+                page_texts.extend(pypdf_page_texts)
+
+            text = "\n".join(page_text for page_text in pypdf_page_texts if page_text)
 
             # If pypdf fails or returns empty, try pdfplumber
             if not text.strip():
@@ -116,6 +297,42 @@ class PDFProcessor:
                 )
                 return ""
 
+    def _extract_text_with_pymupdf(
+        self,
+        pdf_path: Path,
+        data: Optional[bytes] = None,
+        page_widths: Optional[List[float]] = None,
+    ) -> List[str]:
+        """
+        Extract each page's text with PyMuPDF.
+
+        Args:
+            pdf_path: Path to the PDF file
+            data: The file's contents, to parse instead of reading the file
+            page_widths: Optional list that receives each page's width in points
+
+        Returns:
+            Text of each page, or an empty list if PyMuPDF can't read the file
+        """
+        try:
+            import fitz  # PyMuPDF
+
+            if data is not None:
+                doc = fitz.open(stream=data, filetype="pdf")
+            else:
+                doc = fitz.open(pdf_path)
+            with doc:
+                pages = list(doc)
+                page_texts = [page.get_text("text") for page in pages]
+                if page_widths is not None:
+                    page_widths.extend(page.rect.width for page in pages)
+                return page_texts
+        except ImportError:
+            logger.debug("PyMuPDF not available, using pypdf for text extraction")
+        except Exception as e:
+            logger.debug(f"PyMuPDF could not extract text from {pdf_path}: {e}")
+        return []
+
     def extract_text_with_pdfplumber(self, pdf_path: Path) -> str:
         """
         Extract text using pdfplumber as a fallback method with encoding error handling.
@@ -127,16 +344,15 @@ class PDFProcessor:
             Extracted text content
         """
         try:
-            text = ""
-            with pdfplumber.open(pdf_path) as pdf:
+            page_texts = []
+            with _this.pdfplumber.open(pdf_path) as pdf:
                 for page_num, page in enumerate(pdf.pages):
                     try:
                         page_text = page.extract_text()
                         if page_text:
-                            text += page_text + "\n"
+                            page_texts.append(page_text)
                     except Exception as e:
-                        error_msg = str(e).lower()
-                        if "encoding" in error_msg or "90ms-rksj" in error_msg:
+                        if _is_encoding_error(e):
                             logger.warning(
                                 f"pdfplumber encoding error on page {page_num} of {pdf_path.name}: {e}"
                             )
@@ -147,24 +363,32 @@ class PDFProcessor:
                                     layout=True, x_tolerance=3, y_tolerance=3
                                 )
                                 if page_text:
-                                    text += page_text + "\n"
+                                    page_texts.append(page_text)
                             except Exception as fallback_e:
                                 logger.debug(
                                     f"pdfplumber fallback also failed for page {page_num}: {fallback_e}"
                                 )
                         else:
                             logger.warning(f"pdfplumber error on page {page_num}: {e}")
-            return text.strip()
+            return "\n".join(page_texts).strip()
         except Exception as e:
             logger.error(f"Error extracting text with pdfplumber from {pdf_path}: {e}")
             return ""
 
-    def extract_text_with_ocr(self, pdf_path: Path) -> str:
+    def extract_text_with_ocr(
+        self,
+        pdf_path: Path,
+        pages: Optional[List[int]] = None,
+        page_widths: Optional[List[float]] = None,
+    ) -> str:
         """
         Extract text using OCR for scanned PDFs.
 
         Args:
             pdf_path: Path to the PDF file
+            pages: 1-based page numbers to OCR (defaults to every page)
+            page_widths: Width of each page in points, from extract_text, so
+                oversized pages can be rendered at a lower resolution
 
         Returns:
             OCR-extracted text content
@@ -172,28 +396,75 @@ class PDFProcessor:
         try:
             logger.info(f"Attempting OCR extraction for {pdf_path}")
 
-            # Try to convert PDF to images
-            try:
-                images = convert_from_path(pdf_path)
-            except Exception as e:
-                logger.warning(
-                    f"PDF to image conversion failed (poppler may not be installed): {e}"
-                )
-                # Try alternative: extract embedded images from PDF
-                return self._extract_text_from_pdf_images(pdf_path)
+            dpi = self._ocr_dpi(page_widths, pages)
+            ocr_workers = self.ocr_workers or _ocr_workers()
 
-            text = ""
-            for i, image in enumerate(images):
+            with tempfile.TemporaryDirectory(prefix="ocrganizer-") as page_dir:
+                # Render pages to files rather than in-memory images, so peak
+                # memory stays flat regardless of page count. Grayscale pages
+                # are a third the size of RGB ones and OCR just as well.
                 try:
-                    # Perform OCR on each page
-                    page_text = pytesseract.image_to_string(image, config="--psm 6")
-                    if page_text and page_text.strip():
-                        text += page_text + "\n"
-                        logger.debug(
-                            f"OCR extracted {len(page_text)} chars from page {i+1}"
+                    if pages is None:
+                        images = _this.convert_from_path(
+                            pdf_path,
+                            dpi=dpi,
+                            grayscale=True,
+                            thread_count=ocr_workers,
+                            output_folder=page_dir,
+                            paths_only=True,
+                            fmt="png",
                         )
+                    else:
+                        # Rasterize only the requested runs of pages
+                        images = []
+                        for first_page, last_page in _page_ranges(pages):
+                            images.extend(
+                                _this.convert_from_path(
+                                    pdf_path,
+                                    dpi=dpi,
+                                    grayscale=True,
+                                    thread_count=ocr_workers,
+                                    output_folder=page_dir,
+                                    paths_only=True,
+                                    fmt="png",
+                                    first_page=first_page,
+                                    last_page=last_page,
+                                )
+                            )
                 except Exception as e:
-                    logger.warning(f"OCR failed for page {i}: {e}")
+                    logger.warning(
+                        f"PDF to image conversion failed (poppler may not be installed): {e}"
+                    )
+                    # Try alternative: extract embedded images from PDF
+                    return self._extract_text_from_pdf_images(pdf_path)
+
+                if not images:
+                    return ""
+
+                workers = min(ocr_workers, len(images))
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    if (
+                        tesserocr is None
+                        and len(images) > workers
+                        and all(isinstance(image, str) for image in images)
+                    ):
+                        # Each pytesseract call starts a tesseract process, so
+                        # give every worker one run of pages to OCR in a
+                        # single process instead of one process per page
+                        size = -(-len(images) // workers)
+                        groups = [
+                            (start, images[start : start + size])
+                            for start in range(0, len(images), size)
+                        ]
+                        page_texts: Iterator[str] = itertools.chain.from_iterable(
+                            executor.map(
+                                lambda group: self._ocr_page_group(page_dir, group),
+                                groups,
+                            )
+                        )
+                    else:
+                        page_texts = executor.map(self._ocr_page, enumerate(images))
+                    text = "\n".join(page_text for page_text in page_texts if page_text)
 
             return text.strip()
 
@@ -201,6 +472,104 @@ class PDFProcessor:
             logger.error(f"Error performing OCR on {pdf_path}: {e}")
             return ""
 
+    def _ocr_dpi(
+        self, page_widths: Optional[List[float]], pages: Optional[List[int]] = None
+    ) -> int:
+        """
+        Resolution to render a PDF's pages at for OCR.
+
+        Tesseract's run time grows with the pixel count, so documents whose
+        widest page would come out wider than ocr_max_width pixels are
+        rendered at a lower resolution. Ordinary page sizes keep ocr_dpi, as
+        do documents whose page sizes are unknown.
+
+        Args:
+            page_widths: Width of each page in points, if known
+            pages: 1-based page numbers that will be rendered (defaults to all)
+
+        Returns:
+            Resolution in dots per inch
+        """
+        if not page_widths:
+            return self.ocr_dpi
+        if pages is not None:
+            page_widths = [
+                page_widths[p - 1] for p in pages if 0 < p <= len(page_widths)
+            ]
+
+        widest = max(page_widths, default=0)
+        if widest <= 0:
+            return self.ocr_dpi
+        # Page sizes are in points, 72 to the inch
+        return max(1, min(self.ocr_dpi, int(self.ocr_max_width * 72 / widest)))
+
+    @staticmethod
+    def _ocr_page(indexed_image: Tuple[int, Any]) -> str:
+        """
+        Run OCR on a single rendered page.
+
+        Args:
+            indexed_image: Tuple of (page index, page image or image file path)
+
+        Returns:
+            Page text, or an empty string if OCR failed or found nothing
+        """
+        i, image = indexed_image
+        try:
+            if tesserocr is not None:
+                page_text = _tesserocr_image_to_string(image)
+            else:
+                page_text = _this.pytesseract.image_to_string(image, config="--psm 6")
+        except Exception as e:
+            logger.warning(f"OCR failed for page {i}: {e}")
+            return ""
+
+        if not page_text or not page_text.strip():
+            return ""
+        logger.debug(f"OCR extracted {len(page_text)} chars from page {i+1}")
+        return page_text
+
+    @classmethod
+    def _ocr_page_group(
+        cls, list_dir: str, indexed_group: Tuple[int, List[str]]
+    ) -> List[str]:
+        """
+        Run OCR on a run of rendered pages with a single tesseract process.
+
+        Tesseract reads a text file listing image paths as one multi-page
+        input and ends each page's text with a form feed.
+
+        Args:
+            list_dir: Directory to write the image list file into
+            indexed_group: Tuple of (index of the first page, page image file paths)
+
+        Returns:
+            Text of each page in the group, empty for pages OCR found nothing on
+        """
+        start, image_paths = indexed_group
+        list_file = Path(list_dir, f"pages-{start}.txt")
+        list_file.write_text("\n".join(image_paths) + "\n")
+        try:
+            output = _this.pytesseract.image_to_string(str(list_file), config="--psm 6")
+            page_texts = output.split("\f")
+        except Exception as e:
+            logger.warning(
+                f"OCR failed for pages {start}-{start + len(image_paths)}: {e}"
+            )
+            page_texts = []
+
+        if len(page_texts) < len(image_paths):
+            # The run failed or its page breaks are missing, so OCR the
+            # pages one at a time
+            return [
+                cls._ocr_page(indexed_image)
+                for indexed_image in enumerate(image_paths, start)
+            ]
+        return [
+            page_text if page_text.strip() else ""
+            for page_text in page_texts[: len(image_paths)]
+        ]
+
     def _extract_text_from_pdf_images(self, pdf_path: Path) -> str:
         """
         Fallback OCR method that extracts embedded images from PDF.
@@ -215,41 +584,47 @@ class PDFProcessor:
             import fitz  # PyMuPDF - alternative PDF library
 
             doc = fitz.open(pdf_path)
-            text = ""
+            page_texts = []
 
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                image_list = page.get_images()
+            # Tesseract reads PPM directly, so hand it the pixmap bytes on disk
+            # instead of decoding them into a PIL image first
+            with tempfile.TemporaryDirectory() as image_dir:
+                image_path = os.path.join(image_dir, "image.ppm")
 
-                for img_index, img in enumerate(image_list):
-                    try:
-                        # Extract image
-                        xref = img[0]
-                        pix = fitz.Pixmap(doc, xref)
+                for page_num in range(len(doc)):
+                    page = doc[page_num]
+                    image_list = page.get_images()
 
-                        if pix.n - pix.alpha < 4:  # GRAY or RGB
-                            # Convert to PIL Image for OCR
-                            import io
+                    for img_index, img in enumerate(image_list):
+                        try:
+                            # Extract image
+                            xref = img[0]
+                            pix = fitz.Pixmap(doc, xref)
 
-                            from PIL import Image
+                            if pix.n - pix.alpha < 4:  # GRAY or RGB
+                                if pix.n - pix.alpha > 1:
+                                    pix = fitz.Pixmap(fitz.csGRAY, pix)
 
-                            img_data = pix.tobytes("ppm")
-                            pil_image = Image.open(io.BytesIO(img_data))
+                                with open(image_path, "wb") as image_file:
+                                    image_file.write(pix.tobytes("ppm"))
 
-                            # Perform OCR
-                            page_text = pytesseract.image_to_string(pil_image)
-                            if page_text and page_text.strip():
-                                text += page_text + "\n"
+                                # Perform OCR
+                                page_text = _this.pytesseract.image_to_string(
+                                    image_path
+                                )
+                                if page_text and page_text.strip():
+                                    page_texts.append(page_text)
 
-                        pix = None
+                            pix = None
 
-                    except Exception as e:
-                        logger.warning(
-                            f"Failed to OCR image {img_index} on page {page_num}: {e}"
-                        )
+                        except Exception as e:
+                            logger.warning(
+                                f"Failed to OCR image {img_index} on page {page_num}: "
+                                f"{e}"
+                            )
 
             doc.close()
-            return text.strip()
+            return "\n".join(page_texts).strip()
 
         except ImportError:
             logger.warning("PyMuPDF not available, OCR fallback not possible")
@@ -258,12 +633,15 @@ class PDFProcessor:
             logger.error(f"Error in fallback OCR method: {e}")
             return ""
 
-    def extract_metadata(self, pdf_path: Path) -> Dict[str, Any]:
+    def extract_metadata(
+        self, pdf_path: Path, reader: Optional[pypdf.PdfReader] = None
+    ) -> Dict[str, Any]:
         """
         Extract metadata from a PDF file.
 
         Args:
             pdf_path: Path to the PDF file
+            reader: Already opened reader for the file, to avoid re-parsing it
 
         Returns:
             Dictionary containing metadata
@@ -271,9 +649,7 @@ class PDFProcessor:
         metadata = {}
 
         try:
-            with open(pdf_path, "rb") as file:
-                pdf_reader = pypdf.PdfReader(file)
-
+            with _pdf_reader(pdf_path, reader) as pdf_reader:
                 # Extract document info
                 if pdf_reader.metadata:
                     metadata["title"] = pdf_reader.metadata.get("/Title", "")
@@ -314,27 +690,51 @@ class PDFProcessor:
         """
         logger.info(f"Processing PDF: {pdf_path}")
 
-        # Extract text content
-        text_content = self.extract_text(pdf_path)
+        # Read the file once; PyMuPDF and pypdf both parse it from memory
+        try:
+            data: Optional[bytes] = pdf_path.read_bytes()
+        except OSError as e:
+            logger.debug(f"Could not read {pdf_path}: {e}")
+            data = None
+
+        # Parse the PDF once and share the reader for text and metadata
+        page_texts: List[str] = []
+        page_widths: List[float] = []
+        with ExitStack() as stack:
+            reader = self._open_reader(pdf_path, stack, data)
+            text_content = self.extract_text(
+                pdf_path,
+                reader=reader,
+                page_texts=page_texts,
+                data=data,
+                page_widths=page_widths,
+            )
+            metadata = self.extract_metadata(pdf_path, reader=reader)
 
         # If text extraction failed or returned minimal content, try OCR
         min_text_threshold = 100  # Increased threshold for better OCR triggering
-        if not text_content or len(text_content.strip()) < min_text_threshold:
+        text_length = len(text_content.strip())
+        if text_length < min_text_threshold:
             logger.info(
-                f"Text extraction returned minimal content ({len(text_content)} chars), attempting OCR for {pdf_path}"
+                f"Text extraction returned minimal content ({text_length} chars), "
+                f"attempting OCR for {pdf_path}"
             )
-            ocr_text = self.extract_text_with_ocr(pdf_path)
-            if ocr_text and len(ocr_text.strip()) > len(text_content.strip()):
-                logger.info(
-                    f"OCR provided better text extraction ({len(ocr_text)} chars vs {len(text_content)} chars)"
+            # Only rasterize pages without a text layer when some pages have one
+            missing_pages = [
+                page_num
+                for page_num, page_text in enumerate(page_texts, 1)
+                if len(page_text.strip()) < _MIN_PAGE_TEXT_LENGTH
+            ]
+            if missing_pages and len(missing_pages) < len(page_texts):
+                logger.info(f"OCR limited to pages {missing_pages} of {pdf_path}")
+                ocr_text = self.extract_text_with_ocr(
+                    pdf_path, pages=missing_pages, page_widths=page_widths
                 )
-                text_content = ocr_text
-            elif ocr_text:
-                # Combine both if we have some text from both methods
-                text_content = text_content + "\n" + ocr_text
-
-        # Extract metadata
-        metadata = self.extract_metadata(pdf_path)
+                if ocr_text:
+                    text_content = text_content + "\n" + ocr_text
+            else:
+                ocr_text = self.extract_text_with_ocr(pdf_path, page_widths=page_widths)
+                text_content = self._merge_ocr_text(text_content, ocr_text)
 
         # Create PDFDocument object
         document = PDFDocument(
@@ -344,6 +744,58 @@ class PDFProcessor:
         logger.info(f"Successfully processed {pdf_path}")
         return document
 
+    @staticmethod
+    def _merge_ocr_text(text_content: str, ocr_text: str) -> str:
+        """
+        Combine extracted text with whole-document OCR output.
+
+        Args:
+            text_content: Text from the PDF's text layer
+            ocr_text: Text recognized by OCR
+
+        Returns:
+            The OCR text if it is longer, otherwise both texts combined
+        """
+        if not ocr_text:
+            return text_content
+
+        ocr_length = len(ocr_text.strip())
+        text_length = len(text_content.strip())
+        if ocr_length > text_length:
+            logger.info(
+                f"OCR provided better text extraction "
+                f"({ocr_length} chars vs {text_length} chars)"
+            )
+            return ocr_text
+
+        # Combine both if we have some text from both methods
+        return text_content + "\n" + ocr_text
+
+    @staticmethod
+    def _open_reader(
+        pdf_path: Path, stack: ExitStack, data: Optional[bytes] = None
+    ) -> Optional[pypdf.PdfReader]:
+        """
+        Open a pypdf reader whose file stays open until the stack exits.
+
+        Args:
+            pdf_path: Path to the PDF file
+            stack: ExitStack that owns the open file
+            data: The file's contents, to parse instead of opening the file
+
+        Returns:
+            Reader, or None if pypdf can't parse the file (callers then run
+            their own fallbacks)
+        """
+        try:
+            if data is not None:
+                return pypdf.PdfReader(io.BytesIO(data))
+            file = stack.enter_context(open(pdf_path, "rb"))
+            return pypdf.PdfReader(file)
+        except Exception as e:
+            logger.debug(f"pypdf could not open {pdf_path}: {e}")
+            return None
+
     def _extract_text_with_encoding_fallback(self, page) -> str:
         """
         Attempt to extract text from a page with encoding error handling.
@@ -379,28 +831,47 @@ class PDFProcessor:
 
         return ""
 
-    def batch_process(self, pdf_paths: List[Path]) -> List[PDFDocument]:
+    def batch_process(
+        self,
+        pdf_paths: List[Path],
+        max_workers: Optional[int] = None,
+        use_processes: bool = False,
+    ) -> List[PDFDocument]:
         """
-        Process multiple PDF files.
+        Process multiple PDF files concurrently.
+
+        Threads suit scanned batches, where the work happens in tesseract and
+        poppler subprocesses. Batches of text-layer PDFs are bound by pypdf's
+        pure-Python parsing instead, which threads can't run in parallel, so
+        those can use worker processes.
 
         Args:
             pdf_paths: List of paths to PDF files
+            max_workers: Number of workers (defaults to the CPU count)
+            use_processes: Process files in worker processes instead of threads
 
         Returns:
-            List of PDFDocument objects
+            List of PDFDocument objects, in input order, for files that succeeded
+            (files without a PDF header are skipped)
         """
-        documents = []
-        total = len(pdf_paths)
+        if not pdf_paths:
+            return []
 
-        for i, pdf_path in enumerate(pdf_paths, 1):
-            logger.info(f"Processing {i}/{total}: {pdf_path.name}")
-            try:
-                document = self.process_pdf(pdf_path)
-                documents.append(document)
-            except Exception as e:
-                logger.error(f"Failed to process {pdf_path}: {e}")
-
-        return documents
+        total = len(pdf_paths)
+        workers = min(max_workers or os.cpu_count() or 1, total)
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+
+        # Split the OCR threads between the files processed at once, so a
+        # scanned batch doesn't start workers x CPU count tesseract and
+        # poppler processes
+        processor = copy.copy(self)
+        processor.ocr_workers = max(1, (self.ocr_workers or _ocr_workers()) // workers)
+
+        with executor_class(max_workers=workers) as executor:
+            results = executor.map(
+                partial(_batch_process_one, processor, total), enumerate(pdf_paths, 1)
+            )
+            return [document for document in results if document is not None]
 
     def is_valid_pdf(self, file_path: Path) -> bool:
         """
@@ -412,16 +883,51 @@ class PDFProcessor:
         Returns:
             True if file is a valid PDF, False otherwise
         """
-        if not file_path.exists():
+        if file_path.suffix.lower() not in self.supported_extensions:
             return False
 
-        if file_path.suffix.lower() not in self.supported_extensions:
+        # Check the PDF header with raw file descriptor calls; a missing file
+        # fails the open, so no separate exists() check is needed
+        try:
+            fd = os.open(file_path, os.O_RDONLY)
+        except OSError:
             return False
 
         try:
-            with open(file_path, "rb") as file:
-                # Check PDF header
-                header = file.read(5)
-                return header == b"%PDF-" or header.startswith(b"%PDF")
-        except Exception:
+            header = os.read(fd, 5)
+        except OSError:
             return False
+        finally:
+            os.close(fd)
+
+        return header.startswith(b"%PDF")
+
+
+def _batch_process_one(
+    processor: PDFProcessor, total: int, indexed_path: Tuple[int, Path]
+) -> Optional[PDFDocument]:
+    """
+    Process one file of a batch_process run, returning None if it fails.
+
+    Defined at module level so it can be sent to worker processes.
+
+    Args:
+        processor: Processor to run
+        total: Number of files in the batch, for progress logging
+        indexed_path: Tuple of (1-based position in the batch, PDF path)
+
+    Returns:
+        The processed document, or None if the file was skipped or failed
+    """
+    i, pdf_path = indexed_path
+    # Reading the header is far cheaper than a parse that will fail
+    if not processor.is_valid_pdf(pdf_path):
+        logger.warning(f"Skipping {i}/{total}: {pdf_path} is not a PDF file")
+        return None
+
+    logger.info(f"Processing {i}/{total}: {pdf_path.name}")
+    try:
+        return processor.process_pdf(pdf_path)
+    except Exception as e:
+        logger.error(f"Failed to process {pdf_path}: {e}")
+        return None
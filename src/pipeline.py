@@ -0,0 +1,219 @@
+"""Pipelined processing of PDFs through text extraction, AI analysis and filing."""
+import logging
+import queue
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from src.ai_analyzer import AIAnalyzer, DocumentInfo
+from src.file_organizer import FileOrganizer
+from src.pdf_processor import PDFDocument, PDFProcessor
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of the input on a stage queue
+_DONE = object()
+
+
+@dataclass
+class PipelineResult:
+    """Outcome of running one PDF through the pipeline."""
+
+    pdf_path: Path
+    pdf_document: Optional[PDFDocument] = None
+    doc_info: Optional[DocumentInfo] = None
+    new_path: Optional[Path] = None
+    error: Optional[str] = None
+
+    @property
+    def succeeded(self) -> bool:
+        """Whether the file made it through every stage."""
+        return self.error is None
+
+
+class DocumentPipeline:
+    """Extract, analyze and organize PDFs with the three stages overlapped.
+
+    Each stage runs on its own thread and hands documents to the next through
+    a bounded queue. While one document waits on the AI provider, the next is
+    already having its text extracted and the previous one is being filed, so
+    a batch takes about as long as its slowest stage rather than the sum of
+    all three. The bounded queues keep a fast stage from running far ahead.
+    Analysis, usually the slowest stage, runs on several threads so more than
+    one AI request can be in flight, and can send documents that are already
+    waiting to the AI provider together in one request.
+    """
+
+    def __init__(
+        self,
+        pdf_processor: PDFProcessor,
+        ai_analyzer: AIAnalyzer,
+        file_organizer: FileOrganizer,
+        queue_size: int = 8,
+        analyze_workers: int = 4,
+        analyze_batch_size: int = 1,
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            pdf_processor: Extracts text and metadata from each PDF
+            ai_analyzer: Analyzes the extracted text
+            file_organizer: Files each PDF according to its analysis
+            queue_size: Maximum documents waiting between two stages
+            analyze_workers: Maximum number of AI requests in flight at once
+            analyze_batch_size: Maximum documents sent in one AI request
+        """
+        self.pdf_processor = pdf_processor
+        self.ai_analyzer = ai_analyzer
+        self.file_organizer = file_organizer
+        self.queue_size = queue_size
+        self.analyze_workers = max(1, analyze_workers)
+        self.analyze_batch_size = max(1, analyze_batch_size)
+
+    def run(
+        self, pdf_paths: List[Path], copy_files: bool = False
+    ) -> List[PipelineResult]:
+        """
+        Run PDFs through the pipeline.
+
+        A failure in any stage is recorded on that file's result and the file
+        skips the remaining stages; the rest of the batch carries on.
+
+        Args:
+            pdf_paths: PDF files to process
+            copy_files: If True, copy files instead of moving
+
+        Returns:
+            One PipelineResult per path, in input order
+        """
+        results = [PipelineResult(Path(pdf_path)) for pdf_path in pdf_paths]
+        to_analyze: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        to_organize: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        analyze_workers = min(self.analyze_workers, len(results)) or 1
+
+        # Daemon threads, so an unexpected error here can't leave a stage
+        # blocked on a full queue and keep the process alive
+        stages = [
+            threading.Thread(
+                target=self._extract,
+                args=(results, to_analyze, analyze_workers),
+                name="pipeline-extract",
+                daemon=True,
+            )
+        ]
+        stages.extend(
+            threading.Thread(
+                target=self._analyze,
+                args=(to_analyze, to_organize),
+                name=f"pipeline-analyze-{i}",
+                daemon=True,
+            )
+            for i in range(analyze_workers)
+        )
+        for stage in stages:
+            stage.start()
+
+        # Filing is the last stage, so it runs on the calling thread
+        self._organize(to_organize, analyze_workers, copy_files)
+
+        for stage in stages:
+            stage.join()
+
+        return results
+
+    def _extract(
+        self,
+        results: List[PipelineResult],
+        to_analyze: queue.Queue,
+        analyze_workers: int,
+    ) -> None:
+        """Extract each file's text and queue it for analysis."""
+        total = len(results)
+        try:
+            for i, result in enumerate(results, 1):
+                logger.info(f"Processing {i}/{total}: {result.pdf_path.name}")
+                try:
+                    result.pdf_document = self.pdf_processor.process_pdf(
+                        result.pdf_path
+                    )
+                except Exception as e:
+                    self._record_failure(result, "extract text from", e)
+                    continue
+                to_analyze.put(result)
+        finally:
+            # One end marker per analysis thread
+            for _ in range(analyze_workers):
+                to_analyze.put(_DONE)
+
+    def _analyze(self, to_analyze: queue.Queue, to_organize: queue.Queue) -> None:
+        """Analyze queued documents until the end marker, queueing them for filing."""
+        try:
+            done = False
+            while not done:
+                batch, done = self._take_batch(to_analyze)
+                if not batch:
+                    continue
+                documents = [result.pdf_document for result in batch]
+                try:
+                    if len(batch) == 1:
+                        doc_infos = [self.ai_analyzer.analyze_document(documents[0])]
+                    else:
+                        doc_infos = self.ai_analyzer.analyze_documents_batch(
+                            documents, batch_size=len(batch)
+                        )
+                except Exception as e:
+                    for result in batch:
+                        self._record_failure(result, "analyze", e)
+                    continue
+                for result, doc_info in zip(batch, doc_infos):
+                    result.doc_info = doc_info
+                    to_organize.put(result)
+        finally:
+            to_organize.put(_DONE)
+
+    def _take_batch(self, to_analyze: queue.Queue) -> Tuple[list, bool]:
+        """
+        Wait for the next document, then take others already queued behind it.
+
+        Never waits for a batch to fill, so a lone document isn't held back.
+
+        Returns:
+            Up to analyze_batch_size documents, and whether the end marker
+            was reached
+        """
+        batch = []
+        item = to_analyze.get()
+        while item is not _DONE:
+            batch.append(item)
+            if len(batch) >= self.analyze_batch_size:
+                return batch, False
+            try:
+                item = to_analyze.get_nowait()
+            except queue.Empty:
+                return batch, False
+        return batch, True
+
+    def _organize(
+        self, to_organize: queue.Queue, analyze_workers: int, copy_files: bool
+    ) -> None:
+        """File analyzed documents until every analysis thread has finished."""
+        running = analyze_workers
+        while running:
+            result = to_organize.get()
+            if result is _DONE:
+                running -= 1
+                continue
+            try:
+                result.new_path = self.file_organizer.organize_file(
+                    result.pdf_document, result.doc_info, copy_files
+                )
+            except Exception as e:
+                self._record_failure(result, "organize", e)
+
+    @staticmethod
+    def _record_failure(result: PipelineResult, action: str, error: Exception) -> None:
+        """Log a stage failure with its traceback and store it on the file's result."""
+        logger.error(f"Failed to {action} {result.pdf_path}: {error}", exc_info=error)
+        result.error = str(error)
@@ -0,0 +1,177 @@
+"""Caches for AI model responses: persistent (SQLite) and in-process (LRU)."""
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Default time-to-live for cached responses, in seconds
+DEFAULT_TTL = 24 * 60 * 60
+
+# Default number of responses kept by MemoryResponseCache
+DEFAULT_MEMORY_SIZE = 512
+
+
+class ResponseCache:
+    """Exact-match key/value cache for model responses.
+
+    Entries are stored in a single SQLite file, so they survive restarts and
+    can be shared by the web app and CLI running side by side.
+
+    Matching is exact on purpose. Prompts for documents from the same vendor
+    are near-identical apart from the dates and amounts the model is asked to
+    extract, so a similarity-based (semantic) lookup would return another
+    document's answer.
+    """
+
+    def __init__(self, path: Union[str, Path], ttl: Optional[float] = DEFAULT_TTL):
+        """
+        Open (or create) a response cache.
+
+        Args:
+            path: SQLite database file
+            ttl: Seconds before an entry expires, or None to keep entries forever
+        """
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+
+        # One connection shared by worker threads, serialized by the lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(*parts: object) -> str:
+        """
+        Build a cache key from the values that determine a response.
+
+        Args:
+            parts: Model name, prompt, generation settings, ...
+
+        Returns:
+            Hex SHA-256 digest of the parts
+        """
+        joined = "\x1f".join(str(part) for part in parts)
+        return hashlib.sha256(joined.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Key from make_key()
+
+        Returns:
+            Cached response, or None if missing or expired
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        value, created = row
+        if self.ttl is not None and time.time() - created > self.ttl:
+            return None
+        # The column is declared TEXT, but SQLite doesn't enforce it
+        return value if isinstance(value, str) else None
+
+    def set(self, key: str, value: str) -> None:
+        """
+        Store a response.
+
+        Args:
+            key: Key from make_key()
+            value: Response text
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created) "
+                "VALUES (?, ?, ?)",
+                (key, value, time.time()),
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class MemoryResponseCache:
+    """In-process, least-recently-used cache with ResponseCache's interface.
+
+    Nothing is written to disk, so it suits clients that should skip repeated
+    identical requests within a run without managing a database file.
+    """
+
+    make_key = staticmethod(ResponseCache.make_key)
+
+    def __init__(self, maxsize: int = DEFAULT_MEMORY_SIZE):
+        """
+        Create an empty cache.
+
+        Args:
+            maxsize: Maximum number of responses kept before the least
+                recently used one is evicted
+        """
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Key from make_key()
+
+        Returns:
+            Cached response, or None if missing
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        """
+        Store a response, evicting the least recently used one when full.
+
+        Args:
+            key: Key from make_key()
+            value: Response text
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        with self._lock:
+            self._entries.clear()
+
+    def close(self) -> None:
+        """Release the cache (a no-op kept for interface parity)."""
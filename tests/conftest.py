@@ -1,8 +1,9 @@
 """Pytest configuration and shared fixtures."""
 
 import os
+from functools import lru_cache
 from pathlib import Path
-from unittest.mock import MagicMock, Mock, patch
+from unittest.mock import patch
 
 import pytest
 
@@ -38,6 +39,22 @@ def setup_tinyllama_environment():
         yield default_env
 
 
+@pytest.fixture(autouse=True)
+def reset_shared_ai_clients():
+    """Drop SDK clients shared between analyzers, before and after each test.
+
+    Tests patch the SDK client classes in different ways, so a client cached
+    under one test's patch must not be handed to the next test.
+    """
+    from src import ai_analyzer
+
+    ai_analyzer._get_openai_client.cache_clear()
+    ai_analyzer._get_anthropic_client.cache_clear()
+    yield
+    ai_analyzer._get_openai_client.cache_clear()
+    ai_analyzer._get_anthropic_client.cache_clear()
+
+
 @pytest.fixture
 def mock_env_vars():
     """Mock environment variables for testing."""
@@ -66,6 +83,165 @@ def sample_pdf_document():
     )
 
 
+@pytest.fixture(scope="session")
+def make_pdf():
+    """Return a factory for PDFDocuments with only text and path filled in."""
+    from src.pdf_processor import PDFDocument
+
+    def _make(text="Test content", path="test.pdf"):
+        return PDFDocument(file_path=Path(path), text_content=text, metadata={})
+
+    return _make
+
+
+@pytest.fixture(scope="session")
+def scanned_pdf_bytes():
+    """Bytes of a minimal image-only PDF, built once per session.
+
+    The page has no text layer, so text extraction falls back to OCR.
+    """
+    return (
+        b"""%PDF-1.4
+1 0 obj
+<<
+/Type /Catalog
+/Pages 2 0 R
+>>
+endobj
+2 0 obj
+<<
+/Type /Pages
+/Kids [3 0 R]
+/Count 1
+>>
+endobj
+3 0 obj
+<<
+/Type /Page
+/Parent 2 0 R
+/MediaBox [0 0 612 792]
+/Resources <<
+/XObject << /Im0 4 0 R >>
+>>
+/Contents 5 0 R
+>>
+endobj
+4 0 obj
+<<
+/Type /XObject
+/Subtype /Image
+/Width 100
+/Height 100
+/ColorSpace /DeviceRGB
+/BitsPerComponent 8
+/Length 100
+>>
+stream
+"""
+        + b"x" * 100
+        + b"""
+endstream
+endobj
+5 0 obj
+<<
+/Length 44
+>>
+stream
+q
+100 0 0 100 50 600 cm
+/Im0 Do
+Q
+endstream
+endobj
+xref
+0 6
+0000000000 65535 f\x20
+0000000009 00000 n\x20
+0000000058 00000 n\x20
+0000000115 00000 n\x20
+0000000251 00000 n\x20
+0000000400 00000 n\x20
+trailer
+<<
+/Size 6
+/Root 1 0 R
+>>
+startxref
+493
+%%EOF"""
+    )
+
+
+@pytest.fixture
+def scanned_pdf_path(tmp_path, scanned_pdf_bytes):
+    """Write the scanned PDF into the test's temporary directory."""
+    pdf_file = tmp_path / "scanned_invoice.pdf"
+    pdf_file.write_bytes(scanned_pdf_bytes)
+    return pdf_file
+
+
+@pytest.fixture(scope="session")
+def text_pdf_bytes():
+    """Return a builder for minimal single-page PDFs with a text layer.
+
+    Built PDFs are cached for the session, keyed by their text.
+    """
+
+    @lru_cache(maxsize=None)
+    def _build(text_content):
+        return f"""%PDF-1.4
+1 0 obj
+<<
+/Type /Catalog
+/Pages 2 0 R
+>>
+endobj
+2 0 obj
+<<
+/Type /Pages
+/Kids [3 0 R]
+/Count 1
+>>
+endobj
+3 0 obj
+<<
+/Type /Page
+/Parent 2 0 R
+/MediaBox [0 0 612 792]
+/Contents 4 0 R
+>>
+endobj
+4 0 obj
+<<
+/Length {len(text_content) + 20}
+>>
+stream
+BT
+/F1 12 Tf
+50 750 Td
+({text_content}) Tj
+ET
+endstream
+endobj
+xref
+0 5
+0000000000 65535 f\x20
+0000000009 00000 n\x20
+0000000058 00000 n\x20
+0000000115 00000 n\x20
+0000000204 00000 n\x20
+trailer
+<<
+/Size 5
+/Root 1 0 R
+>>
+startxref
+{300 + len(text_content)}
+%%EOF""".encode()
+
+    return _build
+
+
 @pytest.fixture
 def temp_config_file(tmp_path):
     """Create a temporary config file for testing."""
@@ -1,12 +1,47 @@
 """Tests for AI analyzer module."""
 import datetime
-from pathlib import Path
-from unittest.mock import MagicMock, Mock, patch
+import json
+from unittest.mock import Mock, patch
 
 import pytest
 
+from src import ai_analyzer
 from src.ai_analyzer import AIAnalyzer, DocumentInfo
-from src.pdf_processor import PDFDocument
+from src.config import AppConfig
+from src.response_cache import ResponseCache
+
+
+@pytest.fixture(autouse=True, scope="module")
+def _patch_ai_sdks():
+    """Patch both SDK clients and seed API keys once for the whole module."""
+    env_vars = {
+        "OPENAI_API_KEY": "test-key",
+        "ANTHROPIC_API_KEY": "test-key",
+        "OPENAI_BASE_URL": "http://localhost:1234/v1",
+        "LOCAL_MODEL_NAME": "test-model",
+    }
+    with patch.dict("os.environ", env_vars), patch(
+        "openai.OpenAI", new=Mock()
+    ) as mock_openai, patch("anthropic.Anthropic", new=Mock()) as mock_anthropic:
+        yield {"openai": mock_openai, "anthropic": mock_anthropic}
+
+
+@pytest.fixture(scope="module")
+def analyzer(_patch_ai_sdks):
+    """Create one AIAnalyzer instance shared by the tests in this module.
+
+    Tests that replace attributes on it use monkeypatch, so each test still
+    starts from the same state.
+    """
+    return AIAnalyzer(provider="openai")
+
+
+def _stub_client(return_value=None, side_effect=None):
+    """Return an AI client stub that only provides analyze_document_text."""
+    client = Mock(spec_set=["analyze_document_text"])
+    client.analyze_document_text.return_value = return_value
+    client.analyze_document_text.side_effect = side_effect
+    return client
 
 
 class TestDocumentInfo:
@@ -34,30 +69,32 @@ class TestDocumentInfo:
 class TestAIAnalyzer:
     """Test AIAnalyzer class."""
 
-    @pytest.fixture
-    def analyzer(self, mock_env_vars):
-        """Create an AIAnalyzer instance."""
-        return AIAnalyzer(provider="openai")
-
-    def test_analyzer_initialization_openai(self):
+    def test_analyzer_initialization_openai(self, _patch_ai_sdks):
         """Test AIAnalyzer initialization with OpenAI."""
-        with patch.dict("os.environ", {"OPENAI_API_KEY": "test-key"}):
-            with patch("openai.OpenAI") as mock_openai:
-                mock_client = MagicMock()
-                mock_openai.return_value = mock_client
-                analyzer = AIAnalyzer(provider="openai")
-                assert analyzer.provider == "openai"
-                assert analyzer.credentials["openai_api_key"] == "test-key"
-
-    def test_analyzer_initialization_anthropic(self):
+        analyzer = AIAnalyzer(provider="openai")
+        assert analyzer.provider == "openai"
+        assert analyzer.credentials["openai_api_key"] == "test-key"
+        assert analyzer.client.client is _patch_ai_sdks["openai"].return_value
+
+    def test_analyzer_initialization_anthropic(self, _patch_ai_sdks):
         """Test AIAnalyzer initialization with Anthropic."""
-        with patch.dict("os.environ", {"ANTHROPIC_API_KEY": "test-key"}):
-            with patch("anthropic.Anthropic") as mock_anthropic:
-                mock_client = MagicMock()
-                mock_anthropic.return_value = mock_client
-                analyzer = AIAnalyzer(provider="anthropic")
-                assert analyzer.provider == "anthropic"
-                assert analyzer.credentials["anthropic_api_key"] == "test-key"
+        analyzer = AIAnalyzer(provider="anthropic")
+        assert analyzer.provider == "anthropic"
+        assert analyzer.credentials["anthropic_api_key"] == "test-key"
+        assert analyzer.client.client is _patch_ai_sdks["anthropic"].return_value
+
+    def test_analyzers_share_sdk_client(self, _patch_ai_sdks):
+        """Test analyzers with the same credentials reuse one SDK client."""
+        mock_openai = _patch_ai_sdks["openai"]
+        mock_openai.reset_mock()
+
+        first = AIAnalyzer(provider="openai")
+        second = AIAnalyzer(provider="openai")
+
+        assert first.client.client is second.client.client
+        mock_openai.assert_called_once_with(
+            api_key="test-key", base_url="http://localhost:1234/v1"
+        )
 
     def test_analyzer_initialization_no_api_key(self):
         """Test AIAnalyzer initialization without API key."""
@@ -65,8 +102,7 @@ class TestAIAnalyzer:
             with pytest.raises(ValueError, match="API key not found"):
                 AIAnalyzer(provider="openai")
 
-    @patch("openai.OpenAI")
-    def test_analyze_document_openai(self, mock_openai_client, analyzer):
+    def test_analyze_document_openai(self, analyzer, make_pdf, monkeypatch):
         """Test document analysis with OpenAI."""
         # Mock the provider's analyze_document_text method
         mock_response = """{
@@ -77,20 +113,11 @@ class TestAIAnalyzer:
             "suggested_name": "Chase Bank Credit Card Statement June 2023"
         }"""
 
-        # Replace the analyzer's client with our mock
-        analyzer.client = MagicMock()
-        analyzer.client.analyze_document_text.return_value = mock_response
+        # Replace the analyzer's client with our stub
+        monkeypatch.setattr(analyzer, "client", _stub_client(mock_response))
 
         # Create test document
-        pdf_doc = PDFDocument(
-            file_path=Path("test.pdf"),
-            text_content="Chase Bank credit card statement for June 2023",
-            metadata={},
-            extracted_date=None,
-            company_name=None,
-            document_type=None,
-            suggested_name=None,
-        )
+        pdf_doc = make_pdf("Chase Bank credit card statement for June 2023")
 
         # Analyze
         result = analyzer.analyze_document(pdf_doc)
@@ -100,42 +127,31 @@ class TestAIAnalyzer:
         assert result.date == datetime.date(2023, 6, 15)
         assert result.confidence_score == 0.92
 
-    @patch("anthropic.Anthropic")
-    def test_analyze_document_anthropic(self, mock_anthropic):
+    def test_analyze_document_anthropic(self, make_pdf):
         """Test document analysis with Anthropic."""
-        with patch.dict("os.environ", {"ANTHROPIC_API_KEY": "test-key"}):
-            analyzer = AIAnalyzer(provider="anthropic")
-
-            # Mock the provider's analyze_document_text method
-            mock_response = """{
-                "company_name": "Verizon",
-                "document_type": "phone bill",
-                "date": "2023-07-01",
-                "confidence_score": 0.88,
-                "suggested_name": "Verizon Phone Bill July 2023"
-            }"""
-
-            # Replace the analyzer's client with our mock
-            analyzer.client = MagicMock()
-            analyzer.client.analyze_document_text.return_value = mock_response
-
-            # Create test document
-            pdf_doc = PDFDocument(
-                file_path=Path("test.pdf"),
-                text_content="Verizon Wireless bill for July 2023",
-                metadata={},
-                extracted_date=None,
-                company_name=None,
-                document_type=None,
-                suggested_name=None,
-            )
+        analyzer = AIAnalyzer(provider="anthropic")
 
-            # Analyze
-            result = analyzer.analyze_document(pdf_doc)
+        # Mock the provider's analyze_document_text method
+        mock_response = """{
+            "company_name": "Verizon",
+            "document_type": "phone bill",
+            "date": "2023-07-01",
+            "confidence_score": 0.88,
+            "suggested_name": "Verizon Phone Bill July 2023"
+        }"""
+
+        # Replace the analyzer's client with our stub
+        analyzer.client = _stub_client(mock_response)
 
-            assert result.company_name == "Verizon"
-            assert result.document_type == "phone bill"
-            assert result.date == datetime.date(2023, 7, 1)
+        # Create test document
+        pdf_doc = make_pdf("Verizon Wireless bill for July 2023")
+
+        # Analyze
+        result = analyzer.analyze_document(pdf_doc)
+
+        assert result.company_name == "Verizon"
+        assert result.document_type == "phone bill"
+        assert result.date == datetime.date(2023, 7, 1)
 
     def test_parse_ai_response(self, analyzer):
         """Test parsing AI response."""
@@ -159,6 +175,24 @@ class TestAIAnalyzer:
         assert result.confidence_score == 0.95
         assert result.additional_metadata["account_number"] == "XXX-1234"
 
+    def test_parse_ai_response_reuses_decoded_fields(self, analyzer):
+        """Test repeated responses are decoded once but return fresh objects."""
+        response = (
+            '{"company_name": "Repeat Co", "date": "2023-02-01", '
+            '"additional_metadata": {"account": "1234"}}'
+        )
+
+        first = analyzer._parse_ai_response(response)
+        hits = AIAnalyzer._decode_response.cache_info().hits
+        first.additional_metadata["account"] = "changed"
+        second = analyzer._parse_ai_response(response)
+
+        assert AIAnalyzer._decode_response.cache_info().hits == hits + 1
+        assert second is not first
+        assert second.company_name == "Repeat Co"
+        assert second.date == datetime.date(2023, 2, 1)
+        assert second.additional_metadata == {"account": "1234"}
+
     def test_parse_ai_response_invalid_json(self, analyzer):
         """Test parsing invalid JSON response."""
         response = "This is not valid JSON"
@@ -169,18 +203,18 @@ class TestAIAnalyzer:
         assert result.document_type == "document"
         assert result.confidence_score == 0.0
 
-    def test_extract_date_patterns(self, analyzer):
-        """Test date extraction from text."""
-        test_cases = [
+    @pytest.mark.parametrize(
+        "text, expected_date",
+        [
             ("Statement Date: March 15, 2023", datetime.date(2023, 3, 15)),
             ("Invoice dated 06/20/2023", datetime.date(2023, 6, 20)),
             ("Bill for 2023-04-01", datetime.date(2023, 4, 1)),
             ("January 2023 Statement", datetime.date(2023, 1, 1)),
-        ]
-
-        for text, expected_date in test_cases:
-            date = analyzer._extract_date_from_text(text)
-            assert date == expected_date
+        ],
+    )
+    def test_extract_date_patterns(self, analyzer, text, expected_date):
+        """Test date extraction from text."""
+        assert analyzer._extract_date_from_text(text) == expected_date
 
     def test_generate_suggested_name(self, analyzer):
         """Test suggested name generation."""
@@ -196,34 +230,26 @@ class TestAIAnalyzer:
         name = analyzer._generate_suggested_name(info)
         assert name == "PG&E Utility Bill September 2023"
 
-    def test_batch_analyze(self, analyzer):
+    def test_batch_analyze(self, analyzer, make_pdf):
         """Test batch analysis of multiple documents."""
         # Create test documents
-        docs = [
-            PDFDocument(
-                file_path=Path(f"test{i}.pdf"),
-                text_content=f"Test document {i}",
-                metadata={},
-                extracted_date=None,
-                company_name=None,
-                document_type=None,
-                suggested_name=None,
+        docs = [make_pdf(f"Test document {i}", path=f"test{i}.pdf") for i in range(3)]
+
+        results_by_path = {
+            doc.file_path: DocumentInfo(
+                f"Company{i}",
+                f"type{i}",
+                datetime.date(2023, i, 1),
+                0.9,
+                f"Name{i}",
+                {},
             )
-            for i in range(3)
-        ]
+            for i, doc in enumerate(docs, 1)
+        }
 
         with patch.object(analyzer, "analyze_document") as mock_analyze:
-            mock_analyze.side_effect = [
-                DocumentInfo(
-                    "Company1", "type1", datetime.date(2023, 1, 1), 0.9, "Name1", {}
-                ),
-                DocumentInfo(
-                    "Company2", "type2", datetime.date(2023, 2, 1), 0.8, "Name2", {}
-                ),
-                DocumentInfo(
-                    "Company3", "type3", datetime.date(2023, 3, 1), 0.7, "Name3", {}
-                ),
-            ]
+            # Documents run concurrently, so answer by path rather than call order
+            mock_analyze.side_effect = lambda doc: results_by_path[doc.file_path]
 
             results = analyzer.batch_analyze(docs)
 
@@ -232,74 +258,44 @@ class TestAIAnalyzer:
             assert results[1].company_name == "Company2"
             assert results[2].company_name == "Company3"
 
-    def test_analyze_document_api_error(self, analyzer):
-        """Test document analysis with API error."""
-        # Mock API error
-        analyzer.client = MagicMock()
-        analyzer.client.analyze_document_text.side_effect = Exception("API Error")
-
-        pdf_doc = PDFDocument(
-            file_path=Path("test.pdf"),
-            text_content="Test content",
-            metadata={},
-            extracted_date=None,
-            company_name=None,
-            document_type=None,
-            suggested_name=None,
-        )
-
-        result = analyzer.analyze_document(pdf_doc)
+        assert analyzer.batch_analyze([]) == []
+
+    @pytest.mark.parametrize(
+        "side_effect, return_value",
+        [
+            (Exception("API Error"), None),
+            (None, ""),
+            (None, '{"company_name": "Test", invalid json'),
+        ],
+        ids=["api_error", "empty_response", "malformed_json"],
+    )
+    def test_analyze_document_error_paths(
+        self, analyzer, make_pdf, monkeypatch, side_effect, return_value
+    ):
+        """Test document analysis falls back to defaults on bad API results."""
+        client = _stub_client(return_value, side_effect=side_effect)
+        monkeypatch.setattr(analyzer, "client", client)
+
+        result = analyzer.analyze_document(make_pdf())
 
         # Should return default values on error
         assert result.company_name == "Unknown"
         assert result.document_type == "document"
         assert result.confidence_score == 0.0
 
-    def test_analyze_document_empty_response(self, analyzer):
-        """Test document analysis with empty API response."""
-        # Mock empty response
-        analyzer.client = MagicMock()
-        analyzer.client.analyze_document_text.return_value = ""
-
-        pdf_doc = PDFDocument(
-            file_path=Path("test.pdf"),
-            text_content="Test content",
-            metadata={},
-            extracted_date=None,
-            company_name=None,
-            document_type=None,
-            suggested_name=None,
-        )
-
-        result = analyzer.analyze_document(pdf_doc)
-
-        assert result.company_name == "Unknown"
-        assert result.document_type == "document"
-        assert result.confidence_score == 0.0
-
-    def test_analyze_document_malformed_json(self, analyzer):
-        """Test document analysis with malformed JSON response."""
-        # Mock malformed JSON response
-        analyzer.client = MagicMock()
-        analyzer.client.analyze_document_text.return_value = (
-            '{"company_name": "Test", invalid json'
-        )
+    def test_analyze_document_fallbacks_are_independent(
+        self, analyzer, make_pdf, monkeypatch
+    ):
+        """Test each failed analysis gets its own result object to enhance."""
+        monkeypatch.setattr(analyzer, "client", _stub_client("not json"))
 
-        pdf_doc = PDFDocument(
-            file_path=Path("test.pdf"),
-            text_content="Test content",
-            metadata={},
-            extracted_date=None,
-            company_name=None,
-            document_type=None,
-            suggested_name=None,
-        )
+        first = analyzer.analyze_document(make_pdf("Statement for 2023-04-01"))
+        second = analyzer.analyze_document(make_pdf("Statement for 2024-09-30"))
 
-        result = analyzer.analyze_document(pdf_doc)
-
-        assert result.company_name == "Unknown"
-        assert result.document_type == "document"
-        assert result.confidence_score == 0.0
+        assert first is not second
+        assert first.additional_metadata is not second.additional_metadata
+        assert first.date == datetime.date(2023, 4, 1)
+        assert second.date == datetime.date(2024, 9, 30)
 
     def test_extract_date_from_text_no_date(self, analyzer):
         """Test date extraction from text with no dates."""
@@ -328,36 +324,142 @@ class TestAIAnalyzer:
         name = analyzer._generate_suggested_name(info)
         assert "Unknown" in name or "Document" in name
 
-    def test_batch_analyze_with_failures(self, analyzer):
+    def test_analyze_document_uses_response_cache(
+        self, analyzer, make_pdf, monkeypatch, tmp_path
+    ):
+        """Test identical document text is only sent to the AI once."""
+        cache = ResponseCache(tmp_path / "responses.sqlite")
+        client = _stub_client(
+            return_value='{"company_name": "Acme", "document_type": "invoice"}'
+        )
+        monkeypatch.setattr(analyzer, "cache", cache)
+        monkeypatch.setattr(analyzer, "client", client)
+
+        first = analyzer.analyze_document(make_pdf("Invoice text", path="a.pdf"))
+        second = analyzer.analyze_document(make_pdf("Invoice text", path="b.pdf"))
+        analyzer.analyze_document(make_pdf("Other text", path="c.pdf"))
+
+        assert first.company_name == second.company_name == "Acme"
+        assert client.analyze_document_text.call_count == 2
+
+    def test_response_cache_from_config(self, _patch_ai_sdks, tmp_path):
+        """Test the configured response cache path is opened by default."""
+        config = AppConfig()
+        config.ai.response_cache_path = str(tmp_path / "responses.sqlite")
+
+        with patch.object(ai_analyzer, "get_config", return_value=config):
+            configured = AIAnalyzer(provider="openai")
+            explicit = ResponseCache(tmp_path / "explicit.sqlite")
+            given = AIAnalyzer(provider="openai", cache=explicit)
+
+        try:
+            assert configured.cache.path == tmp_path / "responses.sqlite"
+            assert given.cache is explicit
+        finally:
+            configured.cache.close()
+            explicit.close()
+
+    def test_analyze_document_does_not_cache_failed_responses(
+        self, analyzer, make_pdf, monkeypatch, tmp_path
+    ):
+        """Test API error replies are not cached."""
+        cache = ResponseCache(tmp_path / "responses.sqlite")
+        client = _stub_client(return_value="{}")
+        monkeypatch.setattr(analyzer, "cache", cache)
+        monkeypatch.setattr(analyzer, "client", client)
+
+        for _ in range(2):
+            analyzer.analyze_document(make_pdf("Invoice text"))
+
+        assert client.analyze_document_text.call_count == 2
+
+    def test_analyze_documents_batch_one_request_per_group(
+        self, analyzer, make_pdf, monkeypatch
+    ):
+        """Test documents are analyzed several per request, in input order."""
+        docs = [make_pdf(f"Statement {i}", path=f"doc{i}.pdf") for i in range(5)]
+        docs.insert(2, make_pdf("   ", path="blank.pdf"))
+
+        def analyze_document_text(prompt, max_tokens, token_limit):
+            # A full reply per document, lifting the per-document limit
+            assert token_limit == analyzer.config.ai.batch_max_tokens
+            assert max_tokens == min(
+                analyzer.config.ai.openai_max_tokens * prompt.count("--- DOCUMENT "),
+                token_limit,
+            )
+            # Answer with one result per document named in the prompt
+            names = [
+                line.split()[1]
+                for line in prompt.splitlines()
+                if line.startswith("Statement ")
+            ]
+            return json.dumps(
+                [
+                    {
+                        "company_name": f"Company {name}",
+                        "document_type": "bank statement",
+                        "date": "2023-03-15",
+                        "confidence_score": 0.9,
+                        "suggested_name": f"Statement {name}",
+                    }
+                    for name in names
+                ]
+            )
+
+        client = _stub_client(side_effect=analyze_document_text)
+        monkeypatch.setattr(analyzer, "client", client)
+
+        results = analyzer.analyze_documents_batch(docs, batch_size=3)
+
+        assert [r.company_name for r in results] == [
+            "Company 0",
+            "Company 1",
+            "Unknown",
+            "Company 2",
+            "Company 3",
+            "Company 4",
+        ]
+        assert results[0].date == datetime.date(2023, 3, 15)
+        # Blank documents are never sent; five others fit in two requests
+        assert client.analyze_document_text.call_count == 2
+
+    def test_analyze_documents_batch_falls_back_per_document(
+        self, analyzer, make_pdf, monkeypatch
+    ):
+        """Test a group whose reply doesn't match its documents is retried singly."""
+        docs = [make_pdf(f"Invoice {i}", path=f"doc{i}.pdf") for i in range(2)]
+
+        def analyze_document_text(prompt, max_tokens, token_limit=None):
+            if "DOCUMENT 1" in prompt:
+                # Only one result for two documents
+                return '[{"company_name": "Acme"}]'
+            return '{"company_name": "Acme", "confidence_score": 0.8}'
+
+        client = _stub_client(side_effect=analyze_document_text)
+        monkeypatch.setattr(analyzer, "client", client)
+
+        results = analyzer.analyze_documents_batch(docs)
+
+        assert [r.company_name for r in results] == ["Acme", "Acme"]
+        assert [r.confidence_score for r in results] == [0.8, 0.8]
+        assert client.analyze_document_text.call_count == 3
+
+    def test_batch_analyze_with_failures(self, analyzer, make_pdf):
         """Test batch analysis with some failures."""
         docs = [
-            PDFDocument(
-                file_path=Path("test1.pdf"),
-                text_content="Test document 1",
-                metadata={},
-                extracted_date=None,
-                company_name=None,
-                document_type=None,
-                suggested_name=None,
-            ),
-            PDFDocument(
-                file_path=Path("test2.pdf"),
-                text_content="Test document 2",
-                metadata={},
-                extracted_date=None,
-                company_name=None,
-                document_type=None,
-                suggested_name=None,
-            ),
+            make_pdf("Test document 1", path="test1.pdf"),
+            make_pdf("Test document 2", path="test2.pdf"),
         ]
 
+        def analyze_document(doc):
+            if doc is docs[1]:
+                raise Exception("Analysis failed")
+            return DocumentInfo(
+                "Company1", "type1", datetime.date(2023, 1, 1), 0.9, "Name1", {}
+            )
+
         with patch.object(analyzer, "analyze_document") as mock_analyze:
-            mock_analyze.side_effect = [
-                DocumentInfo(
-                    "Company1", "type1", datetime.date(2023, 1, 1), 0.9, "Name1", {}
-                ),
-                Exception("Analysis failed"),
-            ]
+            mock_analyze.side_effect = analyze_document
 
             results = analyzer.batch_analyze(docs)
 
@@ -394,3 +496,31 @@ class TestAIAnalyzer:
         assert result.document_type == "invoice"
         assert result.date == datetime.date(2023, 5, 15)
         assert result.confidence_score == 0.95
+
+
+class TestLoadJson:
+    """Test the JSON decoding helper."""
+
+    @pytest.fixture(params=["orjson", "fallback"])
+    def load_json(self, request, monkeypatch):
+        """Run each test with orjson (if installed) and the json module."""
+        if request.param == "orjson":
+            pytest.importorskip("orjson")
+        else:
+            monkeypatch.setattr(ai_analyzer, "orjson", None)
+        return ai_analyzer._load_json
+
+    def test_load_json(self, load_json):
+        """Test decoding an analysis response."""
+        data = load_json('{"company_name": "Chase", "confidence_score": 0.9}')
+        assert data == {"company_name": "Chase", "confidence_score": 0.9}
+
+    def test_load_json_accepts_nan(self, load_json):
+        """Test values only the json module accepts still decode."""
+        data = load_json('{"confidence_score": NaN}')
+        assert data["confidence_score"] != data["confidence_score"]
+
+    def test_load_json_invalid(self, load_json):
+        """Test invalid JSON raises ValueError."""
+        with pytest.raises(ValueError):
+            load_json('{"company_name": "Test", invalid json')
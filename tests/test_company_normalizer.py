@@ -0,0 +1,159 @@
+"""Tests for company normalizer module."""
+
+import pytest
+
+from src import company_normalizer
+from src.company_normalizer import CompanyNormalizer
+
+
+class TestCompanyNormalizer:
+    """Test CompanyNormalizer class."""
+
+    @pytest.fixture
+    def normalizer(self):
+        """Create a CompanyNormalizer without an output directory."""
+        return CompanyNormalizer()
+
+    def test_unknown_names(self, normalizer):
+        """Test placeholder names map to Unknown."""
+        for name in ["", "unknown", "NULL", "None"]:
+            assert normalizer.normalize_company_name(name) == "Unknown"
+
+    def test_exact_match_is_case_insensitive(self, normalizer):
+        """Test repeated names resolve to the same canonical name."""
+        canonical = normalizer.normalize_company_name("acme widgets")
+
+        assert canonical == "Acme Widgets"
+        assert normalizer.normalize_company_name("ACME WIDGETS") == canonical
+        assert len(normalizer.company_mappings) == 1
+
+    def test_exact_match_uses_casefold(self, normalizer):
+        """Test Unicode case folding when matching variations."""
+        canonical = normalizer.normalize_company_name("Straße Bank")
+
+        assert normalizer.normalize_company_name("STRASSE BANK") == canonical
+
+    def test_fuzzy_match_records_variation(self, normalizer):
+        """Test fuzzy matches are added as variations of the canonical name."""
+        canonical = normalizer.normalize_company_name("Chase Bank")
+
+        assert normalizer.normalize_company_name("The Chase Bank Inc.") == canonical
+        assert normalizer._find_exact_match("the chase bank inc.") == canonical
+
+    def test_get_folder_name(self, normalizer):
+        """Test folder lookup for known and unknown canonical names."""
+        canonical = normalizer.normalize_company_name("Wells Fargo")
+
+        assert normalizer.get_folder_name(canonical.upper()) == "Wells_Fargo"
+        assert normalizer.get_folder_name("New: Company") == "New__Company"
+
+
+class TestCompanyFolderMerging:
+    """Test duplicate company folder merging."""
+
+    @pytest.fixture
+    def output_dir(self, tmp_path):
+        """Create an output directory with two duplicate company folders."""
+        output_dir = tmp_path / "output"
+        (output_dir / "Chase_Bank" / "2023").mkdir(parents=True)
+        (output_dir / "Chase_Bank" / "2023" / "a.pdf").write_bytes(b"a")
+        (output_dir / "Chase_Bank" / "2023" / "b.pdf").write_bytes(b"b")
+        (output_dir / "Chase_Bank_Inc" / "2023").mkdir(parents=True)
+        (output_dir / "Chase_Bank_Inc" / "2023" / "a.pdf").write_bytes(b"c")
+        return output_dir
+
+    def test_count_pdfs(self, output_dir):
+        """Test PDF counting with and without an early-exit limit."""
+        folder = output_dir / "Chase_Bank"
+
+        assert CompanyNormalizer._count_pdfs(folder) == 2
+        assert CompanyNormalizer._count_pdfs(folder, limit=0) == 1
+
+    def test_auto_merge_keeps_larger_folder(self, output_dir):
+        """Test duplicates are merged into the folder holding more files."""
+        normalizer = CompanyNormalizer(output_dir=output_dir)
+
+        assert not (output_dir / "Chase_Bank_Inc").exists()
+        merged = sorted(p.name for p in (output_dir / "Chase_Bank" / "2023").iterdir())
+        assert merged == ["a.pdf", "a_1.pdf", "b.pdf"]
+        assert normalizer.normalize_company_name("Chase Bank Inc") == "Chase Bank"
+
+    def test_auto_merge_updates_mappings_in_place(self, output_dir):
+        """Test the merged company's names resolve to the kept folder."""
+        normalizer = CompanyNormalizer(output_dir=output_dir)
+
+        assert list(normalizer.company_mappings) == ["chase bank"]
+        mapping = normalizer.company_mappings["chase bank"]
+        assert "Chase_Bank_Inc" in mapping.variations
+        assert normalizer._find_exact_match("chase_bank_inc") == "Chase Bank"
+        assert normalizer.get_folder_name("Chase Bank") == "Chase_Bank"
+
+    def test_auto_merge_groups_transitive_duplicates(self, output_dir):
+        """Test a group of duplicates is merged into a single folder."""
+        (output_dir / "The_Chase_Bank").mkdir()
+        (output_dir / "The_Chase_Bank" / "c.pdf").write_bytes(b"d")
+
+        normalizer = CompanyNormalizer(output_dir=output_dir)
+
+        assert [p.name for p in output_dir.iterdir()] == ["Chase_Bank"]
+        assert CompanyNormalizer._count_pdfs(output_dir / "Chase_Bank") == 4
+        assert len(normalizer.company_mappings) == 1
+
+
+class TestProperCase:
+    """Test proper case formatting of company names."""
+
+    @pytest.mark.parametrize(
+        "name,expected",
+        [
+            ("bank of america", "Bank of America"),
+            ("acme llc", "Acme LLC"),
+            ("at&t-mobile/usa", "at&T-Mobile/USA"),
+            ("  spaced   out_co ", "  Spaced   Out_Co "),
+            ("", ""),
+        ],
+    )
+    def test_proper_case(self, name, expected):
+        """Test casing rules for small words, acronyms and delimiters."""
+        assert CompanyNormalizer()._proper_case(name) == expected
+
+
+class TestLevenshtein:
+    """Test the edit distance helper."""
+
+    @pytest.fixture(params=["polyleven", "fallback"])
+    def levenshtein(self, request, monkeypatch):
+        """Run each test with polyleven (if installed) and the fallback."""
+        if request.param == "polyleven":
+            pytest.importorskip("polyleven")
+        else:
+            monkeypatch.setattr(company_normalizer, "polyleven", None)
+        return company_normalizer._levenshtein
+
+    @pytest.mark.parametrize(
+        "a,b,expected",
+        [
+            ("kitten", "sitting", 3),
+            ("chase", "chase", 0),
+            ("", "bank", 4),
+            ("wells fargo", "wels frgo", 2),
+        ],
+    )
+    def test_distance(self, levenshtein, a, b, expected):
+        """Test exact edit distances."""
+        assert levenshtein(a, b) == expected
+        assert levenshtein(b, a) == expected
+
+    def test_bounded_distance(self, levenshtein):
+        """Test distances above the bound are reported as bound + 1."""
+        assert levenshtein("kitten", "sitting", 1) == 2
+        assert levenshtein("kitten", "sitting", 5) == 3
+
+    def test_bound_does_not_change_similarity_decision(self):
+        """Test bounded similarity agrees with the threshold decision."""
+        normalizer = CompanyNormalizer()
+
+        assert normalizer._calculate_similarity("cc", "cab c b a c", 0.5) < 0.5
+        assert normalizer._calculate_similarity(
+            "chase", "chase", 0.85
+        ) == normalizer._calculate_similarity("chase", "chase")
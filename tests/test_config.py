@@ -1,13 +1,14 @@
 """Tests for the configuration management system."""
 
+import copy
 import os
-import tempfile
 from pathlib import Path
 from unittest.mock import mock_open, patch
 
 import pytest
 import yaml
 
+from src import config as config_module
 from src.config import (
     AIConfig,
     AppConfig,
@@ -19,64 +20,94 @@ from src.config import (
     reload_config,
 )
 
+CUSTOM_CONFIG = {
+    "ai": {"preferred_provider": "anthropic", "openai": {"model": "gpt-4"}},
+    "organization": {"structure_pattern": "{company}/{year}"},
+    "processing": {"confidence_threshold": 0.8},
+    "files": {"max_file_size_mb": 100},
+    "web": {"port": 8080},
+}
 
-class TestAIConfig:
-    """Test AI configuration."""
-
-    def test_default_values(self):
-        """Test default AI configuration values."""
-        config = AIConfig()
-        assert config.preferred_provider == "openai"
-        assert config.openai_model == "gpt-3.5-turbo"
-        assert config.openai_temperature == 0.3
-        assert config.openai_max_tokens == 800
-
-
-class TestOrganizationConfig:
-    """Test organization configuration."""
-
-    def test_default_values(self):
-        """Test default organization configuration values."""
-        config = OrganizationConfig()
-        assert config.structure_pattern == "{company}/{year}/{month}"
-        assert config.filename_pattern == "{company}_{type}_{date}"
-        assert config.date_format == "%Y-%m-%d"
-
+CONFIG_YAML = yaml.safe_dump(
+    {
+        "ai": {"preferred_provider": "openai", "openai": {"model": "gpt-3.5-turbo"}},
+        "files": {"input_dir": "test_input", "output_dir": "test_output"},
+    }
+)
 
-class TestProcessingConfig:
-    """Test processing configuration."""
 
-    def test_default_values(self):
-        """Test default processing configuration values."""
-        config = ProcessingConfig()
-        assert config.enable_ocr is True
-        assert config.min_text_length == 100
-        assert config.max_text_for_ai == 4000
-        assert config.confidence_threshold == 0.7
+@pytest.fixture(autouse=True)
+def _reset_config_singleton(monkeypatch):
+    """Start every test without a global config instance."""
+    monkeypatch.setattr(config_module, "_config", None)
 
 
-class TestFileConfig:
-    """Test file configuration."""
+@pytest.fixture
+def path_exists(monkeypatch):
+    """Return a setter that makes Path.exists report a fixed answer."""
 
-    def test_default_values(self):
-        """Test default file configuration values."""
-        config = FileConfig()
-        assert config.max_file_size_mb == 50
-        assert config.allowed_extensions == [".pdf"]
-        assert config.input_dir == "input_pdfs"
-        assert config.output_dir == "output"
-        assert config.copy_mode is False
+    def _set(exists):
+        monkeypatch.setattr(config_module.Path, "exists", lambda self: exists)
 
+    return _set
 
-class TestWebConfig:
-    """Test web configuration."""
 
-    def test_default_values(self):
-        """Test default web configuration values."""
-        config = WebConfig()
-        assert config.port == 5000
-        assert config.debug is False
-        assert config.host == "0.0.0.0"
+@pytest.mark.parametrize(
+    "config_cls, expected",
+    [
+        pytest.param(
+            AIConfig,
+            {
+                "preferred_provider": "openai",
+                "openai_model": "gpt-3.5-turbo",
+                "openai_temperature": 0.3,
+                "openai_max_tokens": 800,
+            },
+            id="ai",
+        ),
+        pytest.param(
+            OrganizationConfig,
+            {
+                "structure_pattern": "{company}/{year}/{month}",
+                "filename_pattern": "{company}_{type}_{date}",
+                "date_format": "%Y-%m-%d",
+                "max_history": 1000,
+            },
+            id="organization",
+        ),
+        pytest.param(
+            ProcessingConfig,
+            {
+                "enable_ocr": True,
+                "min_text_length": 100,
+                "max_text_for_ai": 4000,
+                "confidence_threshold": 0.7,
+            },
+            id="processing",
+        ),
+        pytest.param(
+            FileConfig,
+            {
+                "max_file_size_mb": 50,
+                "allowed_extensions": [".pdf"],
+                "input_dir": "input_pdfs",
+                "output_dir": "output",
+                "copy_mode": False,
+            },
+            id="files",
+        ),
+        pytest.param(
+            WebConfig,
+            {"port": 5000, "debug": False, "host": "0.0.0.0"},
+            id="web",
+        ),
+    ],
+)
+def test_section_default_values(config_cls, expected):
+    """Test default values of each configuration section."""
+    config = config_cls()
+    actual = {name: getattr(config, name) for name in expected}
+    assert actual == expected
 
 
 class TestAppConfig:
@@ -91,40 +122,30 @@ class TestAppConfig:
         assert isinstance(config.files, FileConfig)
         assert isinstance(config.web, WebConfig)
 
-    def test_load_from_nonexistent_file(self):
+    def test_load_from_nonexistent_file(self, path_exists):
         """Test loading config when no file exists."""
-        with patch("src.config.Path.exists", return_value=False):
-            config = AppConfig.load_from_file()
-            assert isinstance(config, AppConfig)
-            # Should have default values
-            assert config.ai.preferred_provider == "openai"
+        path_exists(False)
+        config = AppConfig.load_from_file()
+        assert isinstance(config, AppConfig)
+        # Should have default values
+        assert config.ai.preferred_provider == "openai"
 
-    def test_load_from_yaml_file(self):
+    def test_load_from_yaml_file(self, path_exists):
         """Test loading config from YAML file."""
-        yaml_content = """
-ai:
-  preferred_provider: "anthropic"
-  openai:
-    model: "gpt-4"
-organization:
-  structure_pattern: "{company}/{year}"
-processing:
-  confidence_threshold: 0.8
-files:
-  max_file_size_mb: 100
-web:
-  port: 8080
-"""
-        with patch("builtins.open", mock_open(read_data=yaml_content)):
-            with patch("src.config.Path.exists", return_value=True):
-                config = AppConfig.load_from_file("test_config.yaml")
-
-                assert config.ai.preferred_provider == "anthropic"
-                assert config.ai.openai_model == "gpt-4"
-                assert config.organization.structure_pattern == "{company}/{year}"
-                assert config.processing.confidence_threshold == 0.8
-                assert config.files.max_file_size_mb == 100
-                assert config.web.port == 8080
+        path_exists(True)
+        # The loader fills in the returned dict, so hand it a fresh copy
+        with patch("builtins.open", mock_open(read_data="")), patch(
+            "yaml.load",
+            side_effect=lambda *args, **kwargs: copy.deepcopy(CUSTOM_CONFIG),
+        ):
+            config = AppConfig.load_from_file("test_config.yaml")
+
+        assert config.ai.preferred_provider == "anthropic"
+        assert config.ai.openai_model == "gpt-4"
+        assert config.organization.structure_pattern == "{company}/{year}"
+        assert config.processing.confidence_threshold == 0.8
+        assert config.files.max_file_size_mb == 100
+        assert config.web.port == 8080
 
     @patch.dict(
         os.environ,
@@ -134,41 +155,66 @@ web:
             "OUTPUT_DIR": "/custom/output",
             "PORT": "3000",
             "CONFIDENCE_THRESHOLD": "0.9",
+            "AI_RESPONSE_CACHE": "/custom/responses.db",
         },
     )
-    def test_environment_variable_overrides(self):
+    def test_environment_variable_overrides(self, path_exists):
         """Test that environment variables override config values."""
-        with patch("src.config.Path.exists", return_value=False):
-            config = AppConfig.load_from_file()
-
-            assert config.ai.preferred_provider == "anthropic"
-            assert config.files.input_dir == "/custom/input"
-            assert config.files.output_dir == "/custom/output"
-            assert config.web.port == 3000
-            assert config.processing.confidence_threshold == 0.9
-
-    def test_validation_success(self):
-        """Test successful configuration validation."""
-        config = AppConfig()
-        assert config.validate() is True
+        path_exists(False)
+        config = AppConfig.load_from_file()
 
-    def test_validation_invalid_provider(self):
-        """Test validation with invalid AI provider."""
-        config = AppConfig()
-        config.ai.preferred_provider = "invalid_provider"
-        assert config.validate() is False
+        assert config.ai.preferred_provider == "anthropic"
+        assert config.files.input_dir == "/custom/input"
+        assert config.files.output_dir == "/custom/output"
+        assert config.web.port == 3000
+        assert config.processing.confidence_threshold == 0.9
+        assert config.ai.response_cache_path == "/custom/responses.db"
 
-    def test_validation_invalid_confidence_threshold(self):
-        """Test validation with invalid confidence threshold."""
-        config = AppConfig()
-        config.processing.confidence_threshold = 1.5  # Invalid, should be 0-1
-        assert config.validate() is False
-
-    def test_validation_invalid_port(self):
-        """Test validation with invalid port."""
+    @patch.dict(
+        os.environ,
+        {"PORT": "not-a-number", "DEBUG": "Yes", "AI_TEMPERATURE": "0.5"},
+    )
+    def test_environment_variable_type_conversion(self):
+        """Test env overrides are converted and invalid values skipped."""
+        config_data = AppConfig._apply_env_overrides({"web": {"port": 8080}})
+
+        assert config_data["web"]["port"] == 8080
+        assert config_data["web"]["debug"] is True
+        assert config_data["ai"]["openai_temperature"] == 0.5
+
+    @pytest.mark.parametrize(
+        "mutate, expected",
+        [
+            pytest.param(lambda config: None, True, id="defaults"),
+            pytest.param(
+                lambda config: setattr(
+                    config.ai, "preferred_provider", "invalid_provider"
+                ),
+                False,
+                id="invalid-provider",
+            ),
+            pytest.param(
+                lambda config: setattr(config.processing, "confidence_threshold", 1.5),
+                False,
+                id="invalid-confidence-threshold",
+            ),
+            pytest.param(
+                lambda config: setattr(config.ai, "batch_size", 0),
+                False,
+                id="invalid-batch-size",
+            ),
+            pytest.param(
+                lambda config: setattr(config.web, "port", 0),
+                False,
+                id="invalid-port",
+            ),
+        ],
+    )
+    def test_validation(self, mutate, expected):
+        """Test configuration validation for valid and invalid settings."""
         config = AppConfig()
-        config.web.port = 0  # Invalid port
-        assert config.validate() is False
+        mutate(config)
+        assert config.validate() is expected
 
     def test_get_ai_credentials(self):
         """Test getting AI credentials from environment."""
@@ -204,80 +250,96 @@ web:
         assert "structure_pattern" in config_dict["organization"]
 
 
+@pytest.mark.xdist_group("global_config")
 class TestGlobalConfig:
     """Test global configuration functions."""
 
     def test_get_config_singleton(self):
         """Test that get_config returns the same instance."""
-        with patch("src.config._config", None):  # Reset global config
-            config1 = get_config()
-            config2 = get_config()
-            assert config1 is config2
+        config1 = get_config()
+        config2 = get_config()
+        assert config1 is config2
 
     def test_reload_config(self):
         """Test reloading configuration."""
-        with patch("src.config._config", None):
-            original_config = get_config()
-            reloaded_config = reload_config()
+        original_config = get_config()
+        reloaded_config = reload_config()
+
+        # Should be a new instance
+        assert reloaded_config is not original_config
+        assert isinstance(reloaded_config, AppConfig)
 
-            # Should be a new instance
-            assert reloaded_config is not original_config
-            assert isinstance(reloaded_config, AppConfig)
+    def test_reset(self):
+        """Test reset drops the global instance and reloads .env once."""
+        with patch.object(config_module, "load_dotenv") as mock_load_dotenv:
+            AppConfig.reset()
+            config = get_config()
+            AppConfig.load_from_file()
+            assert mock_load_dotenv.call_count == 1
+
+            AppConfig.reset()
+            assert get_config() is not config
+            assert mock_load_dotenv.call_count == 2
 
 
 class TestConfigFileDiscovery:
     """Test configuration file discovery."""
 
-    def test_find_config_file_current_directory(self):
+    def test_find_config_file_current_directory(self, monkeypatch):
         """Test finding config file in current directory."""
-        with patch("src.config.Path.exists") as mock_exists:
-            # Mock that config.yaml exists in current directory
-            def exists_side_effect():
-                # This will be called on each Path object
-                return True  # Just return True for the first path (config.yaml)
-
-            mock_exists.side_effect = [
-                True,
-                False,
-                False,
-                False,
-            ]  # Only first path exists
+        # Only config.yaml in the current directory exists
+        monkeypatch.setattr(
+            config_module.Path, "exists", lambda self: self == Path("config.yaml")
+        )
 
-            found_path = AppConfig._find_config_file()
-            assert found_path == Path("config.yaml")
+        found_path = AppConfig._find_config_file()
+        assert found_path == Path("config.yaml")
 
-    def test_find_config_file_not_found(self):
+    def test_find_config_file_not_found(self, path_exists):
         """Test when no config file is found."""
-        with patch("src.config.Path.exists", return_value=False):
-            found_path = AppConfig._find_config_file()
-            assert found_path is None
+        path_exists(False)
+        found_path = AppConfig._find_config_file()
+        assert found_path is None
 
 
 @pytest.fixture
-def temp_config_file():
+def temp_config_file(tmp_path):
     """Create a temporary config file for testing."""
-    config_content = {
-        "ai": {"preferred_provider": "openai", "openai": {"model": "gpt-3.5-turbo"}},
-        "files": {"input_dir": "test_input", "output_dir": "test_output"},
-    }
-
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-        yaml.dump(config_content, f)
-        temp_path = f.name
-
-    yield temp_path
-
-    # Cleanup
-    os.unlink(temp_path)
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(CONFIG_YAML)
+    return str(config_path)
 
 
-def test_load_from_real_file(temp_config_file):
-    """Test loading configuration from a real temporary file."""
+def test_load_from_yaml_content(path_exists):
+    """Test loading configuration from YAML content without touching disk."""
+    path_exists(True)
     # Clear environment variables that might override config and disable dotenv
-    with patch.dict("os.environ", {}, clear=True), patch("src.config.load_dotenv"):
-        config = AppConfig.load_from_file(temp_config_file)
+    with patch.dict("os.environ", {}, clear=True), patch.object(
+        config_module, "load_dotenv"
+    ), patch("builtins.open", mock_open(read_data=CONFIG_YAML)):
+        config = AppConfig.load_from_file("in_memory_config.yaml")
 
         assert config.ai.preferred_provider == "openai"
         assert config.ai.openai_model == "gpt-3.5-turbo"
         assert config.files.input_dir == "test_input"
         assert config.files.output_dir == "test_output"
+
+
+def test_load_from_real_file_reuses_parsed_yaml(temp_config_file):
+    """Test an unchanged config file is only parsed once."""
+    with patch.dict("os.environ", {}, clear=True), patch.object(
+        config_module, "load_dotenv"
+    ):
+        AppConfig.load_from_file(temp_config_file)
+
+        with patch("yaml.load", side_effect=AssertionError("re-parsed")):
+            config = AppConfig.load_from_file(temp_config_file)
+
+        assert config.files.input_dir == "test_input"
+
+        # Env overrides applied to the first load must not leak into the cache
+        with patch.dict("os.environ", {"INPUT_DIR": "override"}):
+            AppConfig.load_from_file(temp_config_file)
+        assert AppConfig.load_from_file(temp_config_file).files.input_dir == (
+            "test_input"
+        )
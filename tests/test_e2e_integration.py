@@ -4,11 +4,12 @@ import io
 import json
 import os
 from pathlib import Path
-from unittest.mock import MagicMock, Mock, patch
+from unittest.mock import ANY, MagicMock, Mock, patch
 
 import pytest
 from PIL import Image
 
+from src import pdf_processor
 from src.ai_analyzer import AIAnalyzer, DocumentInfo
 from src.file_organizer import FileOrganizer
 from src.pdf_processor import PDFDocument, PDFProcessor
@@ -24,162 +25,23 @@ def temp_dirs(tmp_path):
     return input_dir, output_dir
 
 
-def create_mock_scanned_pdf(
-    tmp_path, content_text="ACME CORPORATION\nInvoice #12345\nDate: 2023-06-15"
-):
-    """Create a mock scanned PDF file for testing."""
-    pdf_file = tmp_path / "scanned_invoice.pdf"
-    # Create a minimal PDF structure that will trigger OCR
-    pdf_content = (
-        b"""%PDF-1.4
-1 0 obj
-<<
-/Type /Catalog
-/Pages 2 0 R
->>
-endobj
-2 0 obj
-<<
-/Type /Pages
-/Kids [3 0 R]
-/Count 1
->>
-endobj
-3 0 obj
-<<
-/Type /Page
-/Parent 2 0 R
-/MediaBox [0 0 612 792]
-/Resources <<
-/XObject << /Im0 4 0 R >>
->>
-/Contents 5 0 R
->>
-endobj
-4 0 obj
-<<
-/Type /XObject
-/Subtype /Image
-/Width 100
-/Height 100
-/ColorSpace /DeviceRGB
-/BitsPerComponent 8
-/Length 100
->>
-stream
-"""
-        + b"x" * 100
-        + b"""
-endstream
-endobj
-5 0 obj
-<<
-/Length 44
->>
-stream
-q
-100 0 0 100 50 600 cm
-/Im0 Do
-Q
-endstream
-endobj
-xref
-0 6
-0000000000 65535 f 
-0000000009 00000 n 
-0000000058 00000 n 
-0000000115 00000 n 
-0000000251 00000 n 
-0000000400 00000 n 
-trailer
-<<
-/Size 6
-/Root 1 0 R
->>
-startxref
-493
-%%EOF"""
-    )
-
-    pdf_file.write_bytes(pdf_content)
-    return pdf_file, content_text
-
-
-def create_test_pdf_with_content(tmp_path, filename, text_content):
-    """Create a test PDF with specific text content."""
-    pdf_file = tmp_path / filename
-
-    # Create a simple PDF with text content
-    pdf_content = f"""%PDF-1.4
-1 0 obj
-<<
-/Type /Catalog
-/Pages 2 0 R
->>
-endobj
-2 0 obj
-<<
-/Type /Pages
-/Kids [3 0 R]
-/Count 1
->>
-endobj
-3 0 obj
-<<
-/Type /Page
-/Parent 2 0 R
-/MediaBox [0 0 612 792]
-/Contents 4 0 R
->>
-endobj
-4 0 obj
-<<
-/Length {len(text_content) + 20}
->>
-stream
-BT
-/F1 12 Tf
-50 750 Td
-({text_content}) Tj
-ET
-endstream
-endobj
-xref
-0 5
-0000000000 65535 f 
-0000000009 00000 n 
-0000000058 00000 n 
-0000000115 00000 n 
-0000000204 00000 n 
-trailer
-<<
-/Size 5
-/Root 1 0 R
->>
-startxref
-{300 + len(text_content)}
-%%EOF""".encode()
-
-    pdf_file.write_bytes(pdf_content)
-    return pdf_file
-
-
 class TestOCRIntegration:
     """Test OCR functionality end-to-end."""
 
     @pytest.fixture
-    def processor(self):
-        """Create a PDFProcessor instance."""
+    def processor(self, monkeypatch):
+        """Create a PDFProcessor instance that OCRs through pytesseract."""
+        monkeypatch.setattr(pdf_processor, "tesserocr", None)
         return PDFProcessor()
 
     # Use global helper function
 
     @patch("src.pdf_processor.convert_from_path")
     @patch("src.pdf_processor.pytesseract.image_to_string")
-    def test_ocr_end_to_end(self, mock_ocr, mock_convert, processor, tmp_path):
+    def test_ocr_end_to_end(self, mock_ocr, mock_convert, processor, scanned_pdf_path):
         """Test complete OCR workflow from PDF to text."""
-        # Create mock scanned PDF
-        pdf_file, expected_text = create_mock_scanned_pdf(tmp_path)
+        pdf_file = scanned_pdf_path
+        expected_text = "ACME CORPORATION\nInvoice #12345\nDate: 2023-06-15"
 
         # Setup OCR mocks
         mock_image = MagicMock()
@@ -195,19 +57,25 @@ class TestOCRIntegration:
         assert "2023-06-15" in extracted_text
 
         # Verify OCR was called correctly
-        mock_convert.assert_called_once_with(pdf_file)
+        mock_convert.assert_called_once_with(
+            pdf_file,
+            dpi=200,
+            grayscale=True,
+            thread_count=ANY,
+            output_folder=ANY,
+            paths_only=True,
+            fmt="png",
+        )
         mock_ocr.assert_called_once_with(mock_image, config="--psm 6")
 
     @patch("src.pdf_processor.convert_from_path")
     @patch("src.pdf_processor.pytesseract.image_to_string")
     def test_pdf_processing_with_ocr_fallback(
-        self, mock_ocr, mock_convert, processor, tmp_path
+        self, mock_ocr, mock_convert, processor, scanned_pdf_path
     ):
         """Test that PDF processing automatically uses OCR for scanned documents."""
-        # Create mock scanned PDF with minimal text
-        pdf_file, ocr_text = create_mock_scanned_pdf(
-            tmp_path, "BANK STATEMENT\nChase Bank\nJuly 2023"
-        )
+        pdf_file = scanned_pdf_path
+        ocr_text = "BANK STATEMENT\nChase Bank\nJuly 2023"
 
         # Setup mocks
         mock_image = MagicMock()
@@ -231,9 +99,9 @@ class TestOCRIntegration:
             assert "BANK STATEMENT" in document.text_content
             assert "Chase Bank" in document.text_content
 
-    def test_ocr_with_multiple_pages(self, processor, tmp_path):
+    def test_ocr_with_multiple_pages(self, processor, scanned_pdf_path):
         """Test OCR with multiple page PDF."""
-        pdf_file, _ = create_mock_scanned_pdf(tmp_path)
+        pdf_file = scanned_pdf_path
 
         with patch("src.pdf_processor.convert_from_path") as mock_convert:
             with patch("src.pdf_processor.pytesseract.image_to_string") as mock_ocr:
@@ -387,73 +255,18 @@ class TestEndToEndWorkflow:
         output_dir.mkdir()
         return input_dir, output_dir
 
-    def create_test_pdf_with_content(self, tmp_path, filename, text_content):
-        """Create a test PDF with specific text content."""
-        pdf_file = tmp_path / filename
-
-        # Create a simple PDF with text content
-        pdf_content = f"""%PDF-1.4
-1 0 obj
-<<
-/Type /Catalog
-/Pages 2 0 R
->>
-endobj
-2 0 obj
-<<
-/Type /Pages
-/Kids [3 0 R]
-/Count 1
->>
-endobj
-3 0 obj
-<<
-/Type /Page
-/Parent 2 0 R
-/MediaBox [0 0 612 792]
-/Contents 4 0 R
->>
-endobj
-4 0 obj
-<<
-/Length {len(text_content) + 20}
->>
-stream
-BT
-/F1 12 Tf
-50 750 Td
-({text_content}) Tj
-ET
-endstream
-endobj
-xref
-0 5
-0000000000 65535 f 
-0000000009 00000 n 
-0000000058 00000 n 
-0000000115 00000 n 
-0000000204 00000 n 
-trailer
-<<
-/Size 5
-/Root 1 0 R
->>
-startxref
-{300 + len(text_content)}
-%%EOF""".encode()
-
-        pdf_file.write_bytes(pdf_content)
-        return pdf_file
-
     @patch.dict("os.environ", {"OPENAI_API_KEY": "test-key"})
     @patch("openai.OpenAI")
-    def test_complete_workflow_bank_statement(self, mock_openai, temp_dirs):
+    def test_complete_workflow_bank_statement(
+        self, mock_openai, temp_dirs, text_pdf_bytes
+    ):
         """Test complete workflow: PDF → OCR → AI Analysis → File Organization."""
         input_dir, output_dir = temp_dirs
 
         # Create test PDF
         pdf_content = "CHASE BANK\nMonthly Statement\nStatement Date: March 15, 2023\nAccount Number: ****1234"
-        pdf_file = create_test_pdf_with_content(input_dir, "statement.pdf", pdf_content)
+        pdf_file = input_dir / "statement.pdf"
+        pdf_file.write_bytes(text_pdf_bytes(pdf_content))
 
         # Setup AI mock
         mock_client = MagicMock()
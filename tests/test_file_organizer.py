@@ -1,9 +1,11 @@
 """Tests for file organizer module."""
 import datetime
+import errno
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from unittest.mock import MagicMock, Mock, patch
+from unittest.mock import patch
 
 import pytest
 
@@ -269,6 +271,78 @@ class TestFileOrganizer:
             assert result["status"] == "success"
             assert Path(result["new_path"]).exists()
 
+    def test_batch_organize_same_name_gets_unique_paths(self, organizer, temp_dirs):
+        """Test concurrent organization never reuses a target filename."""
+        input_dir, _ = temp_dirs
+
+        documents = []
+        doc_infos = []
+        for i in range(20):
+            source_file = input_dir / f"bill{i}.pdf"
+            source_file.write_bytes(f"content {i}".encode())
+            date = datetime.date(2023, 4, 1)
+            documents.append(
+                PDFDocument(source_file, "Bill", {}, date, "Acme", "bill", "Bill")
+            )
+            doc_infos.append(DocumentInfo("Acme", "bill", date, 0.9, "Bill", {}))
+
+        results = organizer.batch_organize(documents, doc_infos)
+
+        new_paths = [result["new_path"] for result in results]
+        assert [result["original_path"] for result in results] == [
+            str(document.file_path) for document in documents
+        ]
+        assert len(set(new_paths)) == 20
+        assert all(Path(path).exists() for path in new_paths)
+        assert len(organizer.organization_history) == 20
+
+    def test_batch_organize_max_workers(self, organizer, temp_dirs):
+        """Test max_workers caps the thread pool used for a batch."""
+        input_dir, _ = temp_dirs
+
+        documents = []
+        doc_infos = []
+        for i in range(4):
+            source_file = input_dir / f"bill{i}.pdf"
+            source_file.write_bytes(f"content {i}".encode())
+            date = datetime.date(2023, 4, 1)
+            documents.append(
+                PDFDocument(source_file, "Bill", {}, date, "Acme", "bill", "Bill")
+            )
+            doc_infos.append(DocumentInfo("Acme", "bill", date, 0.9, "Bill", {}))
+
+        with patch(
+            "src.file_organizer.ThreadPoolExecutor", wraps=ThreadPoolExecutor
+        ) as mock_executor:
+            results = organizer.batch_organize(documents, doc_infos, max_workers=2)
+
+        mock_executor.assert_called_once_with(max_workers=2)
+        assert [result["status"] for result in results] == ["success"] * 4
+
+    def test_max_history_keeps_recent_entries(self, temp_dirs):
+        """Test history is capped while the summary counts every file."""
+        input_dir, output_dir = temp_dirs
+        organizer = FileOrganizer(output_dir=output_dir, max_history=2)
+
+        for i, company in enumerate(["Acme", "Globex", "Initech"]):
+            source_file = input_dir / f"doc{i}.pdf"
+            source_file.write_bytes(b"fake pdf content")
+            date = datetime.date(2023, 1, i + 1)
+            organizer.organize_file(
+                PDFDocument(source_file, "Text", {}, date, company, "bill", "Bill"),
+                DocumentInfo(company, "bill", date, 0.9, "Bill", {}),
+            )
+
+        assert [entry.company_name for entry in organizer.organization_history] == [
+            "Globex",
+            "Initech",
+        ]
+        assert organizer.organization_history[-1].original_path == source_file
+
+        summary = organizer.get_organization_summary()
+        assert summary["total_organized"] == 3
+        assert summary["document_types"] == ["bill"]
+
     def test_organize_with_custom_strategy(self, temp_dirs):
         """Test organization with custom strategy."""
         input_dir, output_dir = temp_dirs
@@ -385,11 +459,31 @@ class TestFileOrganizer:
             additional_metadata={},
         )
 
-        # Mock shutil.move to raise permission error
-        with patch("shutil.move", side_effect=PermissionError("Permission denied")):
+        # Mock the rename and shutil.move fallback to raise permission error
+        with patch("os.replace", side_effect=PermissionError("Permission denied")):
             with pytest.raises(PermissionError):
                 organizer.organize_file(pdf_doc, doc_info)
 
+        with patch(
+            "os.replace", side_effect=OSError(errno.EXDEV, "Cross-device link")
+        ), patch("shutil.move", side_effect=PermissionError("Permission denied")):
+            with pytest.raises(PermissionError):
+                organizer.organize_file(pdf_doc, doc_info)
+
+    def test_move_file_falls_back_across_devices(self, temp_dirs):
+        """Test cross-device moves fall back to shutil.move."""
+        input_dir, output_dir = temp_dirs
+        source = input_dir / "test.pdf"
+        source.write_bytes(b"fake pdf content")
+        target = output_dir / "moved.pdf"
+
+        with patch(
+            "os.replace", side_effect=OSError(errno.EXDEV, "Cross-device link")
+        ), patch("shutil.move") as mock_move:
+            FileOrganizer._move_file(source, target)
+
+        mock_move.assert_called_once_with(str(source), str(target))
+
     def test_sanitize_filename_special_characters(self, organizer):
         """Test filename sanitization with special characters."""
         test_cases = [
@@ -426,6 +520,182 @@ class TestFileOrganizer:
         assert target_dir == expected_path
         assert target_dir.exists()
 
+    def test_create_directory_structure_caches_created_dirs(self, organizer, temp_dirs):
+        """Test repeat directories skip mkdir until cleanup removes them."""
+        _, output_dir = temp_dirs
+
+        doc_info = DocumentInfo(
+            company_name="Test Company",
+            document_type="test",
+            date=datetime.date(2023, 5, 1),
+            confidence_score=0.9,
+            suggested_name="Test Document",
+            additional_metadata={},
+        )
+
+        target_dir = organizer._create_directory_structure(doc_info)
+        assert output_dir / "Test_Company" in organizer._created_dirs
+
+        with patch.object(Path, "mkdir") as mock_mkdir:
+            assert organizer._create_directory_structure(doc_info) == target_dir
+            mock_mkdir.assert_not_called()
+
+        organizer._cleanup_empty_directories(target_dir)
+        assert not (output_dir / "Test_Company").exists()
+
+        assert organizer._create_directory_structure(doc_info).exists()
+
+    @pytest.mark.parametrize("copy_file", [False, True])
+    def test_organize_file_recreates_externally_deleted_dir(
+        self, organizer, temp_dirs, copy_file
+    ):
+        """Test a cached directory removed outside the organizer is recreated."""
+        input_dir, output_dir = temp_dirs
+
+        doc_info = DocumentInfo(
+            company_name="Test Company",
+            document_type="test",
+            date=datetime.date(2023, 5, 1),
+            confidence_score=0.9,
+            suggested_name="Test Document",
+            additional_metadata={},
+        )
+
+        first = input_dir / "first.pdf"
+        first.write_bytes(b"first")
+        organizer.organize_file(
+            PDFDocument(file_path=first, text_content="", metadata={}),
+            doc_info,
+            copy_file=copy_file,
+        )
+
+        # Deleted by hand while the organizer still has it cached
+        shutil.rmtree(output_dir / "Test_Company")
+
+        second = input_dir / "second.pdf"
+        second.write_bytes(b"second")
+        new_path = organizer.organize_file(
+            PDFDocument(file_path=second, text_content="", metadata={}),
+            doc_info,
+            copy_file=copy_file,
+        )
+
+        assert new_path.read_bytes() == b"second"
+        assert new_path.parent in organizer._created_dirs
+
+    def test_ensure_unique_path_skips_existing_suffixes(self, organizer, temp_dirs):
+        """Test the next free counter is picked from existing names."""
+        _, output_dir = temp_dirs
+
+        for name in ["doc.pdf", "doc_1.pdf", "doc_2.pdf", "doc_4.pdf"]:
+            (output_dir / name).write_bytes(b"pdf")
+
+        assert organizer._ensure_unique_path(output_dir / "doc.pdf") == (
+            output_dir / "doc_3.pdf"
+        )
+        assert organizer._ensure_unique_path(output_dir / "new.pdf") == (
+            output_dir / "new.pdf"
+        )
+
+    def test_ensure_unique_path_ignores_case(self, organizer, temp_dirs):
+        """Test names differing only in case count as taken."""
+        _, output_dir = temp_dirs
+
+        for name in ["doc.pdf", "DOC_1.pdf"]:
+            (output_dir / name).write_bytes(b"pdf")
+        organizer._pending_paths.add(output_dir / "Report.pdf")
+
+        # doc_1.pdf would overwrite DOC_1.pdf on a case-insensitive filesystem
+        assert organizer._ensure_unique_path(output_dir / "doc.pdf") == (
+            output_dir / "doc_2.pdf"
+        )
+        assert organizer._ensure_unique_path(output_dir / "report.pdf") == (
+            output_dir / "report_1.pdf"
+        )
+
+    def test_strategy_change_reparses_structure_pattern(
+        self, organizer, temp_dirs, caplog
+    ):
+        """Test assigning a new strategy updates the directory layout."""
+        _, output_dir = temp_dirs
+
+        doc_info = DocumentInfo(
+            company_name="Test Company",
+            document_type="bill",
+            date=datetime.date(2023, 5, 1),
+            confidence_score=0.9,
+            suggested_name="Test Document",
+            additional_metadata={},
+        )
+
+        organizer.strategy = OrganizationStrategy(
+            structure_pattern="Archive/{type}/{year}/{day}"
+        )
+
+        assert "Ignoring unsupported parts ['Archive']" in caplog.text
+
+        target_dir = organizer._create_directory_structure(doc_info)
+        assert target_dir == output_dir / "bill" / "2023" / "01"
+
+    def test_generate_filename_keeps_unknown_braces_literal(self, organizer):
+        """Test only supported placeholders are substituted in the pattern."""
+        organizer.strategy = OrganizationStrategy(
+            filename_pattern="{company}-{year}{_{date}}", date_format="%Y%m"
+        )
+        doc_info = DocumentInfo(
+            company_name="Acme Corp",
+            document_type="bill",
+            date=datetime.date(2023, 5, 1),
+            confidence_score=0.9,
+            suggested_name="Test Document",
+            additional_metadata={},
+        )
+
+        filename = organizer._generate_filename(doc_info)
+        assert filename == "Acme_Corp-{year}{_202305}.pdf"
+
+    def test_cleanup_empty_directories_stops_at_non_empty_parent(
+        self, organizer, temp_dirs
+    ):
+        """Test cleanup removes empty levels and keeps populated ones."""
+        _, output_dir = temp_dirs
+
+        leaf = output_dir / "Acme" / "2023" / "01 - January"
+        leaf.mkdir(parents=True)
+        (output_dir / "Acme" / "other.pdf").write_bytes(b"pdf")
+
+        organizer._cleanup_empty_directories(leaf)
+
+        assert not (output_dir / "Acme" / "2023").exists()
+        assert (output_dir / "Acme").exists()
+
+        # Already removed directories are ignored
+        organizer._cleanup_empty_directories(leaf)
+        assert output_dir.exists()
+
+    def test_create_directory_structure_caches_company_lookup(self, organizer):
+        """Test a repeated raw company name is normalized only once."""
+        doc_info = DocumentInfo(
+            company_name="acme widgets",
+            document_type="bill",
+            date=None,
+            confidence_score=0.9,
+            suggested_name="Test Document",
+            additional_metadata={},
+        )
+
+        first_dir = organizer._create_directory_structure(doc_info)
+        with patch.object(
+            organizer.company_normalizer, "normalize_company_name"
+        ) as mock_normalize:
+            assert organizer._create_directory_structure(doc_info) == first_dir
+            mock_normalize.assert_not_called()
+
+        assert organizer._company_cache["acme widgets"] == (
+            "Acme Widgets",
+            "Acme_Widgets",
+        )
+
     def test_batch_organize_empty_list(self, organizer):
         """Test batch organization with empty lists."""
         results = organizer.batch_organize([], [])
@@ -1,10 +1,12 @@
 """Tests for LM Studio client module."""
+import threading
 from unittest.mock import MagicMock, Mock, patch
 
 import pytest
 import requests
 
 from src.lm_studio_client import LMStudioClient
+from src.response_cache import ResponseCache
 
 
 class TestLMStudioClient:
@@ -22,7 +24,36 @@ class TestLMStudioClient:
         client = LMStudioClient("http://localhost:1234/v1/", "test-model")
         assert client.base_url == "http://localhost:1234"
 
-    @patch("src.lm_studio_client.requests.post")
+    @pytest.mark.parametrize(
+        "base_url, expected",
+        [
+            ("http://192.168.1.1/v1", "http://192.168.1.1"),
+            ("http://192.168.1.1", "http://192.168.1.1"),
+            ("http://lmstudio.local:1234/", "http://lmstudio.local:1234"),
+            ("http://host/llm/v1", "http://host/llm"),
+            ("http://host/dev", "http://host/dev"),
+        ],
+    )
+    def test_initialization_keeps_rest_of_url(self, base_url, expected):
+        """Test only a trailing /v1 path segment is removed from the URL."""
+        client = LMStudioClient(base_url, "test-model")
+        assert client.base_url == expected
+
+    def test_session_reused_across_requests(self):
+        """Test all requests share one pooled session."""
+        client = LMStudioClient("http://localhost:1234", "test-model")
+
+        with patch.object(client.session, "post") as mock_post:
+            mock_post.return_value = MagicMock(status_code=404)
+            client.generate_response("Test prompt")
+
+        # The generate endpoint plus every alternative endpoint/payload pair
+        assert mock_post.call_count == 9
+        # Every format is sent with the same stop sequences
+        stops = {tuple(call[1]["json"]["stop"]) for call in mock_post.call_args_list}
+        assert stops == {("Human:", "User:")}
+
+    @patch("src.lm_studio_client.requests.Session.post")
     def test_generate_response_success(self, mock_post):
         """Test successful response generation."""
         # Setup mock response
@@ -37,7 +68,7 @@ class TestLMStudioClient:
         assert result == "Test AI response"
         mock_post.assert_called_once()
 
-    @patch("src.lm_studio_client.requests.post")
+    @patch("src.lm_studio_client.requests.Session.post")
     def test_generate_response_text_field(self, mock_post):
         """Test response with 'text' field."""
         mock_response = MagicMock()
@@ -50,7 +81,7 @@ class TestLMStudioClient:
 
         assert result == "Response in text field"
 
-    @patch("src.lm_studio_client.requests.post")
+    @patch("src.lm_studio_client.requests.Session.post")
     def test_generate_response_choices_field(self, mock_post):
         """Test response with 'choices' field."""
         mock_response = MagicMock()
@@ -63,7 +94,7 @@ class TestLMStudioClient:
 
         assert result == "Response in choices"
 
-    @patch("src.lm_studio_client.requests.post")
+    @patch("src.lm_studio_client.requests.Session.post")
     def test_generate_response_http_error(self, mock_post):
         """Test response with HTTP error."""
         mock_response = MagicMock()
@@ -78,7 +109,7 @@ class TestLMStudioClient:
             result = client.generate_response("Test prompt")
             assert result == "fallback response"
 
-    @patch("src.lm_studio_client.requests.post")
+    @patch("src.lm_studio_client.requests.Session.post")
     def test_generate_response_exception(self, mock_post):
         """Test response with exception."""
         mock_post.side_effect = requests.RequestException("Connection error")
@@ -88,43 +119,73 @@ class TestLMStudioClient:
 
         assert result == ""
 
-    @patch("src.lm_studio_client.requests.post")
+    @patch("src.lm_studio_client.requests.Session.post")
     def test_try_alternative_endpoints_completions(self, mock_post):
         """Test alternative completions endpoint."""
-        # First call fails, second succeeds
-        mock_post.side_effect = [
-            MagicMock(status_code=404),  # First endpoint fails
-            MagicMock(
-                status_code=200,
-                json=lambda: {"choices": [{"text": "Alternative response"}]},
-            ),
-        ]
+
+        # Only the completions endpoint answers; respond by URL so the test
+        # doesn't depend on the order endpoints are probed in
+        def post(url, json, timeout):
+            if url == "http://localhost:1234/v1/completions":
+                return MagicMock(
+                    status_code=200,
+                    json=lambda: {"choices": [{"text": "Alternative response"}]},
+                )
+            return MagicMock(status_code=404)
+
+        mock_post.side_effect = post
 
         client = LMStudioClient("http://localhost:1234", "test-model")
         result = client._try_alternative_endpoints("Test prompt")
 
         assert result == "Alternative response"
-        assert mock_post.call_count == 2
 
-    @patch("src.lm_studio_client.requests.post")
+    @patch("src.lm_studio_client.requests.Session.post")
     def test_try_alternative_endpoints_chat(self, mock_post):
         """Test alternative chat endpoint."""
-        # First two calls fail, third succeeds
-        mock_post.side_effect = [
-            MagicMock(status_code=404),  # completions fails
-            MagicMock(
-                status_code=200,
-                json=lambda: {"choices": [{"message": {"content": "Chat response"}}]},
-            ),
-        ]
+
+        # Only the model-less payload on /generate returns a chat message
+        def post(url, json, timeout):
+            if url == "http://localhost:1234/generate" and "model" not in json:
+                return MagicMock(
+                    status_code=200,
+                    json=lambda: {
+                        "choices": [{"message": {"content": "Chat response"}}]
+                    },
+                )
+            return MagicMock(status_code=404)
+
+        mock_post.side_effect = post
 
         client = LMStudioClient("http://localhost:1234", "test-model")
         result = client._try_alternative_endpoints("Test prompt")
 
         assert result == "Chat response"
-        assert mock_post.call_count == 2
 
-    @patch("src.lm_studio_client.requests.post")
+    @patch("src.lm_studio_client.requests.Session.post")
+    def test_multi_paragraph_json_reply_not_truncated(self, mock_post):
+        """Test a reply containing blank lines survives the stop sequences."""
+        reply = '{\n  "company_name": "Acme",\n\n  "document_type": "invoice"\n}'
+
+        # Like a real server, cut the reply at the first stop sequence sent
+        def post(url, json, timeout):
+            if url != "http://localhost:1234/generate" or "model" in json:
+                return MagicMock(status_code=404)
+            content = reply
+            for stop in json["stop"]:
+                content = content.split(stop)[0]
+            return MagicMock(
+                status_code=200,
+                json=lambda: {"choices": [{"message": {"content": content}}]},
+            )
+
+        mock_post.side_effect = post
+
+        client = LMStudioClient("http://localhost:1234", "test-model")
+
+        assert client.generate_response("Test prompt") == reply
+
+    @patch("src.lm_studio_client.requests.Session.post")
     def test_try_alternative_endpoints_all_fail(self, mock_post):
         """Test when all alternative endpoints fail."""
         mock_post.return_value = MagicMock(status_code=404)
@@ -138,7 +199,7 @@ class TestLMStudioClient:
 
     def test_payload_structure(self):
         """Test that the request payload has correct structure."""
-        with patch("src.lm_studio_client.requests.post") as mock_post:
+        with patch("src.lm_studio_client.requests.Session.post") as mock_post:
             mock_response = MagicMock()
             mock_response.status_code = 200
             mock_response.json.return_value = {"response": "test"}
@@ -161,7 +222,7 @@ class TestLMStudioClient:
         """Test URL construction for different endpoints."""
         client = LMStudioClient("http://localhost:1234", "test-model")
 
-        with patch("src.lm_studio_client.requests.post") as mock_post:
+        with patch("src.lm_studio_client.requests.Session.post") as mock_post:
             mock_post.return_value = MagicMock(status_code=404)
 
             client.generate_response("test")
@@ -170,7 +231,7 @@ class TestLMStudioClient:
             first_call_url = mock_post.call_args_list[0][0][0]
             assert first_call_url == "http://localhost:1234/api/generate"
 
-    @patch("src.lm_studio_client.requests.post")
+    @patch("src.lm_studio_client.requests.Session.post")
     def test_timeout_parameter(self, mock_post):
         """Test that timeout is set correctly."""
         mock_post.return_value = MagicMock(
@@ -180,6 +241,194 @@ class TestLMStudioClient:
         client = LMStudioClient("http://localhost:1234", "test-model")
         client.generate_response("Test prompt")
 
-        # Check that timeout was set
+        # Check that (connect, read) timeouts were set
+        call_kwargs = mock_post.call_args[1]
+        assert call_kwargs["timeout"] == (3.0, 30.0)
+
+    @patch("src.lm_studio_client.requests.Session.post")
+    def test_custom_generation_settings(self, mock_post):
+        """Test timeouts and generation limits are configurable."""
+        mock_post.return_value = MagicMock(
+            status_code=200, json=lambda: {"response": "test"}
+        )
+
+        client = LMStudioClient(
+            "http://localhost:1234",
+            "test-model",
+            connect_timeout=1.0,
+            read_timeout=10.0,
+            max_tokens=200,
+            temperature=0.0,
+        )
+        client.generate_response("Test prompt")
+
         call_kwargs = mock_post.call_args[1]
-        assert call_kwargs["timeout"] == 30
+        assert call_kwargs["timeout"] == (1.0, 10.0)
+        assert call_kwargs["json"]["max_tokens"] == 200
+        assert call_kwargs["json"]["temperature"] == 0.0
+
+    @patch("src.lm_studio_client.requests.Session.post")
+    def test_response_cache(self, mock_post, tmp_path):
+        """Test identical prompts are answered from the cache."""
+        mock_post.return_value = MagicMock(
+            status_code=200, json=lambda: {"response": "Cached answer"}
+        )
+        cache = ResponseCache(tmp_path / "responses.db")
+
+        try:
+            client = LMStudioClient("http://localhost:1234", "test-model", cache=cache)
+
+            assert client.generate_response("Test prompt") == "Cached answer"
+            assert client.generate_response("Test prompt") == "Cached answer"
+            assert mock_post.call_count == 1
+
+            client.generate_response("Other prompt")
+            assert mock_post.call_count == 2
+        finally:
+            cache.close()
+
+    @patch("src.lm_studio_client.requests.Session.post")
+    def test_generate_response_cache_hit(self, mock_post):
+        """Test repeated prompts are answered in-process by default."""
+        mock_post.return_value = MagicMock(
+            status_code=200, json=lambda: {"response": "Cached answer"}
+        )
+        client = LMStudioClient("http://localhost:1234", "test-model")
+
+        assert client.generate_response("Test prompt") == "Cached answer"
+        assert client.generate_response("Test prompt") == "Cached answer"
+        assert mock_post.call_count == 1
+
+    @patch("src.lm_studio_client.requests.Session.post")
+    def test_generate_responses_overlap(self, mock_post):
+        """Test several prompts are in flight at once, answers in input order."""
+        # Every request waits for the others, so this only passes if all
+        # three are sent at the same time
+        barrier = threading.Barrier(3, timeout=5)
+
+        def post(url, json, timeout):
+            # A server without prompt-array support rejects the batch
+            if isinstance(json["prompt"], list):
+                return MagicMock(status_code=400)
+            barrier.wait()
+            return MagicMock(
+                status_code=200, json=lambda: {"response": json["prompt"].upper()}
+            )
+
+        mock_post.side_effect = post
+        client = LMStudioClient("http://localhost:1234", "test-model")
+        # Probing for an endpoint is serialized, so start from a known one
+        client._working_endpoint = (
+            "http://localhost:1234/api/generate",
+            client._generate_template,
+        )
+
+        responses = client.generate_responses(["a", "b", "c"], max_workers=3)
+
+        assert responses == ["A", "B", "C"]
+        assert client.generate_responses([]) == []
+        assert not client._batch_supported
+
+    @patch("src.lm_studio_client.requests.Session.post")
+    def test_generate_responses_batch(self, mock_post):
+        """Test prompts go out as arrays, one POST per batch, answers in order."""
+
+        def post(url, json, timeout):
+            assert url == "http://localhost:1234/v1/completions"
+            # Answer in reverse to check choices are matched up by index
+            choices = [
+                {"index": i, "text": prompt.upper()}
+                for i, prompt in enumerate(json["prompt"])
+            ]
+            return MagicMock(status_code=200, json=lambda: {"choices": choices[::-1]})
+
+        mock_post.side_effect = post
+        client = LMStudioClient("http://localhost:1234", "test-model")
+        client.cache.set(client._cache_key("c"), "cached")
+
+        responses = client.generate_responses(["a", "b", "c", "d", "e"], max_batch=2)
+
+        assert responses == ["A", "B", "cached", "D", "E"]
+        assert [call[1]["json"]["prompt"] for call in mock_post.call_args_list] == [
+            ["a", "b"],
+            ["d", "e"],
+        ]
+        # Batches are generated with the same settings as single prompts, so
+        # their answers can be cached under the same keys
+        assert all(
+            call[1]["json"]["stop"] == client._generate_template["stop"]
+            for call in mock_post.call_args_list
+        )
+        assert client.generate_response("a") == "A"
+        assert mock_post.call_count == 2
+
+    @patch("src.lm_studio_client.requests.Session.post")
+    def test_working_endpoint_remembered(self, mock_post):
+        """Test later requests go straight to the endpoint that answered."""
+
+        def post(url, json, timeout):
+            if url == "http://localhost:1234/v1/completions" and "model" in json:
+                return MagicMock(
+                    status_code=200,
+                    json=lambda: {"choices": [{"text": json["prompt"].upper()}]},
+                )
+            return MagicMock(status_code=404)
+
+        mock_post.side_effect = post
+
+        client = LMStudioClient("http://localhost:1234", "test-model")
+        assert client.generate_response("first") == "FIRST"
+
+        assert client.generate_response("second") == "SECOND"
+        second_urls = [
+            call[0][0]
+            for call in mock_post.call_args_list
+            if call[1]["json"]["prompt"] == "second"
+        ]
+        assert second_urls == ["http://localhost:1234/v1/completions"]
+
+    @patch("src.lm_studio_client.requests.Session.post")
+    def test_concurrent_requests_probe_once(self, mock_post):
+        """Test requests starting together probe the endpoints only once."""
+
+        def post(url, json, timeout):
+            if url == "http://localhost:1234/v1/completions" and isinstance(
+                json["prompt"], str
+            ):
+                return MagicMock(
+                    status_code=200,
+                    json=lambda: {"choices": [{"text": json["prompt"].upper()}]},
+                )
+            return MagicMock(status_code=404)
+
+        mock_post.side_effect = post
+        client = LMStudioClient("http://localhost:1234", "test-model")
+
+        responses = client.generate_responses(["a", "b", "c", "d"], max_workers=4)
+
+        assert responses == ["A", "B", "C", "D"]
+        urls = [call[0][0] for call in mock_post.call_args_list]
+        assert urls.count("http://localhost:1234/api/generate") == 1
+        assert client._working_endpoint[0] == "http://localhost:1234/v1/completions"
+
+    @patch("src.lm_studio_client.requests.Session.post")
+    def test_probing_stops_when_server_unreachable(self, mock_post):
+        """Test a dropped connection ends probing instead of trying every endpoint."""
+        mock_post.side_effect = requests.ConnectionError("refused")
+
+        client = LMStudioClient("http://localhost:1234", "test-model")
+
+        assert client._try_alternative_endpoints("Test prompt") == ""
+        assert mock_post.call_count == 1
+
+    @patch("src.lm_studio_client.requests.Session.post")
+    def test_working_endpoint_reprobed_on_failure(self, mock_post):
+        """Test a failing remembered endpoint falls back to probing."""
+        mock_post.return_value = MagicMock(status_code=404)
+
+        client = LMStudioClient("http://localhost:1234", "test-model")
+        client._working_endpoint = ("http://localhost:1234/gone", {"model": "m"})
+
+        assert client.generate_response("Test prompt") == ""
+        assert client._working_endpoint is None
+        assert mock_post.call_args_list[1][0][0] == "http://localhost:1234/api/generate"
@@ -1,13 +1,31 @@
 """Tests for PDF processor module."""
 import datetime
+import io
+import queue
+import subprocess
+import sys
+from dataclasses import fields
 from pathlib import Path
-from unittest.mock import MagicMock, Mock, patch
+from types import SimpleNamespace
+from unittest.mock import ANY, MagicMock, Mock, patch
 
+import pypdf
 import pytest
 
+from src import pdf_processor
 from src.pdf_processor import PDFDocument, PDFProcessor
 
 
+def _page(text=""):
+    """Return a pypdf page stub whose extract_text returns the given text."""
+    return SimpleNamespace(extract_text=lambda: text)
+
+
+def _reader(pages=(), metadata=None):
+    """Return a pypdf reader stub with the given pages and metadata."""
+    return SimpleNamespace(pages=list(pages), metadata=metadata)
+
+
 class TestPDFDocument:
     """Test PDFDocument data class."""
 
@@ -49,13 +67,34 @@ class TestPDFDocument:
         assert doc_dict["extracted_date"] == "2023-03-15"
         assert doc_dict["company_name"] == "Chase Bank"
 
+    def test_document_to_dict_covers_all_fields(self):
+        """Test to_dict includes every field and copies metadata."""
+        metadata = {"pages": 1}
+        doc = PDFDocument(Path("test.pdf"), "Sample text", metadata)
+
+        doc_dict = doc.to_dict()
+        assert set(doc_dict) == {field.name for field in fields(PDFDocument)}
+        assert doc_dict["extracted_date"] is None
+        assert doc_dict["metadata"] == metadata
+        assert doc_dict["metadata"] is not metadata
+
+    @pytest.mark.skipif(sys.version_info < (3, 10), reason="needs slotted dataclasses")
+    def test_document_has_no_instance_dict(self):
+        """Test documents are slotted, so they carry no per-instance __dict__."""
+        doc = PDFDocument(Path("test.pdf"), "Sample text", {})
+
+        assert not hasattr(doc, "__dict__")
+        with pytest.raises(AttributeError):
+            doc.page_count = 1
+
 
 class TestPDFProcessor:
     """Test PDFProcessor class."""
 
     @pytest.fixture
-    def processor(self):
-        """Create a PDFProcessor instance."""
+    def processor(self, monkeypatch):
+        """Create a PDFProcessor instance that OCRs through pytesseract."""
+        monkeypatch.setattr(pdf_processor, "tesserocr", None)
         return PDFProcessor()
 
     def test_processor_initialization(self, processor):
@@ -71,12 +110,7 @@ class TestPDFProcessor:
         pdf_file = tmp_path / "test.pdf"
         pdf_file.write_bytes(b"fake pdf content")
 
-        # Setup mock
-        mock_reader = MagicMock()
-        mock_page = MagicMock()
-        mock_page.extract_text.return_value = "Sample PDF text content"
-        mock_reader.pages = [mock_page]
-        mock_pdf_reader.return_value = mock_reader
+        mock_pdf_reader.return_value = _reader([_page("Sample PDF text content")])
 
         # Test extraction
         text = processor.extract_text(pdf_file)
@@ -84,6 +118,49 @@ class TestPDFProcessor:
         assert text == "Sample PDF text content"
         mock_pdf_reader.assert_called_once()
 
+    @patch("src.pdf_processor.pypdf.PdfReader")
+    def test_extract_text_prefers_pymupdf(self, mock_pdf_reader, processor, tmp_path):
+        """Test that PyMuPDF text is used without parsing the file with pypdf."""
+        fitz = pytest.importorskip("fitz")
+
+        pdf_file = tmp_path / "test.pdf"
+        doc = fitz.open()
+        doc.new_page().insert_text((72, 72), "Text from PyMuPDF")
+        doc.new_page()
+        doc.save(pdf_file)
+        doc.close()
+
+        page_texts = []
+        text = processor.extract_text(pdf_file, page_texts=page_texts)
+
+        assert text == "Text from PyMuPDF"
+        assert len(page_texts) == 2
+        assert page_texts[1] == ""
+        mock_pdf_reader.assert_not_called()
+
+    @patch("src.pdf_processor.pdfplumber.open")
+    @patch("src.pdf_processor.pypdf.PdfReader")
+    def test_extract_text_scanned_pdf_skips_fallbacks(
+        self, mock_pdf_reader, mock_pdfplumber, processor, tmp_path
+    ):
+        """Test pages PyMuPDF finds no text on go straight to OCR."""
+        fitz = pytest.importorskip("fitz")
+
+        pdf_file = tmp_path / "scanned.pdf"
+        doc = fitz.open()
+        doc.new_page()
+        doc.new_page()
+        doc.save(pdf_file)
+        doc.close()
+
+        page_texts = []
+        text = processor.extract_text(pdf_file, page_texts=page_texts)
+
+        assert text == ""
+        assert page_texts == ["", ""]
+        mock_pdf_reader.assert_not_called()
+        mock_pdfplumber.assert_not_called()
+
     @patch("src.pdf_processor.pdfplumber.open")
     def test_extract_text_with_pdfplumber(self, mock_pdfplumber, processor, tmp_path):
         """Test extracting text using pdfplumber as fallback."""
@@ -113,14 +190,14 @@ class TestPDFProcessor:
         pdf_file.write_bytes(b"fake pdf content")
 
         with patch("src.pdf_processor.pypdf.PdfReader") as mock_reader:
-            mock_pdf = MagicMock()
-            mock_pdf.metadata = {
-                "/Title": "Test Document",
-                "/Author": "Test Author",
-                "/CreationDate": "D:20230315120000",
-            }
-            mock_pdf.pages = [MagicMock()]
-            mock_reader.return_value = mock_pdf
+            mock_reader.return_value = _reader(
+                [_page()],
+                metadata={
+                    "/Title": "Test Document",
+                    "/Author": "Test Author",
+                    "/CreationDate": "D:20230315120000",
+                },
+            )
 
             metadata = processor.extract_metadata(pdf_file)
 
@@ -146,9 +223,179 @@ class TestPDFProcessor:
                 text = processor.extract_text_with_ocr(pdf_file)
 
                 assert text == "OCR extracted text"
-        mock_convert.assert_called_once_with(pdf_file)
+        mock_convert.assert_called_once_with(
+            pdf_file,
+            dpi=200,
+            grayscale=True,
+            thread_count=ANY,
+            output_folder=ANY,
+            paths_only=True,
+            fmt="png",
+        )
         mock_ocr.assert_called_once_with(mock_image, config="--psm 6")
 
+    def test_ocr_dpi_caps_wide_pages(self, processor, tmp_path):
+        """Test pages wider than ocr_max_width pixels are rendered at a lower DPI."""
+        fitz = pytest.importorskip("fitz")
+        doc = fitz.open()
+        doc.new_page(width=612, height=792)  # US Letter
+        doc.new_page(width=1440, height=792)  # 20 inches wide
+        pdf_file = tmp_path / "wide.pdf"
+        doc.save(pdf_file)
+        doc.close()
+
+        # Page sizes come from the text extraction pass
+        page_widths = []
+        processor.extract_text(pdf_file, page_widths=page_widths)
+        assert page_widths == [612, 1440]
+
+        # 2000 px across 20 inches
+        assert processor._ocr_dpi(page_widths) == 100
+        assert processor._ocr_dpi(page_widths, pages=[1]) == 200
+        assert processor._ocr_dpi(None) == 200
+
+        with patch("src.pdf_processor.convert_from_path") as mock_convert, patch(
+            "fitz.open", side_effect=AssertionError("PDF parsed again")
+        ):
+            mock_convert.return_value = []
+            processor.extract_text_with_ocr(pdf_file, page_widths=page_widths)
+        assert mock_convert.call_args.kwargs["dpi"] == 100
+
+    def test_ocr_dependencies_import_lazily(self):
+        """Test importing the module leaves the OCR and fallback libraries unloaded."""
+        lazy = ("pdfplumber", "pytesseract", "pdf2image")
+        code = (
+            "import sys, src.pdf_processor; "
+            f"print(sorted(set({lazy!r}) & set(sys.modules)))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=Path(__file__).parent.parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+        assert result.stdout.strip() == "[]"
+        assert callable(pdf_processor.convert_from_path)
+        with pytest.raises(AttributeError):
+            pdf_processor.not_a_dependency
+
+    @pytest.mark.parametrize(
+        "env_value, expected",
+        [("3", 3), ("0", 1), ("many", 8), ("", 8)],
+        ids=["override", "at-least-one", "invalid", "unset"],
+    )
+    def test_ocr_workers(self, monkeypatch, env_value, expected):
+        """Test OCR_CONCURRENCY overrides the number of OCR workers."""
+        monkeypatch.setattr(pdf_processor.os, "cpu_count", lambda: 8)
+        monkeypatch.setenv("OCR_CONCURRENCY", env_value)
+
+        assert pdf_processor._ocr_workers() == expected
+
+    def test_ocr_extraction_groups_pages_per_worker(
+        self, processor, tmp_path, monkeypatch
+    ):
+        """Test each worker OCRs its run of pages with one tesseract call."""
+        monkeypatch.setenv("OCR_CONCURRENCY", "2")
+        pdf_file = tmp_path / "scanned.pdf"
+        pdf_file.write_bytes(b"fake pdf content")
+
+        def ocr_image_list(list_file, config):
+            # Tesseract ends every page of a multi-page input with a form feed
+            pages = Path(list_file).read_text().split()
+            return "".join(f"Text of {Path(page).stem}\f" for page in pages)
+
+        with patch("src.pdf_processor.convert_from_path") as mock_convert:
+            with patch("src.pdf_processor.pytesseract.image_to_string") as mock_ocr:
+                mock_convert.return_value = [f"page{i}.png" for i in range(1, 6)]
+                mock_ocr.side_effect = ocr_image_list
+
+                text = processor.extract_text_with_ocr(pdf_file)
+
+        assert text.splitlines() == [f"Text of page{i}" for i in range(1, 6)]
+        assert mock_ocr.call_count == 2
+
+    def test_ocr_extraction_page_group_falls_back_per_page(
+        self, processor, tmp_path, monkeypatch
+    ):
+        """Test a run of pages is OCRed page by page when its call fails."""
+        monkeypatch.setenv("OCR_CONCURRENCY", "1")
+        pdf_file = tmp_path / "scanned.pdf"
+        pdf_file.write_bytes(b"fake pdf content")
+
+        def ocr(image, config):
+            if image.endswith(".txt"):
+                raise RuntimeError("tesseract failed")
+            return f"Text of {Path(image).stem}"
+
+        with patch("src.pdf_processor.convert_from_path") as mock_convert:
+            with patch("src.pdf_processor.pytesseract.image_to_string") as mock_ocr:
+                mock_convert.return_value = ["page1.png", "page2.png"]
+                mock_ocr.side_effect = ocr
+
+                text = processor.extract_text_with_ocr(pdf_file)
+
+        assert text.splitlines() == ["Text of page1", "Text of page2"]
+        assert mock_ocr.call_count == 3
+
+    def test_ocr_page_group_single_page_retried(self, tmp_path, monkeypatch):
+        """Test a failed one-page run is still OCRed on its own."""
+        monkeypatch.setattr(pdf_processor, "tesserocr", None)
+
+        def ocr(image, config):
+            if image.endswith(".txt"):
+                raise RuntimeError("tesseract failed")
+            return f"Text of {Path(image).stem}"
+
+        with patch("src.pdf_processor.pytesseract.image_to_string") as mock_ocr:
+            mock_ocr.side_effect = ocr
+
+            page_texts = PDFProcessor._ocr_page_group(str(tmp_path), (0, ["page1.png"]))
+
+        assert page_texts == ["Text of page1"]
+        assert mock_ocr.call_count == 2
+
+    def test_ocr_extraction_with_tesserocr(self, processor, tmp_path, monkeypatch):
+        """Test pages are OCRed in-process when tesserocr is installed."""
+        pdf_file = tmp_path / "scanned.pdf"
+        pdf_file.write_bytes(b"fake pdf content")
+
+        mock_tesserocr = MagicMock()
+        mock_api = mock_tesserocr.PyTessBaseAPI.return_value
+        mock_api.GetUTF8Text.return_value = "In-process OCR text"
+        monkeypatch.setattr(pdf_processor, "tesserocr", mock_tesserocr)
+        monkeypatch.setattr(pdf_processor, "_tesseract_engines", queue.SimpleQueue())
+
+        with patch("src.pdf_processor.convert_from_path") as mock_convert:
+            with patch("src.pdf_processor.pytesseract.image_to_string") as mock_ocr:
+                mock_convert.return_value = ["page1.png"]
+
+                text = processor.extract_text_with_ocr(pdf_file)
+
+        assert text == "In-process OCR text"
+        mock_api.SetImageFile.assert_called_once_with("page1.png")
+        mock_ocr.assert_not_called()
+
+    def test_tesserocr_engines_reused_across_documents(
+        self, processor, tmp_path, monkeypatch
+    ):
+        """Test the tesseract engine outlives each document's OCR thread pool."""
+        pdf_file = tmp_path / "scanned.pdf"
+        pdf_file.write_bytes(b"fake pdf content")
+
+        mock_tesserocr = MagicMock()
+        mock_tesserocr.PyTessBaseAPI.return_value.GetUTF8Text.return_value = "Text"
+        monkeypatch.setattr(pdf_processor, "tesserocr", mock_tesserocr)
+        monkeypatch.setattr(pdf_processor, "_tesseract_engines", queue.SimpleQueue())
+
+        with patch("src.pdf_processor.convert_from_path") as mock_convert:
+            mock_convert.return_value = ["page1.png"]
+            for _ in range(3):
+                assert processor.extract_text_with_ocr(pdf_file) == "Text"
+
+        mock_tesserocr.PyTessBaseAPI.assert_called_once()
+
     def test_process_pdf(self, processor, tmp_path):
         """Test processing a complete PDF file."""
         # Create a mock PDF file
@@ -163,6 +410,92 @@ class TestPDFProcessor:
                 assert document.text_content == "Extracted text"
                 assert document.metadata == {"pages": 1}
 
+    def test_process_pdf_parses_file_once(self, processor, tmp_path):
+        """Test text and metadata share a single pypdf reader."""
+        pdf_file = tmp_path / "document.pdf"
+        pdf_file.write_bytes(b"fake pdf content")
+
+        with patch("src.pdf_processor.pypdf.PdfReader") as mock_reader:
+            mock_reader.return_value = _reader(
+                [_page("Statement text " * 10)], metadata={"/Title": "Statement"}
+            )
+
+            document = processor.process_pdf(pdf_file)
+
+        mock_reader.assert_called_once()
+        assert document.text_content.startswith("Statement text")
+        assert document.metadata["title"] == "Statement"
+        assert document.metadata["page_count"] == 1
+
+    def test_process_pdf_reads_file_once(self, processor, tmp_path, monkeypatch):
+        """Test PyMuPDF and pypdf both parse the bytes read by process_pdf."""
+        fitz = pytest.importorskip("fitz")
+
+        pdf_file = tmp_path / "document.pdf"
+        doc = fitz.open()
+        doc.new_page().insert_text((72, 72), "Statement text " * 10)
+        doc.save(pdf_file)
+        doc.close()
+
+        fitz_open = Mock(wraps=fitz.open)
+        monkeypatch.setattr(fitz, "open", fitz_open)
+        with patch(
+            "src.pdf_processor.pypdf.PdfReader", wraps=pypdf.PdfReader
+        ) as reader:
+            document = processor.process_pdf(pdf_file)
+
+        assert document.text_content.startswith("Statement text")
+        assert document.metadata["page_count"] == 1
+        assert fitz_open.call_args.kwargs["stream"] == pdf_file.read_bytes()
+        assert isinstance(reader.call_args.args[0], io.BytesIO)
+
+    def test_process_pdf_ocrs_only_pages_without_text(self, processor, tmp_path):
+        """Test OCR is limited to pages that have no text layer."""
+        pdf_file = tmp_path / "hybrid.pdf"
+        pdf_file.write_bytes(b"fake pdf content")
+
+        pages = [
+            _page(page_text)
+            for page_text in [
+                "Cover page with a title",
+                "",
+                "",
+                "Appendix heading here",
+                "",
+            ]
+        ]
+
+        with patch("src.pdf_processor.pypdf.PdfReader") as mock_reader, patch.object(
+            processor, "extract_text_with_ocr", return_value="Scanned text"
+        ) as mock_ocr:
+            mock_reader.return_value = _reader(pages)
+
+            document = processor.process_pdf(pdf_file)
+
+        mock_ocr.assert_called_once_with(pdf_file, pages=[2, 3, 5], page_widths=ANY)
+        assert document.text_content.startswith("Cover page with a title")
+        assert document.text_content.endswith("Scanned text")
+
+    def test_ocr_extraction_selected_pages(self, processor, tmp_path, monkeypatch):
+        """Test selected pages are rasterized in consecutive runs."""
+        monkeypatch.setenv("OCR_CONCURRENCY", "4")
+        pdf_file = tmp_path / "scanned.pdf"
+        pdf_file.write_bytes(b"fake pdf content")
+
+        with patch("src.pdf_processor.convert_from_path") as mock_convert:
+            with patch("src.pdf_processor.pytesseract.image_to_string") as mock_ocr:
+                mock_convert.side_effect = [["page2.png", "page3.png"], ["page5.png"]]
+                mock_ocr.return_value = "text"
+
+                processor.extract_text_with_ocr(pdf_file, pages=[5, 2, 3])
+
+        ranges = [
+            (call.kwargs["first_page"], call.kwargs["last_page"])
+            for call in mock_convert.call_args_list
+        ]
+        assert ranges == [(2, 3), (5, 5)]
+        assert mock_ocr.call_count == 3
+
     def test_process_pdf_with_empty_text(self, processor, tmp_path):
         """Test processing PDF with no extractable text (triggers OCR)."""
         # Create a mock PDF file
@@ -185,14 +518,17 @@ class TestPDFProcessor:
         # Create mock PDF files
         pdf1 = tmp_path / "doc1.pdf"
         pdf2 = tmp_path / "doc2.pdf"
-        pdf1.write_bytes(b"fake pdf 1")
-        pdf2.write_bytes(b"fake pdf 2")
+        pdf1.write_bytes(b"%PDF-1.4 fake pdf 1")
+        pdf2.write_bytes(b"%PDF-1.4 fake pdf 2")
+
+        results = {
+            pdf1: PDFDocument(pdf1, "Text 1", {}, None, None, None, None),
+            pdf2: PDFDocument(pdf2, "Text 2", {}, None, None, None, None),
+        }
 
         with patch.object(processor, "process_pdf") as mock_process:
-            mock_process.side_effect = [
-                PDFDocument(pdf1, "Text 1", {}, None, None, None, None),
-                PDFDocument(pdf2, "Text 2", {}, None, None, None, None),
-            ]
+            # Files run concurrently, so answer by path rather than call order
+            mock_process.side_effect = results.__getitem__
 
             documents = processor.batch_process([pdf1, pdf2])
 
@@ -200,15 +536,62 @@ class TestPDFProcessor:
             assert documents[0].file_path == pdf1
             assert documents[1].file_path == pdf2
 
+    def test_batch_process_preserves_order(self, processor, tmp_path):
+        """Test concurrent batch results keep the input order."""
+        pdf_paths = [tmp_path / f"doc{i}.pdf" for i in range(8)]
+        for pdf_path in pdf_paths:
+            pdf_path.write_bytes(b"%PDF-1.4")
+
+        with patch.object(processor, "process_pdf") as mock_process:
+            mock_process.side_effect = lambda path: PDFDocument(path, "", {})
+
+            documents = processor.batch_process(pdf_paths, max_workers=4)
+
+        assert [document.file_path for document in documents] == pdf_paths
+        assert processor.batch_process([]) == []
+
+    def test_batch_process_splits_ocr_workers(self, tmp_path, monkeypatch):
+        """Test each file of a batch gets its share of the OCR threads."""
+        monkeypatch.setenv("OCR_CONCURRENCY", "8")
+        pdf_paths = [tmp_path / f"doc{i}.pdf" for i in range(4)]
+        for pdf_path in pdf_paths:
+            pdf_path.write_bytes(b"%PDF-1.4")
+        processor = PDFProcessor()
+
+        with patch.object(PDFProcessor, "process_pdf", autospec=True) as mock_process:
+            mock_process.side_effect = lambda proc, path: PDFDocument(
+                path, "", {"ocr_workers": proc.ocr_workers}
+            )
+
+            documents = processor.batch_process(pdf_paths, max_workers=2)
+
+        # 8 OCR threads shared by 2 files at a time
+        assert [document.metadata["ocr_workers"] for document in documents] == [4] * 4
+        assert processor.ocr_workers is None
+
+    def test_batch_process_in_worker_processes(self, tmp_path, text_pdf_bytes):
+        """Test batches can be parsed in worker processes, keeping input order."""
+        pdf_paths = []
+        for company in ("Acme Corporation", "Globex Industries", "Initech Inc"):
+            pdf_path = tmp_path / f"{company.split()[0]}.pdf"
+            pdf_path.write_bytes(text_pdf_bytes(f"{company} monthly statement"))
+            pdf_paths.append(pdf_path)
+        (tmp_path / "notes.pdf").write_bytes(b"not a pdf")
+
+        documents = PDFProcessor().batch_process(
+            pdf_paths + [tmp_path / "notes.pdf"], max_workers=2, use_processes=True
+        )
+
+        assert [document.file_path for document in documents] == pdf_paths
+        assert "Globex Industries" in documents[1].text_content
+
     def test_extract_text_empty_pdf(self, processor, tmp_path):
         """Test extracting text from empty PDF."""
         pdf_file = tmp_path / "empty.pdf"
         pdf_file.write_bytes(b"fake pdf content")
 
         with patch("src.pdf_processor.pypdf.PdfReader") as mock_reader:
-            mock_pdf = MagicMock()
-            mock_pdf.pages = []
-            mock_reader.return_value = mock_pdf
+            mock_reader.return_value = _reader()
 
             text = processor.extract_text(pdf_file)
             assert text == ""
@@ -230,10 +613,7 @@ class TestPDFProcessor:
         pdf_file.write_bytes(b"fake pdf content")
 
         with patch("src.pdf_processor.pypdf.PdfReader") as mock_reader:
-            mock_pdf = MagicMock()
-            mock_pdf.metadata = None
-            mock_pdf.pages = [MagicMock()]
-            mock_reader.return_value = mock_pdf
+            mock_reader.return_value = _reader([_page()])
 
             metadata = processor.extract_metadata(pdf_file)
             assert metadata["page_count"] == 1
@@ -283,21 +663,73 @@ class TestPDFProcessor:
         pdf_file.write_bytes(b"Not a real PDF")
         assert not processor.is_valid_pdf(pdf_file)
 
+    def test_is_valid_pdf_valid_file(self, processor, tmp_path):
+        """Test PDF validation accepts a PDF header and rejects directories."""
+        pdf_file = tmp_path / "valid.pdf"
+        pdf_file.write_bytes(b"%PDF-1.7\n")
+        pdf_dir = tmp_path / "folder.pdf"
+        pdf_dir.mkdir()
+
+        assert processor.is_valid_pdf(pdf_file)
+        assert not processor.is_valid_pdf(pdf_dir)
+
+    def test_batch_process_skips_invalid_files(self, processor, tmp_path):
+        """Test files without a PDF header are skipped before processing."""
+        pdf_file = tmp_path / "doc.pdf"
+        pdf_file.write_bytes(b"%PDF-1.4")
+        html_file = tmp_path / "download.pdf"
+        html_file.write_bytes(b"<html>Not found</html>")
+        missing_file = tmp_path / "missing.pdf"
+
+        with patch.object(processor, "process_pdf") as mock_process:
+            mock_process.side_effect = lambda path: PDFDocument(path, "", {})
+
+            documents = processor.batch_process([html_file, pdf_file, missing_file])
+
+        assert [document.file_path for document in documents] == [pdf_file]
+        mock_process.assert_called_once_with(pdf_file)
+
     def test_batch_process_with_failures(self, processor, tmp_path):
         """Test batch processing with some failures."""
         pdf1 = tmp_path / "doc1.pdf"
         pdf2 = tmp_path / "doc2.pdf"
-        pdf1.write_bytes(b"fake pdf 1")
-        pdf2.write_bytes(b"fake pdf 2")
+        pdf1.write_bytes(b"%PDF-1.4 fake pdf 1")
+        pdf2.write_bytes(b"%PDF-1.4 fake pdf 2")
+
+        def process_pdf(pdf_path):
+            if pdf_path == pdf2:
+                raise Exception("Processing failed")
+            return PDFDocument(pdf1, "Text 1", {}, None, None, None, None)
 
         with patch.object(processor, "process_pdf") as mock_process:
-            mock_process.side_effect = [
-                PDFDocument(pdf1, "Text 1", {}, None, None, None, None),
-                Exception("Processing failed"),
-            ]
+            mock_process.side_effect = process_pdf
 
             documents = processor.batch_process([pdf1, pdf2])
 
             # Should only return successful documents
             assert len(documents) == 1
             assert documents[0].file_path == pdf1
+
+    @patch("src.pdf_processor.pypdf.PdfReader")
+    def test_extract_text_encoding_error_fallback(
+        self, mock_pdf_reader, processor, tmp_path
+    ):
+        """Test pages failing with a decode error use the encoding fallback."""
+        pdf_file = tmp_path / "test.pdf"
+        pdf_file.write_bytes(b"fake pdf content")
+
+        mock_page = MagicMock()
+        mock_page.extract_text.side_effect = UnicodeDecodeError(
+            "utf-8", b"\xff", 0, 1, "invalid start byte"
+        )
+        mock_pdf_reader.return_value.pages = [mock_page]
+
+        with patch.object(
+            processor,
+            "_extract_text_with_encoding_fallback",
+            return_value="Recovered text",
+        ) as mock_fallback:
+            text = processor.extract_text(pdf_file)
+
+        assert text == "Recovered text"
+        mock_fallback.assert_called_once_with(mock_page)
@@ -0,0 +1,197 @@
+"""Tests for the document processing pipeline."""
+
+import datetime
+import queue
+import threading
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from src.ai_analyzer import AIAnalyzer, DocumentInfo
+from src.file_organizer import FileOrganizer
+from src.pdf_processor import PDFDocument, PDFProcessor
+from src.pipeline import _DONE, DocumentPipeline
+
+
+def _process_pdf(pdf_path):
+    """Stand-in for PDFProcessor.process_pdf that echoes the file's stem."""
+    return PDFDocument(Path(pdf_path), f"Text of {Path(pdf_path).stem}", {})
+
+
+def _analyze_document(pdf_doc):
+    """Stand-in for AIAnalyzer.analyze_document naming the company after the file."""
+    return DocumentInfo(
+        pdf_doc.file_path.stem,
+        "bill",
+        datetime.date(2023, 4, 1),
+        0.9,
+        "Bill",
+        {},
+    )
+
+
+@pytest.fixture
+def stages():
+    """Stage stubs that answer by argument, so thread timing doesn't matter."""
+    processor = Mock(spec_set=PDFProcessor)
+    processor.process_pdf.side_effect = _process_pdf
+    analyzer = Mock(spec_set=AIAnalyzer)
+    analyzer.analyze_document.side_effect = _analyze_document
+    analyzer.analyze_documents_batch.side_effect = lambda docs, batch_size: [
+        _analyze_document(doc) for doc in docs
+    ]
+    organizer = Mock(spec_set=FileOrganizer)
+    organizer.organize_file.side_effect = lambda pdf_doc, doc_info, copy: Path(
+        "out", doc_info.company_name + ".pdf"
+    )
+    return processor, analyzer, organizer
+
+
+class TestDocumentPipeline:
+    """Test DocumentPipeline."""
+
+    def test_run_returns_results_in_input_order(self, stages):
+        """Test every file goes through all three stages, results in order."""
+        processor, analyzer, organizer = stages
+        paths = [Path(f"doc{i}.pdf") for i in range(10)]
+
+        results = DocumentPipeline(*stages, queue_size=2).run(paths, copy_files=True)
+
+        assert [result.pdf_path for result in results] == paths
+        assert [result.new_path for result in results] == [
+            Path("out", f"doc{i}.pdf") for i in range(10)
+        ]
+        assert all(result.succeeded for result in results)
+        assert analyzer.analyze_document.call_count == 10
+        # Concurrent analysis means files may be filed out of order
+        organizer.organize_file.assert_any_call(
+            results[-1].pdf_document, results[-1].doc_info, True
+        )
+
+    @pytest.mark.parametrize(
+        "stage, method",
+        [(0, "process_pdf"), (1, "analyze_document"), (2, "organize_file")],
+    )
+    def test_failure_is_isolated_to_one_file(self, stages, stage, method, caplog):
+        """Test a failing file skips later stages without stopping the batch."""
+        stub = getattr(stages[stage], method)
+        succeed = stub.side_effect
+
+        def fail_doc1(*args):
+            if "doc1" in str(args[0]):
+                raise RuntimeError("boom")
+            return succeed(*args)
+
+        stub.side_effect = fail_doc1
+        paths = [Path(f"doc{i}.pdf") for i in range(3)]
+
+        results = DocumentPipeline(*stages).run(paths)
+
+        assert [result.succeeded for result in results] == [True, False, True]
+        assert results[1].error == "boom"
+        # The failure is logged with its traceback
+        (record,) = [r for r in caplog.records if r.levelname == "ERROR"]
+        assert record.exc_info[1] is not None
+        assert results[1].new_path is None
+        # Only files that got through the earlier stages reach the later ones
+        _, analyzer, organizer = stages
+        assert analyzer.analyze_document.call_count == (2 if stage == 0 else 3)
+        assert organizer.organize_file.call_count == (3 if stage == 2 else 2)
+
+    def test_stages_overlap(self, stages):
+        """Test extraction continues while an earlier file is being analyzed."""
+        processor, analyzer, _ = stages
+        second_extracted = threading.Event()
+
+        def process_pdf(pdf_path):
+            if Path(pdf_path).stem == "doc1":
+                second_extracted.set()
+            return _process_pdf(pdf_path)
+
+        def analyze_document(pdf_doc):
+            # Analysis of the first file only finishes once the second file
+            # has been extracted, which a serial loop would never do
+            if pdf_doc.file_path.stem == "doc0":
+                assert second_extracted.wait(timeout=5)
+            return _analyze_document(pdf_doc)
+
+        processor.process_pdf.side_effect = process_pdf
+        analyzer.analyze_document.side_effect = analyze_document
+
+        results = DocumentPipeline(*stages).run([Path("doc0.pdf"), Path("doc1.pdf")])
+
+        assert all(result.succeeded for result in results)
+
+    def test_analyses_run_concurrently(self, stages):
+        """Test several AI requests are in flight at once."""
+        _, analyzer, _ = stages
+        # Every analysis waits for the others, so this only passes if all
+        # three are running at the same time
+        barrier = threading.Barrier(3, timeout=5)
+
+        def analyze_document(pdf_doc):
+            barrier.wait()
+            return _analyze_document(pdf_doc)
+
+        analyzer.analyze_document.side_effect = analyze_document
+        paths = [Path(f"doc{i}.pdf") for i in range(3)]
+
+        results = DocumentPipeline(*stages, analyze_workers=3).run(paths)
+
+        assert all(result.succeeded for result in results)
+        assert [result.new_path for result in results] == [
+            Path("out", f"doc{i}.pdf") for i in range(3)
+        ]
+
+    def test_analyze_batches_waiting_documents(self, stages):
+        """Test waiting documents are analyzed several per AI request."""
+        _, analyzer, _ = stages
+        paths = [Path(f"doc{i}.pdf") for i in range(10)]
+
+        results = DocumentPipeline(
+            *stages, analyze_workers=1, analyze_batch_size=4
+        ).run(paths)
+
+        assert [result.doc_info.company_name for result in results] == [
+            f"doc{i}" for i in range(10)
+        ]
+        # How many documents are waiting depends on timing, but every one is
+        # analyzed exactly once, at most four per request
+        batches = [c.args[0] for c in analyzer.analyze_documents_batch.call_args_list]
+        assert all(2 <= len(batch) <= 4 for batch in batches)
+        assert sum(map(len, batches)) + analyzer.analyze_document.call_count == 10
+
+    def test_take_batch_stops_at_batch_size_and_end_marker(self, stages):
+        """Test batches hold at most analyze_batch_size documents."""
+        to_analyze = queue.Queue()
+        for item in ["a", "b", "c", "d", "e", _DONE]:
+            to_analyze.put(item)
+        pipeline = DocumentPipeline(*stages, analyze_batch_size=3)
+
+        assert pipeline._take_batch(to_analyze) == (["a", "b", "c"], False)
+        assert pipeline._take_batch(to_analyze) == (["d", "e"], True)
+
+    def test_run_with_no_files(self, stages):
+        """Test an empty batch returns no results."""
+        assert DocumentPipeline(*stages).run([]) == []
+
+    def test_run_organizes_real_files(self, stages, tmp_path):
+        """Test the pipeline files real PDFs with a real FileOrganizer."""
+        processor, analyzer, _ = stages
+        input_dir = tmp_path / "input"
+        input_dir.mkdir()
+        paths = []
+        for name in ("acme", "globex"):
+            pdf_path = input_dir / f"{name}.pdf"
+            pdf_path.write_bytes(b"%PDF-1.4 fake")
+            paths.append(pdf_path)
+        organizer = FileOrganizer(
+            output_dir=tmp_path / "output", enable_company_normalization=False
+        )
+
+        results = DocumentPipeline(processor, analyzer, organizer).run(paths)
+
+        assert all(result.succeeded for result in results)
+        assert all(result.new_path.exists() for result in results)
+        assert not any(path.exists() for path in paths)
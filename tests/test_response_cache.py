@@ -0,0 +1,89 @@
+"""Tests for response cache module."""
+from unittest.mock import patch
+
+import pytest
+
+from src.response_cache import MemoryResponseCache, ResponseCache
+
+
+class TestResponseCache:
+    """Test ResponseCache class."""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        """Create a ResponseCache in a temporary directory."""
+        cache = ResponseCache(tmp_path / "cache" / "responses.db")
+        yield cache
+        cache.close()
+
+    def test_make_key(self):
+        """Test keys depend on every part and their order."""
+        key = ResponseCache.make_key("model", "prompt", 500, 0.3)
+
+        assert key == ResponseCache.make_key("model", "prompt", 500, 0.3)
+        assert key != ResponseCache.make_key("model", "prompt", 500, 0.5)
+        assert key != ResponseCache.make_key("prompt", "model", 500, 0.3)
+
+    def test_get_missing(self, cache):
+        """Test unknown keys return None."""
+        assert cache.get("missing") is None
+
+    def test_set_and_get(self, cache):
+        """Test stored responses are returned and can be cleared."""
+        cache.set("key", "response")
+        assert cache.get("key") == "response"
+
+        cache.clear()
+        assert cache.get("key") is None
+
+    def test_persists_across_instances(self, cache, tmp_path):
+        """Test responses survive reopening the database."""
+        cache.set("key", "response")
+
+        reopened = ResponseCache(cache.path)
+        try:
+            assert reopened.get("key") == "response"
+        finally:
+            reopened.close()
+
+    def test_expired_entries_ignored(self, tmp_path):
+        """Test entries older than the TTL are treated as missing."""
+        cache = ResponseCache(tmp_path / "responses.db", ttl=60)
+        try:
+            with patch("src.response_cache.time.time", return_value=1000.0):
+                cache.set("key", "response")
+            with patch("src.response_cache.time.time", return_value=1030.0):
+                assert cache.get("key") == "response"
+            with patch("src.response_cache.time.time", return_value=1061.0):
+                assert cache.get("key") is None
+        finally:
+            cache.close()
+
+
+class TestMemoryResponseCache:
+    """Test MemoryResponseCache class."""
+
+    def test_set_and_get(self):
+        """Test stored responses are returned and can be cleared."""
+        cache = MemoryResponseCache()
+        key = cache.make_key("model", "prompt")
+        assert cache.get(key) is None
+
+        cache.set(key, "response")
+        assert cache.get(key) == "response"
+
+        cache.clear()
+        assert cache.get(key) is None
+
+    def test_evicts_least_recently_used(self):
+        """Test the oldest unused entry is dropped when the cache is full."""
+        cache = MemoryResponseCache(maxsize=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+
+        cache.set("c", "3")
+
+        assert cache.get("a") == "1"
+        assert cache.get("b") is None
+        assert cache.get("c") == "3"